@@ -1,13 +1,97 @@
 import re
 import json
+import asyncio
+import hashlib
+import os
+import pickle
+import sys
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version as metadata_version
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
 from pathlib import Path
+import threading
 import time
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
 
+# Aho-Corasick (optionnel) : détection de tous les acronymes en une seule passe
+AHOCORASICK_AVAILABLE = False
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    pass
+
+# RE2 (optionnel) : moteur DFA en temps linéaire, utilisé pour les textes ASCII
+RE2_AVAILABLE = False
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    pass
+
+# Hyperscan (optionnel) : pré-sélection SIMD des patterns présents dans le texte
+HYPERSCAN_AVAILABLE = False
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    pass
+
+# NumPy (optionnel) : tri vectorisé des détections pour les grands documents
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    pass
+
+# En dessous de ce nombre de détections, le tri Python reste plus rapide
+NUMPY_MERGE_THRESHOLD = 1000
+
+# Cache LRU des analyses : les textes re-soumis (relances, doublons) ne sont pas réanalysés
+ANALYZE_CACHE_SIZE = 4096
+
+# Instantanés picklés du moteur : cache utilisateur, hors du paquet (jamais copiés dans une image)
+ENGINE_CACHE_DIR = Path.home() / ".cache" / "pii-engine"
+
+# Distributions dont la version invalide un instantané (objets compilés qu'il contient)
+_SNAPSHOT_DEPENDENCIES = ("google-re2", "hyperscan", "pyahocorasick", "numpy")
+
+# Espaces reconnus par \s côté `re` (Unicode) mais pas côté RE2 / Hyperscan
+_ASCII_WHITESPACE_GAP = re.compile(r"[\v\x1c-\x1f]")
+
+# Constructions incompatibles avec la fusion en une alternance nommée :
+# groupes nommés, références arrière et drapeaux globaux en ligne
+_UNCOMBINABLE_SYNTAX = re.compile(r"\(\?P[<=]|\\[1-9]|\(\?[aiLmsux]+\)")
+
+# Mots français courants à exclure de la détection de noms
+FRENCH_STOPWORDS = frozenset({
+    'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'et', 'ou', 'mais',
+    'est', 'sont', 'était', 'été', 'être', 'avoir', 'avait', 'avons', 'ont',
+    'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils', 'elles', 'me', 'te', 'se',
+    'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses', 'notre', 'votre',
+    'ce', 'cet', 'cette', 'ces', 'qui', 'que', 'quoi', 'dont', 'où',
+    'pour', 'par', 'dans', 'sur', 'sous', 'avec', 'sans', 'chez',
+    'très', 'plus', 'moins', 'bien', 'mal', 'aussi', 'encore', 'déjà',
+    'bonjour', 'merci', 'oui', 'non', 'si', 'comment', 'quand', 'pourquoi'
+})
+
+@lru_cache(maxsize=None)
+def entity_placeholder(entity_type: str) -> str:
+    """Placeholder d'anonymisation d'un type d'entité (ex: [NUMÉRO_DE_TÉLÉPHONE])"""
+    return f"[{entity_type.upper().replace(' ', '_').replace('-', '_')}]"
+
 # ====================================================================
 # MODÈLES DE DONNÉES
 # ====================================================================
@@ -31,6 +115,13 @@ class AnalyzeRequest(BaseModel):
     confidence_threshold: float = Field(default=0.5, ge=0.0, le=1.0, description="Seuil de confiance minimum")
     detect_names: bool = Field(default=False, description="Activer la détection de noms (peut générer des faux positifs)")
 
+class BatchAnalyzeRequest(BaseModel):
+    texts: List[str] = Field(..., description="Textes à analyser", min_length=1)
+    language: str = Field(default="fr", description="Langue des textes (fr/en/ar)")
+    anonymize: bool = Field(default=False, description="Anonymiser les résultats")
+    confidence_threshold: float = Field(default=0.5, ge=0.0, le=1.0, description="Seuil de confiance minimum")
+    detect_names: bool = Field(default=False, description="Activer la détection de noms (peut générer des faux positifs)")
+
 class DetectionResult(BaseModel):
     entity_type: str
     category: str
@@ -66,19 +157,98 @@ class PIIDetectionEngine:
             self.taxonomy = self._get_embedded_taxonomy()
         
         self.compiled_patterns = self._compile_patterns()
+        # Table plate des métadonnées, indexée par l'ordre global du pattern
+        self.pattern_table = [
+            metadata for patterns in self.compiled_patterns.values() for _, metadata in patterns
+        ]
+        self.combined_patterns = self._combine_patterns()
+        self.re2_patterns = self._compile_re2_patterns() if RE2_AVAILABLE else None
+        self.hyperscan_db, self.hyperscan_unscreened = self._build_hyperscan_db()
+        self._hyperscan_local = threading.local()
+        self.pattern_triggers, self.untriggered_patterns = self._build_pattern_triggers()
         self.keyword_matchers = self._build_keyword_matchers()
+        self.keyword_automaton = self._build_keyword_automaton()
         
         # Liste de mots français courants à exclure de la détection de noms
-        self.french_stopwords = {
-            'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'et', 'ou', 'mais',
-            'est', 'sont', 'était', 'été', 'être', 'avoir', 'avait', 'avons', 'ont',
-            'je', 'tu', 'il', 'elle', 'nous', 'vous', 'ils', 'elles', 'me', 'te', 'se',
-            'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses', 'notre', 'votre',
-            'ce', 'cet', 'cette', 'ces', 'qui', 'que', 'quoi', 'dont', 'où',
-            'pour', 'par', 'dans', 'sur', 'sous', 'avec', 'sans', 'chez',
-            'très', 'plus', 'moins', 'bien', 'mal', 'aussi', 'encore', 'déjà',
-            'bonjour', 'merci', 'oui', 'non', 'si', 'comment', 'quand', 'pourquoi'
-        }
+        self.french_stopwords = FRENCH_STOPWORDS
+        
+        # Cache LRU des analyses, propre à ce moteur : une taxonomie rechargée repart à vide
+        self._analysis_cache: "OrderedDict[Tuple, Tuple[Dict, ...]]" = OrderedDict()
+        self._analysis_cache_lock = threading.Lock()
+
+    @classmethod
+    def load_cached(cls, taxonomy_path: Optional[str], cache_dir: Path) -> "PIIDetectionEngine":
+        """Charge le moteur depuis un instantané picklé, ou le construit puis l'enregistre
+        
+        L'instantané est rangé dans un cache utilisateur, sous un nom dérivé de la
+        taxonomie, du source de ce module et des versions des dépendances
+        optionnelles : toute modification produit un autre fichier. Toute erreur
+        de lecture ou d'écriture retombe sur une construction normale.
+        """
+        snapshot_path = cache_dir / f"classifier-engine-{cls._snapshot_key(taxonomy_path)}.pkl"
+        
+        try:
+            with open(snapshot_path, "rb") as f:
+                engine = pickle.load(f)
+            if isinstance(engine, cls):
+                return engine
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Instantané du moteur ignoré: {e}")
+        
+        engine = cls(taxonomy_path=taxonomy_path)
+        
+        # Écriture dans un fichier temporaire puis renommage : jamais d'instantané partiel
+        tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(engine, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, snapshot_path)
+        except Exception as e:
+            print(f"Impossible d'enregistrer l'instantané du moteur: {e}")
+            tmp_path.unlink(missing_ok=True)
+        
+        return engine
+
+    @staticmethod
+    def _snapshot_key(taxonomy_path: Optional[str]) -> str:
+        """Empreinte de tout ce dont dépend un moteur construit : taxonomie, code, dépendances"""
+        digest = hashlib.sha256()
+        if taxonomy_path and Path(taxonomy_path).exists():
+            digest.update(Path(taxonomy_path).read_bytes())
+        digest.update(Path(__file__).read_bytes())
+        
+        versions = [sys.version]
+        for distribution in _SNAPSHOT_DEPENDENCIES:
+            try:
+                versions.append(f"{distribution}=={metadata_version(distribution)}")
+            except PackageNotFoundError:
+                versions.append(f"{distribution} absent")
+        # Un module installé mais non importable (bibliothèque native manquante) change le moteur
+        versions.append(repr((AHOCORASICK_AVAILABLE, RE2_AVAILABLE, HYPERSCAN_AVAILABLE, NUMPY_AVAILABLE)))
+        digest.update("\n".join(versions).encode("utf-8"))
+        
+        return digest.hexdigest()[:16]
+
+    def __getstate__(self) -> Dict:
+        """État picklable : base Hyperscan sérialisée, espaces de travail exclus"""
+        state = self.__dict__.copy()
+        state.pop("_hyperscan_local", None)
+        state.pop("_analysis_cache", None)
+        state.pop("_analysis_cache_lock", None)
+        if state.get("hyperscan_db") is not None:
+            state["hyperscan_db"] = hyperscan.dumpb(state["hyperscan_db"])
+        return state
+
+    def __setstate__(self, state: Dict):
+        if state.get("hyperscan_db") is not None:
+            state["hyperscan_db"] = hyperscan.loadb(state["hyperscan_db"], hyperscan.HS_MODE_BLOCK)
+        self.__dict__.update(state)
+        self._hyperscan_local = threading.local()
+        self._analysis_cache = OrderedDict()
+        self._analysis_cache_lock = threading.Lock()
 
     def _load_taxonomy(self, path: str) -> Dict:
         """Charge la taxonomie depuis un fichier JSON"""
@@ -216,16 +386,19 @@ class PIIDetectionEngine:
     def _compile_patterns(self) -> Dict[str, List[Tuple[re.Pattern, Dict]]]:
         """Compile tous les regex patterns de la taxonomie"""
         compiled = {}
+        order = 0
         
         for category in self.taxonomy.get("categories", []):
-            category_name = category["class"]
+            category_name = sys.intern(category["class"])
             compiled[category_name] = []
             
             for subclass in category.get("subclasses", []):
-                entity_name = subclass.get("name", "Unknown")
+                entity_name = sys.intern(subclass.get("name", "Unknown"))
                 patterns = subclass.get("regex_patterns", [])
-                sensitivity = subclass.get("sensitivity_level", "unknown")
+                sensitivity = sys.intern(subclass.get("sensitivity_level", "unknown"))
                 context_required = subclass.get("context_required", [])
+                # Champs constants des détections, copiés à chaque correspondance
+                template = self._detection_template(entity_name, category_name, sensitivity, 0.9, "regex")
                 
                 for pattern_str in patterns:
                     try:
@@ -237,23 +410,328 @@ class PIIDetectionEngine:
                                 "category": category_name,
                                 "sensitivity_level": sensitivity,
                                 "type": category.get("type", "PII"),
-                                "context_required": context_required
+                                "context_required": context_required,
+                                "context_required_lower": tuple(keyword.lower() for keyword in context_required),
+                                # Filtres spécifiques résolus une fois (évite les comparaisons de chaînes par correspondance)
+                                "is_name": entity_name == "Nom complet",
+                                "is_fiscal_id": entity_name == "Identifiant fiscal (IF)",
+                                "detection_template": template,
+                                "order": order
                             }
                         ))
+                        order += 1
                     except re.error as e:
                         print(f"Erreur compilation regex pour {entity_name}: {e}")
         
         return compiled
 
+    @staticmethod
+    def _detection_template(entity_type: str, category: str, sensitivity_level: str,
+                            confidence_score: float, detection_method: str) -> Dict:
+        """Partie constante d'une détection pour un type d'entité et une méthode donnés"""
+        return {
+            "entity_type": entity_type,
+            "category": category,
+            "sensitivity_level": sensitivity_level,
+            "confidence_score": confidence_score,
+            "detection_method": detection_method
+        }
+
+    @staticmethod
+    def _needs_validation(metadata: Dict) -> bool:
+        """Vrai si les correspondances du pattern sont filtrées après coup"""
+        return bool(metadata["context_required"]) or metadata["is_name"] or metadata["is_fiscal_id"]
+
+    def _combine_patterns(self) -> Tuple[Optional[re.Pattern], List[Tuple[re.Pattern, Dict]], List[Tuple[re.Pattern, Dict]]]:
+        """Fusionne tous les patterns, toutes catégories confondues, en une alternance
+        
+        Chaque alternative est nommée p<ordre> : la catégorie n'est qu'une métadonnée
+        retrouvée dans pattern_table. Une correspondance rejetée par un filtre
+        masquerait les alternatives suivantes : les patterns validés après coup
+        restent donc scannés individuellement.
+        Retourne (alternance, patterns fusionnés, patterns isolés).
+        """
+        parts = []
+        alternatives = []
+        standalone = []
+        
+        for patterns in self.compiled_patterns.values():
+            for pattern, metadata in patterns:
+                if self._needs_validation(metadata) or _UNCOMBINABLE_SYNTAX.search(pattern.pattern):
+                    standalone.append((pattern, metadata))
+                    continue
+                parts.append(f"(?P<p{metadata['order']}>{pattern.pattern})")
+                alternatives.append((pattern, metadata))
+        
+        combined_pattern = None
+        if parts:
+            try:
+                combined_pattern = re.compile("|".join(parts), re.IGNORECASE | re.UNICODE)
+            except re.error as e:
+                print(f"Erreur fusion regex: {e}")
+                alternatives = []
+                standalone = [
+                    (pattern, metadata)
+                    for patterns in self.compiled_patterns.values()
+                    for pattern, metadata in patterns
+                ]
+        
+        return combined_pattern, alternatives, standalone
+
+    @staticmethod
+    def _compile_bytes_pattern(pattern_str: str):
+        """Compile un pattern pour un texte ASCII encodé, avec RE2 si le pattern est accepté"""
+        encoded = pattern_str.encode("utf-8")
+        try:
+            return re2.compile(b"(?i)" + encoded)
+        except re2.error:
+            pass
+        try:
+            return re.compile(encoded, re.IGNORECASE)
+        except re.error as e:
+            print(f"Pattern non compilable en octets, RE2 désactivé: {e}")
+            return None
+
+    def _compile_re2_patterns(self) -> Optional[Tuple]:
+        """Recompile les patterns (fusionnés et isolés) avec RE2
+        
+        Sur un texte ASCII, \\b, \\w et \\d ont la même sémantique sous RE2 et sous
+        `re` en mode Unicode : les positions trouvées sont identiques. Les autres
+        textes restent traités par `re`.
+        """
+        combined_pattern, alternatives, standalone = self.combined_patterns
+        
+        combined_re2 = None
+        if combined_pattern is not None:
+            combined_re2 = self._compile_bytes_pattern(combined_pattern.pattern)
+            if combined_re2 is None:
+                return None
+        
+        recompiled = []
+        for patterns in (alternatives, standalone):
+            patterns_re2 = []
+            for pattern, metadata in patterns:
+                compiled_pattern = self._compile_bytes_pattern(pattern.pattern)
+                if compiled_pattern is None:
+                    return None
+                patterns_re2.append((compiled_pattern, metadata))
+            recompiled.append(patterns_re2)
+        
+        return combined_re2, recompiled[0], recompiled[1]
+
+    def _build_hyperscan_db(self) -> Tuple[Optional[object], set]:
+        """Compile tous les patterns dans une base Hyperscan (une passe par texte)
+        
+        La base sert uniquement à savoir quels patterns apparaissent dans le texte :
+        Hyperscan rapporte toutes les fins de correspondance, pas le découpage
+        gauche-droite de finditer, qui reste donc calculé par le moteur regex.
+        Retourne la base et l'ensemble des patterns qu'elle ne couvre pas.
+        """
+        if not HYPERSCAN_AVAILABLE:
+            return None, set()
+        
+        expressions = {}
+        unscreened = set()
+        for patterns in self.compiled_patterns.values():
+            for pattern, metadata in patterns:
+                expressions[metadata["order"]] = pattern.pattern.encode("utf-8")
+        
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_SINGLEMATCH
+        
+        db = hyperscan.Database()
+        try:
+            db.compile(expressions=list(expressions.values()), ids=list(expressions.keys()), flags=flags)
+            return db, unscreened
+        except hyperscan.error:
+            pass
+        
+        # Écarter les patterns refusés par Hyperscan : ils seront toujours exécutés
+        for order, expression in list(expressions.items()):
+            try:
+                hyperscan.Database().compile(expressions=[expression], ids=[order], flags=flags)
+            except hyperscan.error as e:
+                print(f"Pattern non supporté par Hyperscan: {e}")
+                unscreened.add(order)
+                del expressions[order]
+        
+        if not expressions:
+            return None, set()
+        
+        db = hyperscan.Database()
+        try:
+            db.compile(
+                expressions=list(expressions.values()),
+                ids=list(expressions.keys()),
+                flags=flags
+            )
+        except hyperscan.error as e:
+            print(f"Erreur compilation Hyperscan: {e}")
+            return None, set()
+        
+        return db, unscreened
+
+    def _hyperscan_candidates(self, data: bytes) -> set:
+        """Retourne l'ordre des patterns présents dans le texte (plus les non couverts)"""
+        # Un espace de travail par thread : FastAPI exécute les requêtes en parallèle
+        scratch = getattr(self._hyperscan_local, "scratch", None)
+        if scratch is None:
+            scratch = hyperscan.Scratch(self.hyperscan_db)
+            self._hyperscan_local.scratch = scratch
+        
+        candidates = set(self.hyperscan_unscreened)
+        
+        def on_match(pattern_id, start, end, flags, context):
+            candidates.add(pattern_id)
+        
+        self.hyperscan_db.scan(data, match_event_handler=on_match, scratch=scratch)
+        return candidates
+
+    @staticmethod
+    def _is_caseless(code: int) -> bool:
+        """Vrai si le caractère n'est pas affecté par IGNORECASE"""
+        char = chr(code)
+        return not char.isalpha() and char.lower() == char.upper()
+
+    @classmethod
+    def _required_atoms(cls, items) -> Optional[frozenset]:
+        """Ensemble de caractères dont au moins un figure dans toute correspondance
+        
+        Seuls les caractères non alphabétiques (chiffres, @, +...) sont retenus :
+        ils sont insensibles à IGNORECASE et rares dans la prose. Retourne None
+        si aucun ensemble de ce type n'est garanti.
+        """
+        best = None
+        
+        for op, arg in items:
+            atoms = None
+            if op is sre_parse.LITERAL:
+                if cls._is_caseless(arg):
+                    atoms = frozenset([re.escape(chr(arg))])
+            elif op is sre_parse.IN:
+                atoms = set()
+                for item_op, item_arg in arg:
+                    if item_op is sre_parse.LITERAL and cls._is_caseless(item_arg):
+                        atoms.add(re.escape(chr(item_arg)))
+                    elif item_op is sre_parse.RANGE and all(map(cls._is_caseless, range(item_arg[0], item_arg[1] + 1))):
+                        atoms.update(re.escape(chr(code)) for code in range(item_arg[0], item_arg[1] + 1))
+                    elif item_op is sre_parse.CATEGORY and item_arg is sre_parse.CATEGORY_DIGIT:
+                        atoms.add(r"\d")
+                    else:
+                        atoms = None
+                        break
+                atoms = frozenset(atoms) if atoms else None
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, sre_parse.POSSESSIVE_REPEAT):
+                if arg[0] >= 1:
+                    atoms = cls._required_atoms(arg[2])
+            elif op is sre_parse.SUBPATTERN:
+                atoms = cls._required_atoms(arg[3])
+            elif op is sre_parse.ATOMIC_GROUP:
+                atoms = cls._required_atoms(arg)
+            elif op is sre_parse.BRANCH:
+                branches = [cls._required_atoms(branch) for branch in arg[1]]
+                if all(branches):
+                    atoms = frozenset().union(*branches)
+            
+            # Préférer les littéraux (@, +) aux chiffres, puis l'ensemble le plus petit
+            if atoms and (best is None or (r"\d" in atoms, len(atoms)) < (r"\d" in best, len(best))):
+                best = atoms
+        
+        return best
+
+    def _build_pattern_triggers(self) -> Tuple[List[Tuple[re.Pattern, set]], set]:
+        """Regroupe les patterns par caractères déclencheurs obligatoires
+        
+        Un pattern dont aucun déclencheur n'apparaît dans le texte ne peut pas
+        correspondre : il est ignoré sans être exécuté.
+        """
+        groups = {}
+        untriggered = set()
+        
+        for patterns in self.compiled_patterns.values():
+            for pattern, metadata in patterns:
+                try:
+                    atoms = self._required_atoms(sre_parse.parse(pattern.pattern, pattern.flags))
+                except Exception:
+                    atoms = None
+                if atoms is None:
+                    untriggered.add(metadata["order"])
+                else:
+                    groups.setdefault(atoms, set()).add(metadata["order"])
+        
+        triggers = [
+            (re.compile("[" + "".join(sorted(atoms)) + "]"), orders)
+            for atoms, orders in groups.items()
+        ]
+        return triggers, untriggered
+
+    def _trigger_candidates(self, text: str) -> set:
+        """Retourne l'ordre des patterns dont un déclencheur figure dans le texte"""
+        candidates = set(self.untriggered_patterns)
+        for trigger, orders in self.pattern_triggers:
+            if trigger.search(text):
+                candidates |= orders
+        return candidates
+
+    @staticmethod
+    def _is_plain_ascii(text: str) -> bool:
+        """Vrai si \\b, \\w, \\d et \\s ont la même sémantique en ASCII qu'en Unicode"""
+        return text.isascii() and not _ASCII_WHITESPACE_GAP.search(text)
+
+    def _scan_combined(self, combined_pattern, alternatives: List[Tuple], text,
+                       candidates: set) -> List[Tuple[Dict, int, int]]:
+        """Parcourt une alternance fusionnée comme autant de finditer indépendants
+        
+        L'alternance localise, en un passage, chaque position où au moins un
+        pattern correspond ; la recherche reprend au caractère suivant afin qu'une
+        alternative longue ne masque pas une alternative démarrant à l'intérieur.
+        À chaque position, les autres alternatives sont vérifiées par un match
+        ancré (seule la première l'emporte dans l'alternance) et les
+        chevauchements d'un même pattern sont écartés comme le ferait finditer.
+        """
+        hits = []
+        pattern_table = self.pattern_table
+        active = [(pattern, metadata) for pattern, metadata in alternatives if metadata["order"] in candidates]
+        last_end = [0] * len(pattern_table)
+        pos = 0
+        length = len(text)
+        
+        while pos <= length:
+            match = combined_pattern.search(text, pos)
+            if match is None:
+                break
+            start = match.start()
+            winner = int(match.lastgroup[1:])
+            
+            for pattern, metadata in active:
+                order = metadata["order"]
+                if start < last_end[order]:
+                    continue
+                if order == winner:
+                    end = match.end()
+                else:
+                    anchored = pattern.match(text, start)
+                    if anchored is None:
+                        continue
+                    end = anchored.end()
+                hits.append((pattern_table[order], start, end))
+                last_end[order] = max(end, start + 1)
+            
+            pos = start + 1
+        
+        return hits
+
     def _build_keyword_matchers(self) -> Dict[str, Dict]:
         """Construit des matchers par mots-clés"""
         matchers = {}
         
         for category in self.taxonomy.get("categories", []):
+            category_name = sys.intern(category["class"])
             for subclass in category.get("subclasses", []):
-                entity_name = subclass.get("name", "")
+                entity_name = sys.intern(subclass.get("name", ""))
+                sensitivity = sys.intern(subclass.get("sensitivity_level", "unknown"))
                 synonyms = subclass.get("synonyms_fr", []) + subclass.get("synonyms_en", [])
                 acronyms = subclass.get("acronyms_fr", []) + subclass.get("acronyms_en", [])
+                template = self._detection_template(entity_name, category_name, sensitivity, 0.75, "keyword")
                 
                 # Utiliser uniquement les acronymes pour éviter les faux positifs
                 all_keywords = acronyms
@@ -262,12 +740,45 @@ class PIIDetectionEngine:
                     if keyword and len(keyword) > 1:
                         matchers[keyword.lower()] = {
                             "entity_type": entity_name,
-                            "category": category["class"],
-                            "sensitivity_level": subclass.get("sensitivity_level", "unknown")
+                            "category": category_name,
+                            "sensitivity_level": sensitivity,
+                            "detection_template": template
                         }
         
         return matchers
 
+    def _build_keyword_automaton(self):
+        """Construit l'automate Aho-Corasick des acronymes (None si indisponible)"""
+        if not AHOCORASICK_AVAILABLE or not self.keyword_matchers:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, metadata in self.keyword_matchers.items():
+            automaton.add_word(keyword, (keyword, metadata))
+        automaton.make_automaton()
+        return automaton
+
+    @classmethod
+    def _find_keyword(cls, text: str, keyword: str):
+        """Positions des occurrences non chevauchantes de keyword délimitées comme par \\b"""
+        start = 0
+        while True:
+            pos = text.find(keyword, start)
+            if pos < 0:
+                return
+            if cls._is_word_boundary(text, pos) and cls._is_word_boundary(text, pos + len(keyword)):
+                yield pos
+                start = pos + len(keyword)
+            else:
+                start = pos + 1
+
+    @staticmethod
+    def _is_word_boundary(text: str, pos: int) -> bool:
+        """Équivalent de \\b : transition mot / non-mot à la position donnée"""
+        before = pos > 0 and (text[pos - 1].isalnum() or text[pos - 1] == "_")
+        after = pos < len(text) and (text[pos].isalnum() or text[pos] == "_")
+        return before != after
+
     def _get_context(self, text: str, start: int, end: int, context_size: int = 30) -> str:
         """Extrait le contexte autour d'une détection"""
         ctx_start = max(0, start - context_size)
@@ -283,14 +794,24 @@ class PIIDetectionEngine:
         return context
 
     def _check_context_required(self, text: str, match_start: int, match_end: int, 
-                                context_keywords: List[str], window_size: int = 50) -> bool:
-        """Vérifie si les mots-clés de contexte requis sont présents"""
+                                context_keywords: List[str], window_size: int = 50,
+                                text_lower: Optional[str] = None) -> bool:
+        """Vérifie si les mots-clés de contexte requis sont présents
+        
+        text_lower (texte entier en minuscules, calculé une fois par analyse) évite
+        de re-convertir la fenêtre à chaque correspondance ; les mots-clés sont
+        alors supposés déjà en minuscules.
+        """
         if not context_keywords:
             return True
         
         # Extraire le contexte autour de la détection
         ctx_start = max(0, match_start - window_size)
         ctx_end = min(len(text), match_end + window_size)
+        if text_lower is not None:
+            context = text_lower[ctx_start:ctx_end]
+            return any(keyword in context for keyword in context_keywords)
+        
         context = text[ctx_start:ctx_end].lower()
         
         # Vérifier si au moins un mot-clé est présent
@@ -298,85 +819,154 @@ class PIIDetectionEngine:
 
     def _is_valid_name(self, name: str) -> bool:
         """Vérifie si un nom détecté est valide"""
-        words = name.lower().split()
+        words = name.split()
         
-        # Rejeter si contient des stopwords
-        if any(word in self.french_stopwords for word in words):
+        # Accepter uniquement si 2+ mots
+        if len(words) < 2:
             return False
         
-        # Accepter uniquement si 2+ mots et chaque mot commence par une majuscule
-        if len(words) >= 2 and all(w[0].isupper() for w in name.split()):
-            return True
+        # Chaque mot commence par une majuscule et n'est pas un stopword (un seul passage)
+        for word in words:
+            if not word[0].isupper() or word.lower() in FRENCH_STOPWORDS:
+                return False
         
-        return False
+        return True
 
-    def _detect_with_regex(self, text: str, detect_names: bool = False) -> List[Dict]:
+    def _detect_with_regex(self, text: str, detect_names: bool = False,
+                           text_lower: Optional[str] = None) -> List[Dict]:
         """Détection par expressions régulières"""
         detections = []
+        hits = []
         
-        for category_name, patterns in self.compiled_patterns.items():
-            for pattern, metadata in patterns:
-                # Skip les patterns de noms si detect_names est False
-                if not detect_names and metadata["entity_type"] == "Nom complet":
+        plain_ascii = self._is_plain_ascii(text)
+        
+        # Texte ASCII : exécution par RE2 sur les octets (positions identiques)
+        if self.re2_patterns is not None and plain_ascii:
+            (combined_pattern, alternatives, standalone), subject = self.re2_patterns, text.encode("ascii")
+        else:
+            (combined_pattern, alternatives, standalone), subject = self.combined_patterns, text
+        
+        # Texte ASCII : une passe Hyperscan indique les seuls patterns à exécuter ;
+        # sinon, pré-filtre sur les caractères obligatoires (chiffres, @...)
+        if self.hyperscan_db is not None and plain_ascii:
+            candidates = self._hyperscan_candidates(text.encode("ascii"))
+        else:
+            candidates = self._trigger_candidates(text)
+        
+        if not candidates:
+            return detections
+        
+        # Un seul passage sur le texte pour tous les patterns fusionnés
+        # (une alternative absente du texte ne peut pas masquer les autres)
+        if combined_pattern is not None and any(metadata["order"] in candidates for _, metadata in alternatives):
+            hits.extend(self._scan_combined(combined_pattern, alternatives, subject, candidates))
+        
+        for pattern, metadata in standalone:
+            # Skip les patterns de noms si detect_names est False
+            if not detect_names and metadata["is_name"]:
+                continue
+            if metadata["order"] not in candidates:
+                continue
+            for match in pattern.finditer(subject):
+                hits.append((metadata, match.start(), match.end()))
+        
+        # Conserver l'ordre pattern par pattern (départage des chevauchements à la fusion)
+        hits.sort(key=lambda hit: hit[0]["order"])
+        
+        # Méthodes résolues une fois hors de la boucle par correspondance
+        check_context = self._check_context_required
+        is_valid_name = self._is_valid_name
+        get_context = self._get_context
+        append = detections.append
+        
+        for metadata, start, end in hits:
+            matched_value = text[start:end]
+            
+            # Vérification de contexte si nécessaire
+            context_required = metadata["context_required_lower"]
+            if context_required:
+                if not check_context(text, start, end, context_required, text_lower=text_lower):
                     continue
-                
-                for match in pattern.finditer(text):
-                    matched_value = match.group(0)
-                    
-                    # Vérification de contexte si nécessaire
-                    context_required = metadata.get("context_required", [])
-                    if context_required:
-                        if not self._check_context_required(text, match.start(), match.end(), context_required):
-                            continue
-                    
-                    # Vérification spéciale pour les noms
-                    if metadata["entity_type"] == "Nom complet" and not self._is_valid_name(matched_value):
-                        continue
-                    
-                    # Filtrer les faux positifs pour identifiant fiscal
-                    if metadata["entity_type"] == "Identifiant fiscal (IF)":
-                        # Vérifier que ce n'est pas un numéro de téléphone
-                        if matched_value.startswith(('06', '07', '05', '+212', '212')):
-                            continue
-                    
-                    detection = {
-                        "entity_type": metadata["entity_type"],
-                        "category": metadata["category"],
-                        "value": matched_value,
-                        "start": match.start(),
-                        "end": match.end(),
-                        "sensitivity_level": metadata["sensitivity_level"],
-                        "confidence_score": 0.9,  # Score plus élevé pour regex validées
-                        "detection_method": "regex",
-                        "context": self._get_context(text, match.start(), match.end())
-                    }
-                    detections.append(detection)
+            
+            # Vérification spéciale pour les noms
+            if metadata["is_name"] and not is_valid_name(matched_value):
+                continue
+            
+            # Filtrer les faux positifs pour identifiant fiscal
+            if metadata["is_fiscal_id"]:
+                # Vérifier que ce n'est pas un numéro de téléphone
+                if matched_value.startswith(('06', '07', '05', '+212', '212')):
+                    continue
+            
+            # Score plus élevé pour regex validées (0.9, porté par le gabarit)
+            detection = metadata["detection_template"].copy()
+            detection["value"] = matched_value
+            detection["start"] = start
+            detection["end"] = end
+            detection["context"] = get_context(text, start, end)
+            append(detection)
         
         return detections
 
-    def _detect_with_keywords(self, text: str) -> List[Dict]:
+    def _detect_with_keywords(self, text: str, text_lower: Optional[str] = None) -> List[Dict]:
         """Détection par mots-clés (acronymes uniquement)"""
         detections = []
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
         
-        for keyword, metadata in self.keyword_matchers.items():
-            # Recherche avec délimiteurs de mots
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            for match in re.finditer(pattern, text_lower):
-                pos = match.start()
-                
-                detection = {
-                    "entity_type": metadata["entity_type"],
-                    "category": metadata["category"],
-                    "value": text[pos:pos + len(keyword)],
-                    "start": pos,
-                    "end": pos + len(keyword),
-                    "sensitivity_level": metadata["sensitivity_level"],
-                    "confidence_score": 0.75,
-                    "detection_method": "keyword",
-                    "context": self._get_context(text, pos, pos + len(keyword))
-                }
-                detections.append(detection)
+        if self.keyword_automaton is not None:
+            # Une seule passe sur le texte pour tous les acronymes
+            hits = (
+                (end + 1 - len(keyword), keyword, metadata)
+                for end, (keyword, metadata) in self.keyword_automaton.iter(text_lower)
+                if self._is_word_boundary(text_lower, end + 1 - len(keyword))
+                and self._is_word_boundary(text_lower, end + 1)
+            )
+        else:
+            # Repli : recherche littérale (str.find) par acronyme avec délimiteurs de mots
+            hits = (
+                (pos, keyword, metadata)
+                for keyword, metadata in self.keyword_matchers.items()
+                for pos in self._find_keyword(text_lower, keyword)
+            )
+        
+        for pos, keyword, metadata in hits:
+            detections.append(self._keyword_detection(text, pos, keyword, metadata))
+        
+        return detections
+
+    def _keyword_detection(self, text: str, pos: int, keyword: str, metadata: Dict) -> Dict:
+        """Construit la détection d'un acronyme trouvé à la position donnée"""
+        end = pos + len(keyword)
+        detection = metadata["detection_template"].copy()
+        detection["value"] = text[pos:end]
+        detection["start"] = pos
+        detection["end"] = end
+        detection["context"] = self._get_context(text, pos, end)
+        return detection
+
+    def _detect_keywords_batch(self, texts: List[str], texts_lower: List[str]) -> List[List[Dict]]:
+        """Détection des acronymes d'un lot : une seule passe Aho-Corasick sur les textes joints"""
+        if self.keyword_automaton is None:
+            return [self._detect_with_keywords(text, text_lower) for text, text_lower in zip(texts, texts_lower)]
+        
+        # Séparateur non alphanumérique : les bornes de mots restent celles de chaque texte
+        joined = "\x00".join(texts_lower)
+        offsets = []
+        offset = 0
+        for text_lower in texts_lower:
+            offsets.append(offset)
+            offset += len(text_lower) + 1
+        
+        detections = [[] for _ in texts]
+        for end, (keyword, metadata) in self.keyword_automaton.iter(joined):
+            start = end + 1 - len(keyword)
+            if not (self._is_word_boundary(joined, start) and self._is_word_boundary(joined, end + 1)):
+                continue
+            index = bisect_right(offsets, start) - 1
+            detections[index].append(
+                self._keyword_detection(texts[index], start - offsets[index], keyword, metadata)
+            )
         
         return detections
 
@@ -385,25 +975,60 @@ class PIIDetectionEngine:
         if not detections:
             return []
         
+        if NUMPY_AVAILABLE and len(detections) >= NUMPY_MERGE_THRESHOLD:
+            return self._merge_overlapping_arrays(detections)
+        
         # Trier par position de début puis par score décroissant
         sorted_detections = sorted(detections, key=lambda x: (x["start"], -x["confidence_score"]))
         merged = []
         
+        # Balayage linéaire : les détections retenues sont disjointes et triées par
+        # début, seule la dernière peut donc chevaucher la détection courante
         for detection in sorted_detections:
-            overlapping = False
-            for i, existing in enumerate(merged):
+            if merged:
+                last = merged[-1]
                 # Vérifier chevauchement
-                if (detection["start"] < existing["end"] and detection["end"] > existing["start"]):
+                if detection["start"] < last["end"] and detection["end"] > last["start"]:
                     # Garder la détection avec le meilleur score
-                    if detection["confidence_score"] > existing["confidence_score"]:
-                        merged[i] = detection
-                    overlapping = True
-                    break
+                    if detection["confidence_score"] > last["confidence_score"]:
+                        merged[-1] = detection
+                    continue
+            
+            merged.append(detection)
+        
+        return merged
+
+    @staticmethod
+    def _merge_overlapping_arrays(detections: List[Dict]) -> List[Dict]:
+        """Variante de la fusion sur tableaux parallèles (start, end, score)
+        
+        Le tri (lexsort, stable comme sorted) et le balayage opèrent sur des
+        entiers et des flottants ; seuls les dictionnaires retenus sont renvoyés.
+        """
+        count = len(detections)
+        starts = np.fromiter((d["start"] for d in detections), dtype=np.int64, count=count)
+        ends = np.fromiter((d["end"] for d in detections), dtype=np.int64, count=count)
+        scores = np.fromiter((d["confidence_score"] for d in detections), dtype=np.float64, count=count)
+        
+        # Début croissant puis score décroissant
+        order = np.lexsort((-scores, starts))
+        
+        kept = []
+        last_start = last_end = last_score = None
+        for index, start, end, score in zip(
+            order.tolist(), starts[order].tolist(), ends[order].tolist(), scores[order].tolist()
+        ):
+            if kept and start < last_end and end > last_start:
+                # Garder la détection avec le meilleur score
+                if score > last_score:
+                    kept[-1] = index
+                    last_start, last_end, last_score = start, end, score
+                continue
             
-            if not overlapping:
-                merged.append(detection)
+            kept.append(index)
+            last_start, last_end, last_score = start, end, score
         
-        return sorted(merged, key=lambda x: x["start"])
+        return [detections[index] for index in kept]
 
     def analyze(self, text: str, language: str = "fr", 
                 confidence_threshold: float = 0.5,
@@ -413,48 +1038,133 @@ class PIIDetectionEngine:
         if not text or not text.strip():
             return []
         
+        # Minuscules calculées une fois, partagées par les deux détecteurs
+        # (ignorées si la casse change la longueur : les positions divergeraient)
+        text_lower = text.lower()
+        if len(text_lower) != len(text):
+            text_lower = None
+        
         # Détection par regex
-        regex_detections = self._detect_with_regex(text, detect_names=detect_names)
+        regex_detections = self._detect_with_regex(text, detect_names=detect_names, text_lower=text_lower)
         
         # Détection par mots-clés (acronymes)
-        keyword_detections = self._detect_with_keywords(text)
+        keyword_detections = self._detect_with_keywords(text, text_lower=text_lower)
+        
+        return self._finalize_detections(regex_detections + keyword_detections, confidence_threshold)
+
+    def cached_analysis(self, key: Tuple) -> Optional[List[Dict]]:
+        """Résultat mis en cache pour cette clé (copies modifiables), ou None"""
+        with self._analysis_cache_lock:
+            detections = self._analysis_cache.get(key)
+            if detections is None:
+                return None
+            self._analysis_cache.move_to_end(key)
+        return [dict(d) for d in detections]
+
+    def store_analysis(self, key: Tuple, detections: List[Dict]):
+        """Met en cache un résultat d'analyse (le plus ancien est évincé au-delà de ANALYZE_CACHE_SIZE)"""
+        with self._analysis_cache_lock:
+            self._analysis_cache[key] = tuple(dict(d) for d in detections)
+            if len(self._analysis_cache) > ANALYZE_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+
+    def analyze_batch(self, texts: List[str], language: str = "fr",
+                      confidence_threshold: float = 0.5,
+                      detect_names: bool = False) -> List[List[Dict]]:
+        """Analyse un lot de textes (acronymes cherchés en une seule passe pour tout le lot)"""
+        texts_lower = [text.lower() for text in texts]
+        keyword_batches = self._detect_keywords_batch(texts, texts_lower)
+        results = []
+        
+        for text, text_lower, keyword_detections in zip(texts, texts_lower, keyword_batches):
+            if not text or not text.strip():
+                results.append([])
+                continue
+            
+            if len(text_lower) != len(text):
+                text_lower = None
+            regex_detections = self._detect_with_regex(text, detect_names=detect_names, text_lower=text_lower)
+            results.append(self._finalize_detections(regex_detections + keyword_detections, confidence_threshold))
         
-        # Combiner et filtrer
-        all_detections = regex_detections + keyword_detections
+        return results
+
+    def _finalize_detections(self, all_detections: List[Dict], confidence_threshold: float) -> List[Dict]:
+        """Filtre par seuil de confiance puis fusionne les chevauchements"""
         all_detections = [d for d in all_detections if d["confidence_score"] >= confidence_threshold]
         
         # Fusionner les chevauchements
-        merged_detections = self._merge_overlapping_detections(all_detections)
-        
-        return merged_detections
+        return self._merge_overlapping_detections(all_detections)
 
     def anonymize_text(self, text: str, detections: List[Dict]) -> str:
         """Anonymise le texte en remplaçant les valeurs détectées"""
         if not detections:
             return text
         
-        # Trier par position décroissante pour ne pas décaler les indices
-        sorted_detections = sorted(detections, key=lambda x: x["start"], reverse=True)
-        
-        anonymized = text
-        for detection in sorted_detections:
-            entity_type = detection["entity_type"]
-            start = detection["start"]
-            end = detection["end"]
-            
-            # Créer un placeholder basé sur le type
-            placeholder = f"[{entity_type.upper().replace(' ', '_').replace('-', '_')}]"
-            
-            anonymized = anonymized[:start] + placeholder + anonymized[end:]
+        # Un seul passage dans l'ordre du texte : chaque segment n'est copié qu'une fois
+        parts = []
+        cursor = 0
+        for detection in sorted(detections, key=lambda x: x["start"]):
+            parts.append(text[cursor:detection["start"]])
+            parts.append(entity_placeholder(detection["entity_type"]))
+            cursor = detection["end"]
+        parts.append(text[cursor:])
         
-        return anonymized
+        return "".join(parts)
 
 # ====================================================================
 # INITIALISATION DU MOTEUR
 # ====================================================================
 
 taxonomy_file = Path(__file__).parent / "taxonomie.json"
-detection_engine = PIIDetectionEngine(taxonomy_path=str(taxonomy_file) if taxonomy_file.exists() else None)
+detection_engine = PIIDetectionEngine.load_cached(
+    taxonomy_path=str(taxonomy_file) if taxonomy_file.exists() else None,
+    cache_dir=ENGINE_CACHE_DIR
+)
+
+# Pool de processus optionnel (ANALYZE_WORKERS > 0) : le moteur est en lecture seule,
+# les analyses s'exécutent donc en parallèle sur plusieurs cœurs malgré le GIL
+ANALYZE_WORKERS = int(os.getenv("ANALYZE_WORKERS", "0"))
+_analyze_executor: Optional[ProcessPoolExecutor] = None
+
+def _run_analyze(text: str, language: str, confidence_threshold: float, detect_names: bool) -> List[Dict]:
+    """Point d'entrée des processus du pool (moteur du module, construit à l'import)"""
+    return detection_engine.analyze(
+        text=text,
+        language=language,
+        confidence_threshold=confidence_threshold,
+        detect_names=detect_names
+    )
+
+def _run_analyze_batch(texts: List[str], language: str, confidence_threshold: float,
+                       detect_names: bool) -> List[List[Dict]]:
+    """Point d'entrée des processus du pool pour un lot"""
+    return detection_engine.analyze_batch(
+        texts=texts,
+        language=language,
+        confidence_threshold=confidence_threshold,
+        detect_names=detect_names
+    )
+
+async def run_analysis(func, *args):
+    """Exécute une analyse dans le pool de processus s'il est actif, sinon sur place"""
+    if _analyze_executor is None:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(_analyze_executor, func, *args)
+
+async def cached_analyze(text: str, language: str, confidence_threshold: float, detect_names: bool) -> List[Dict]:
+    """Analyse via le cache LRU du moteur, indexé par l'empreinte blake2b du texte
+    
+    Le cache reste dans ce processus, même quand l'analyse s'exécute dans le pool.
+    L'appelant reçoit des copies qu'il peut compléter (anonymized_value).
+    """
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    key = (digest, language, confidence_threshold, detect_names)
+    
+    detections = detection_engine.cached_analysis(key)
+    if detections is None:
+        detections = await run_analysis(_run_analyze, text, language, confidence_threshold, detect_names)
+        detection_engine.store_analysis(key, detections)
+    return detections
 
 # ====================================================================
 # FASTAPI
@@ -466,6 +1176,51 @@ app = FastAPI(
     version="2.0.0"
 )
 
+@app.on_event("startup")
+async def start_analyze_workers():
+    global _analyze_executor
+    if ANALYZE_WORKERS > 0:
+        _analyze_executor = ProcessPoolExecutor(max_workers=ANALYZE_WORKERS)
+        print(f"✅ Pool d'analyse: {ANALYZE_WORKERS} processus")
+
+@app.on_event("shutdown")
+async def stop_analyze_workers():
+    global _analyze_executor
+    if _analyze_executor is not None:
+        _analyze_executor.shutdown(wait=True)
+        _analyze_executor = None
+
+def build_analyze_response(text: str, detections: List[Dict], anonymize: bool, start_time: float) -> AnalyzeResponse:
+    """Construit la réponse d'analyse (anonymisation, résumé, modèles Pydantic)"""
+    # Anonymisation si demandée
+    anonymized_text = None
+    if anonymize and detections:
+        anonymized_text = detection_engine.anonymize_text(text, detections)
+        for det in detections:
+            det["anonymized_value"] = entity_placeholder(det["entity_type"])
+    
+    # Créer un résumé par catégorie
+    summary = {}
+    for det in detections:
+        category = det["category"]
+        summary[category] = summary.get(category, 0) + 1
+    
+    # Temps d'exécution
+    execution_time = (time.time() - start_time) * 1000
+    
+    # Construire les résultats (dictionnaires internes déjà conformes : pas de revalidation)
+    detection_results = [DetectionResult.model_construct(**d) for d in detections]
+    
+    return AnalyzeResponse(
+        success=True,
+        text_length=len(text),
+        detections_count=len(detections),
+        detections=detection_results,
+        summary=summary,
+        execution_time_ms=round(execution_time, 2),
+        anonymized_text=anonymized_text
+    )
+
 @app.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_text(request: AnalyzeRequest):
     """Analyse un texte et détecte les données sensibles"""
@@ -473,42 +1228,40 @@ async def analyze_text(request: AnalyzeRequest):
     
     try:
         # Analyse du texte
-        detections = detection_engine.analyze(
+        detections = await cached_analyze(
             text=request.text,
             language=request.language,
             confidence_threshold=request.confidence_threshold,
             detect_names=request.detect_names
         )
         
-        # Anonymisation si demandée
-        anonymized_text = None
-        if request.anonymize and detections:
-            anonymized_text = detection_engine.anonymize_text(request.text, detections)
-            for det in detections:
-                det["anonymized_value"] = f"[{det['entity_type'].upper().replace(' ', '_').replace('-', '_')}]"
+        return build_analyze_response(request.text, detections, request.anonymize, start_time)
         
-        # Créer un résumé par catégorie
-        summary = {}
-        for det in detections:
-            category = det["category"]
-            summary[category] = summary.get(category, 0) + 1
-        
-        # Temps d'exécution
-        execution_time = (time.time() - start_time) * 1000
-        
-        # Construire les résultats
-        detection_results = [DetectionResult(**d) for d in detections]
-        
-        return AnalyzeResponse(
-            success=True,
-            text_length=len(request.text),
-            detections_count=len(detections),
-            detections=detection_results,
-            summary=summary,
-            execution_time_ms=round(execution_time, 2),
-            anonymized_text=anonymized_text
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur lors de l'analyse: {str(e)}")
+
+@app.post("/analyze_batch", response_model=List[AnalyzeResponse])
+async def analyze_texts_batch(request: BatchAnalyzeRequest):
+    """Analyse un lot de textes en une seule requête
+    
+    execution_time_ms de chaque réponse inclut le temps d'analyse du lot entier.
+    """
+    start_time = time.time()
+    
+    try:
+        batch_detections = await run_analysis(
+            _run_analyze_batch,
+            request.texts,
+            request.language,
+            request.confidence_threshold,
+            request.detect_names
         )
         
+        return [
+            build_analyze_response(text, detections, request.anonymize, start_time)
+            for text, detections in zip(request.texts, batch_detections)
+        ]
+        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'analyse: {str(e)}")
 
@@ -550,6 +1303,8 @@ if __name__ == "__main__":
     print("=" * 60)
     print(f"Patterns compilés: {sum(len(p) for p in detection_engine.compiled_patterns.values())}")
     print(f"Mots-clés: {len(detection_engine.keyword_matchers)}")
+    print(f"Processus d'analyse: {ANALYZE_WORKERS or 'aucun (analyse dans le processus serveur)'}")
+    print("Parallélisme: ANALYZE_WORKERS=N ou `uvicorn classifier:app --workers N`")
    
     print("=" * 60)
     print("\nDémarrage du serveur sur http://127.0.0.1:8001")
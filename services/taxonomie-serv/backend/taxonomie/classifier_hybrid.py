@@ -7,6 +7,12 @@ Combines:
 """
 import re
 import json
+import hashlib
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from collections import Counter, OrderedDict
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
 from pathlib import Path
@@ -20,10 +26,57 @@ from pydantic import BaseModel, Field
 # CONFIGURATION
 # ====================================================================
 
+# Standard library regex parser, used to find characters every match requires
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Aho-Corasick automaton for keyword scanning (optional)
+AHOCORASICK_AVAILABLE = False
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    pass
+
+# RE2 (optional): linear-time DFA matching, used for ASCII text
+RE2_AVAILABLE = False
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    pass
+
+# Hyperscan (optional): one SIMD pass to find which patterns occur in the text
+HYPERSCAN_AVAILABLE = False
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    pass
+
+# orjson (optional): faster JSON parsing of the taxonomy files
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
+# NumPy + Numba (optional): compiled overlap sweep for large detection sets
+NUMBA_AVAILABLE = False
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    pass
+
 # Try to import Presidio (optional)
 PRESIDIO_AVAILABLE = False
 try:
-    from presidio_analyzer import AnalyzerEngine, RecognizerRegistry
+    from presidio_analyzer import AnalyzerEngine, BatchAnalyzerEngine, RecognizerRegistry
     from presidio_analyzer.nlp_engine import NlpEngineProvider
     from presidio_anonymizer import AnonymizerEngine
     PRESIDIO_AVAILABLE = True
@@ -31,6 +84,78 @@ except ImportError:
     print("⚠️ Presidio not installed. Using regex-only mode.")
     print("   To enable Presidio: pip install presidio-analyzer presidio-anonymizer spacy")
 
+# Syntax that cannot live inside a fused alternation (named groups, backrefs, inline flags)
+_UNCOMBINABLE_SYNTAX = re.compile(r"\(\?P[<=]|\\[1-9]|\(\?[aiLmsux]+\)")
+
+# Compilation flags of the fused alternations, per pattern family
+_FUSED_FLAGS = {"custom": re.IGNORECASE | re.UNICODE, "arabic": re.UNICODE}
+
+# Whitespace matched by \s under re (Unicode) but not under RE2
+_ASCII_WHITESPACE_GAP = re.compile(r"[\v\x1c-\x1f]")
+
+# Python's \uXXXX escape, spelled \x{XXXX} in Hyperscan's PCRE syntax
+_UNICODE_ESCAPE = re.compile(r"\\u([0-9A-Fa-f]{4})")
+
+# UTF-8 lead bytes of the Arabic block (U+0600-U+06FF encodes as D8-DB xx)
+_ARABIC_LEAD = re.compile(rb"[\xD8-\xDB]")
+
+# Presidio results kept per (text digest, language); NER is by far the costliest step
+PRESIDIO_CACHE_SIZE = 4096
+
+# Distinct domains filters whose allowed patterns are kept
+DOMAIN_FILTER_CACHE_SIZE = 256
+
+# Presidio micro-batching: concurrent requests share one spaCy nlp.pipe call
+PRESIDIO_BATCH_MAX = 16
+PRESIDIO_BATCH_WAIT_MS = 10
+
+# Below this many detections the Python merge beats the array conversion
+MERGE_NUMBA_MIN = 64
+
+@lru_cache(maxsize=None)
+def entity_placeholder(entity_type: str) -> str:
+    """Anonymization placeholder of an entity type (e.g. [NUMÉRO_CNSS])"""
+    return f"[{entity_type.upper().replace(' ', '_').replace('-', '_')}]"
+
+def _merge_sweep(starts, ends, conf, is_custom):
+    """Overlap sweep of _merge_detections on arrays sorted by (start, -confidence)
+    
+    Returns the indices of the kept detections, in merged-slot order.
+    """
+    n = len(starts)
+    slots = np.empty(n, np.int64)   # detection held by each merged slot
+    active = np.empty(n, np.int64)  # slots still ending after the sweep position
+    n_slots = 0
+    n_active = 0
+    for det in range(n):
+        start = starts[det]
+        kept = 0
+        for a in range(n_active):
+            if ends[slots[active[a]]] > start:
+                active[kept] = active[a]
+                kept += 1
+        n_active = kept
+        overlap = False
+        for a in range(n_active):
+            existing = slots[active[a]]
+            if ends[det] > starts[existing]:
+                # Custom patterns take priority
+                if is_custom[det] and not is_custom[existing]:
+                    slots[active[a]] = det
+                elif conf[det] > conf[existing]:
+                    slots[active[a]] = det
+                overlap = True
+                break
+        if not overlap:
+            active[n_active] = n_slots
+            n_active += 1
+            slots[n_slots] = det
+            n_slots += 1
+    return slots[:n_slots]
+
+if NUMBA_AVAILABLE:
+    _merge_sweep = njit(cache=True, nogil=True)(_merge_sweep)
+
 # ====================================================================
 # MODÈLES DE DONNÉES
 # ====================================================================
@@ -205,6 +330,63 @@ PRESIDIO_ENTITY_MAP = {
     "UK_NHS": {"sensitivity": "critical", "category": "DONNEES_MEDICALES", "domain": "MEDICAL"},
 }
 
+# ====================================================================
+# PRESIDIO BATCHING
+# ====================================================================
+
+class PresidioBatcher:
+    """Collect concurrent Presidio calls and run them as one batch
+    
+    Requests are served from the threadpool: each caller queues its text and
+    waits on a Future. A worker thread gathers up to PRESIDIO_BATCH_MAX texts
+    (or what arrived within PRESIDIO_BATCH_WAIT_MS) and runs them per language
+    through BatchAnalyzerEngine, which feeds spaCy's nlp.pipe.
+    """
+
+    def __init__(self, analyzer, batch_max: int = PRESIDIO_BATCH_MAX,
+                 wait_ms: float = PRESIDIO_BATCH_WAIT_MS):
+        self.batch_analyzer = BatchAnalyzerEngine(analyzer_engine=analyzer)
+        self.batch_max = batch_max
+        self.wait_s = wait_ms / 1000
+        self._queue: "queue.Queue[Tuple[str, str, Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="presidio-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str, lang: str) -> List:
+        """Queue a text and wait for its Presidio results"""
+        future = Future()
+        self._queue.put((text, lang, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.wait_s
+            while len(batch) < self.batch_max:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            
+            by_language: Dict[str, List[Tuple[str, str, Future]]] = {}
+            for item in batch:
+                by_language.setdefault(item[1], []).append(item)
+            
+            for lang, items in by_language.items():
+                try:
+                    results = self.batch_analyzer.analyze_iterator(
+                        [text for text, _, _ in items], language=lang, batch_size=len(items)
+                    )
+                    for (_, _, future), result in zip(items, results):
+                        future.set_result(result)
+                except Exception as e:
+                    for _, _, future in items:
+                        if not future.done():
+                            future.set_exception(e)
+
 # ====================================================================
 # HYBRID DETECTION ENGINE
 # ====================================================================
@@ -218,14 +400,34 @@ class HybridDetectionEngine:
         # Load custom Moroccan taxonomy
         self._load_from_files()
         self.compiled_patterns = self._compile_patterns()
+        # Alternations are compiled on first use of each category (see _get_fused)
+        self.fused_patterns = self._fuse_patterns(self.compiled_patterns)
         self.keyword_matchers = self._build_keyword_matchers()
+        self.keyword_automaton = self._build_keyword_automaton()
         
         # Compile Arabic patterns
         self.arabic_patterns = self._compile_arabic_patterns()
+        self.fused_arabic_patterns = self._fuse_patterns(self.arabic_patterns)
+        # Compiled alternations by (kind, group), filled by _get_fused
+        self._fused_cache: Dict[Tuple[str, str], Optional[Tuple]] = {}
+        
+        # Allowed patterns by requested domains (see _domain_allowed_patterns)
+        self._domain_filter_cache: "OrderedDict[Tuple[str, ...], Dict]" = OrderedDict()
+        self._domain_filter_cache_lock = threading.Lock()
+        
+        # Required-character prefilter (used when Hyperscan cannot screen the text)
+        self.pattern_triggers, self.untriggered_patterns = self._build_pattern_triggers()
+        
+        # Hyperscan screening database over custom + Arabic patterns
+        self.hyperscan_db, self.hyperscan_ids, self.hyperscan_unscreened = self._build_hyperscan_db()
+        self._hyperscan_local = threading.local()
         
         # Initialize Presidio if available
         self.presidio_analyzer = None
         self.presidio_anonymizer = None
+        self.presidio_batcher = None
+        self._presidio_cache: "OrderedDict[Tuple[bytes, str], Tuple]" = OrderedDict()
+        self._presidio_cache_lock = threading.Lock()
         if PRESIDIO_AVAILABLE:
             self._init_presidio()
         
@@ -262,6 +464,7 @@ class HybridDetectionEngine:
                 self.presidio_analyzer = AnalyzerEngine()
             
             self.presidio_anonymizer = AnonymizerEngine()
+            self.presidio_batcher = PresidioBatcher(self.presidio_analyzer)
             print("  ✅ Presidio initialized successfully")
         except Exception as e:
             print(f"  ⚠️ Presidio initialization failed: {e}")
@@ -272,10 +475,14 @@ class HybridDetectionEngine:
         if not self.domains_path.exists():
             return
         
-        for filepath in self.domains_path.glob("*.json"):
+        # Read and parse the files in parallel, then merge them sequentially in glob order
+        files = list(self.domains_path.glob("*.json"))
+        with ThreadPoolExecutor() as executor:
+            futures = [executor.submit(self._read_json, filepath) for filepath in files]
+        
+        for filepath, future in zip(files, futures):
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    domain_tax = json.load(f)
+                domain_tax = future.result()
                 
                 domain_id = domain_tax.get("metadata", {}).get("domain_id", filepath.stem)
                 domain_name = domain_tax.get("metadata", {}).get("domain_name", filepath.stem)
@@ -293,6 +500,14 @@ class HybridDetectionEngine:
             except Exception as e:
                 print(f"  ⚠️ Error loading {filepath.name}: {e}")
 
+    @staticmethod
+    def _read_json(filepath: Path) -> Dict:
+        """Read and parse one taxonomy file"""
+        if ORJSON_AVAILABLE:
+            return orjson.loads(filepath.read_bytes())
+        with open(filepath, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def _compile_patterns(self) -> Dict[str, List[Tuple[re.Pattern, Dict]]]:
         """Compile custom Moroccan patterns"""
         compiled = {}
@@ -302,22 +517,43 @@ class HybridDetectionEngine:
                 compiled[category_name] = []
             
             for subclass in category.get("subclasses", []):
+                entity_type = subclass.get("name", "Unknown")
+                metadata = {
+                    "entity_type": entity_type,
+                    "category": category_name,
+                    "domain_name": category.get("domain_name", ""),
+                    "sensitivity_level": subclass.get("sensitivity_level", "unknown"),
+                    "context_required": tuple(kw.lower() for kw in subclass.get("context_required", [])),
+                    "is_name": "Nom" in entity_type,
+                    "detection_template": self._detection_template(
+                        entity_type, category_name, category.get("domain_name", ""),
+                        subclass.get("sensitivity_level", "unknown"), 0.9, "regex", "custom"
+                    )
+                }
                 for pattern_str in subclass.get("regex_patterns", []):
                     try:
                         compiled[category_name].append((
                             re.compile(pattern_str, re.IGNORECASE | re.UNICODE),
-                            {
-                                "entity_type": subclass.get("name", "Unknown"),
-                                "category": category_name,
-                                "domain_name": category.get("domain_name", ""),
-                                "sensitivity_level": subclass.get("sensitivity_level", "unknown"),
-                                "context_required": subclass.get("context_required", [])
-                            }
+                            metadata
                         ))
                     except re.error:
                         pass
         return compiled
 
+    @staticmethod
+    def _detection_template(entity_type: str, category: str, domain: str, sensitivity_level: str,
+                            confidence_score: float, detection_method: str, source: str) -> Dict:
+        """Constant part of a detection, copied and completed for each match"""
+        return {
+            "entity_type": entity_type,
+            "category": category,
+            "domain": domain,
+            "sensitivity_level": sensitivity_level,
+            "confidence_score": confidence_score,
+            "detection_method": detection_method,
+            "source": source
+        }
+
     def _build_keyword_matchers(self) -> Dict[str, Dict]:
         """Build keyword matchers"""
         matchers = {}
@@ -325,116 +561,561 @@ class HybridDetectionEngine:
             for subclass in category.get("subclasses", []):
                 for keyword in subclass.get("acronyms_fr", []) + subclass.get("acronyms_en", []):
                     if keyword and len(keyword) > 1:
+                        entity_type = subclass.get("name", "")
                         matchers[keyword.lower()] = {
-                            "entity_type": subclass.get("name", ""),
+                            "entity_type": entity_type,
                             "category": category.get("class", ""),
                             "domain_name": category.get("domain_name", ""),
-                            "sensitivity_level": subclass.get("sensitivity_level", "unknown")
+                            "sensitivity_level": subclass.get("sensitivity_level", "unknown"),
+                            "is_name": "Nom" in entity_type,
+                            "detection_template": self._detection_template(
+                                entity_type, category.get("class", ""), category.get("domain_name", ""),
+                                subclass.get("sensitivity_level", "unknown"), 0.75, "keyword", "custom"
+                            )
                         }
         return matchers
 
+    def _build_keyword_automaton(self):
+        """Build the Aho-Corasick automaton over keyword matchers (None if unavailable)"""
+        if not AHOCORASICK_AVAILABLE or not self.keyword_matchers:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, metadata in self.keyword_matchers.items():
+            automaton.add_word(keyword, (keyword, metadata))
+        automaton.make_automaton()
+        return automaton
+
     def _compile_arabic_patterns(self) -> Dict[str, List[Tuple[re.Pattern, Dict]]]:
         """Compile Arabic patterns"""
         compiled = {}
         for entity_name, config in ARABIC_PATTERNS.items():
             compiled[entity_name] = []
+            category_en = config.get("category_en", "")
+            template = self._detection_template(
+                entity_name, category_en, category_en.split("_")[0] if category_en else "",
+                config.get("sensitivity", "medium"), 0.85, "regex", "arabic"
+            )
+            template["entity_type_en"] = config.get("category_en", entity_name)
+            metadata = {
+                "entity_type": entity_name,
+                "entity_type_en": config.get("category_en", entity_name),
+                "category": config.get("category", ""),
+                "category_en": category_en,
+                "sensitivity_level": config.get("sensitivity", "medium"),
+                "context_required": tuple(kw.lower() for kw in config.get("context_required", [])),
+                "detection_template": template
+            }
             for pattern_str in config.get("patterns", []):
                 try:
                     compiled[entity_name].append((
                         re.compile(pattern_str, re.UNICODE),
-                        {
-                            "entity_type": entity_name,
-                            "entity_type_en": config.get("category_en", entity_name),
-                            "category": config.get("category", ""),
-                            "category_en": config.get("category_en", ""),
-                            "sensitivity_level": config.get("sensitivity", "medium"),
-                            "context_required": config.get("context_required", [])
-                        }
+                        metadata
                     ))
                 except re.error:
                     pass
         return compiled
 
-    def _get_context(self, text: str, start: int, end: int, size: int = 30) -> str:
-        """Extract context around detection"""
-        ctx_start = max(0, start - size)
-        ctx_end = min(len(text), end + size)
-        context = text[ctx_start:ctx_end]
-        if ctx_start > 0:
-            context = "..." + context
-        if ctx_end < len(text):
-            context = context + "..."
-        return context
-
-    def _check_context(self, text: str, start: int, end: int, keywords: List[str]) -> bool:
-        """Check if context keywords are present"""
+    @staticmethod
+    def _fuse_patterns(compiled: Dict[str, List[Tuple[re.Pattern, Dict]]]) -> Dict[str, Tuple[Optional[str], List[Tuple[re.Pattern, Dict]]]]:
+        """Build, for each group of patterns, the source of one named-group alternation
+        
+        Alternative i is named g<i>. A group whose patterns cannot be fused
+        gets a None source and is scanned pattern by pattern. Sources are
+        compiled lazily by _get_fused.
+        """
+        fused = {}
+        for name, patterns in compiled.items():
+            source = None
+            if patterns and not any(_UNCOMBINABLE_SYNTAX.search(p.pattern) for p, _ in patterns):
+                source = "|".join(f"(?P<g{i}>{p.pattern})" for i, (p, _) in enumerate(patterns))
+            fused[name] = (source, patterns)
+        return fused
+
+    def _get_fused(self, kind: str, name: str) -> Optional[Tuple[Optional[re.Pattern], List[Tuple[re.Pattern, Dict]]]]:
+        """Compile a group's alternation on first use ("custom", "arabic" or "re2")
+        
+        Most requests only reach a few categories: the others are never compiled.
+        For "re2", returns None if a pattern cannot be compiled as bytes.
+        """
+        key = (kind, name)
+        if key in self._fused_cache:
+            return self._fused_cache[key]
+        
+        source, patterns = (self.fused_arabic_patterns if kind == "arabic" else self.fused_patterns)[name]
+        if kind == "re2":
+            fused = self._compile_re2_group(source, patterns)
+        else:
+            fused_pattern = None
+            if source is not None:
+                try:
+                    fused_pattern = re.compile(source, _FUSED_FLAGS[kind])
+                except re.error:
+                    fused_pattern = None
+            fused = (fused_pattern, patterns)
+        # Concurrent first uses may both compile: the first stored result is kept
+        return self._fused_cache.setdefault(key, fused)
+
+    @staticmethod
+    def _compile_bytes_pattern(pattern_str: str):
+        """Compile a pattern for encoded ASCII text, with RE2 when it accepts the pattern"""
+        encoded = pattern_str.encode("utf-8")
+        try:
+            return re2.compile(b"(?i)" + encoded)
+        except re2.error:
+            pass
+        try:
+            return re.compile(encoded, re.IGNORECASE)
+        except re.error as e:
+            print(f"  ⚠️ Pattern not compilable as bytes, RE2 disabled: {e}")
+            return None
+
+    def _compile_re2_group(self, source: Optional[str], patterns: List[Tuple[re.Pattern, Dict]]) -> Optional[Tuple]:
+        """Recompile a custom pattern group for RE2 scans of ASCII text
+        
+        On ASCII text \\b, \\w and \\d mean the same under RE2 as under re in
+        Unicode mode, so match positions are identical. Patterns RE2 rejects
+        (lookaround, backrefs) keep a bytes `re` compilation.
+        """
+        fused_re2 = None
+        if source is not None:
+            fused_re2 = self._compile_bytes_pattern(source)
+        
+        patterns_re2 = []
+        for pattern, metadata in patterns:
+            compiled_pattern = self._compile_bytes_pattern(pattern.pattern)
+            if compiled_pattern is None:
+                return None
+            patterns_re2.append((compiled_pattern, metadata))
+        return fused_re2, patterns_re2
+
+    def _build_hyperscan_db(self) -> Tuple[Optional[object], List[Tuple[Tuple[str, str], int]], Dict[Tuple[str, str], set]]:
+        """Compile custom and Arabic patterns into one Hyperscan database
+        
+        The database only tells which patterns occur in the text: Hyperscan
+        reports every match end, not finditer's left-to-right split, so match
+        boundaries are still computed by the regex engine. Custom patterns are
+        caseless with ASCII classes (valid on plain ASCII text); Arabic patterns
+        use Unicode classes (UCP). Returns the database, the id -> (group, index)
+        table and the patterns it does not cover, by group.
+        """
+        if not HYPERSCAN_AVAILABLE:
+            return None, [], {}
+        
+        ids = []
+        expressions = []
+        flags = []
+        groups = [
+            ("custom", self.fused_patterns,
+             hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_SINGLEMATCH),
+            ("arabic", self.fused_arabic_patterns,
+             hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SINGLEMATCH),
+        ]
+        for kind, fused, group_flags in groups:
+            for name, (_, patterns) in fused.items():
+                for i, (pattern, _) in enumerate(patterns):
+                    ids.append(((kind, name), i))
+                    expressions.append(_UNICODE_ESCAPE.sub(r"\\x{\1}", pattern.pattern).encode("utf-8"))
+                    flags.append(group_flags)
+        
+        unscreened = {}
+        covered = list(range(len(ids)))
+        try:
+            hyperscan.Database().compile(expressions=expressions, ids=covered, flags=flags)
+        except hyperscan.error:
+            # Set aside the patterns Hyperscan rejects: they always run
+            covered = []
+            for pattern_id, expression in enumerate(expressions):
+                try:
+                    hyperscan.Database().compile(
+                        expressions=[expression], ids=[pattern_id], flags=[flags[pattern_id]]
+                    )
+                    covered.append(pattern_id)
+                except hyperscan.error as e:
+                    print(f"  ⚠️ Pattern not supported by Hyperscan: {e}")
+                    group, i = ids[pattern_id]
+                    unscreened.setdefault(group, set()).add(i)
+        
+        if not covered:
+            return None, [], {}
+        
+        db = hyperscan.Database()
+        try:
+            db.compile(
+                expressions=[expressions[pattern_id] for pattern_id in covered],
+                ids=covered,
+                flags=[flags[pattern_id] for pattern_id in covered]
+            )
+        except hyperscan.error as e:
+            print(f"  ⚠️ Hyperscan compilation failed: {e}")
+            return None, [], {}
+        
+        return db, ids, unscreened
+
+    def _hyperscan_candidates(self, data: Optional[bytes]) -> Optional[Dict[Tuple[str, str], set]]:
+        """Return, by group, the indices of the patterns occurring in the UTF-8 text (plus uncovered ones)"""
+        if self.hyperscan_db is None or data is None:
+            return None
+        
+        # One scratch space per thread: requests run in the threadpool
+        scratch = getattr(self._hyperscan_local, "scratch", None)
+        if scratch is None:
+            scratch = hyperscan.Scratch(self.hyperscan_db)
+            self._hyperscan_local.scratch = scratch
+        
+        candidates = {group: set(indices) for group, indices in self.hyperscan_unscreened.items()}
+        ids = self.hyperscan_ids
+        
+        def on_match(pattern_id, start, end, flags, context):
+            group, i = ids[pattern_id]
+            candidates.setdefault(group, set()).add(i)
+        
+        self.hyperscan_db.scan(data, match_event_handler=on_match, scratch=scratch)
+        return candidates
+
+    @staticmethod
+    def _is_caseless(code: int) -> bool:
+        """True if the character is not affected by IGNORECASE"""
+        char = chr(code)
+        return not char.isalpha() and char.lower() == char.upper()
+
+    @staticmethod
+    def _class_escape(code: int) -> str:
+        """Escape a character for a character class"""
+        return f"\\u{code:04x}" if code <= 0xFFFF else f"\\U{code:08x}"
+
+    @classmethod
+    def _required_atoms(cls, items) -> Optional[frozenset]:
+        """Set of characters, at least one of which appears in every match
+        
+        Only non-alphabetic characters (digits, @, +...) are kept: they are
+        unaffected by IGNORECASE and rare in prose. Returns None when no such
+        set is guaranteed.
+        """
+        best = None
+        
+        for op, arg in items:
+            atoms = None
+            if op is sre_parse.LITERAL:
+                if cls._is_caseless(arg):
+                    atoms = frozenset([cls._class_escape(arg)])
+            elif op is sre_parse.IN:
+                atoms = set()
+                for item_op, item_arg in arg:
+                    if item_op is sre_parse.LITERAL and cls._is_caseless(item_arg):
+                        atoms.add(cls._class_escape(item_arg))
+                    elif item_op is sre_parse.RANGE and all(map(cls._is_caseless, range(item_arg[0], item_arg[1] + 1))):
+                        atoms.update(cls._class_escape(code) for code in range(item_arg[0], item_arg[1] + 1))
+                    elif item_op is sre_parse.CATEGORY and item_arg is sre_parse.CATEGORY_DIGIT:
+                        atoms.add(r"\d")
+                    else:
+                        atoms = None
+                        break
+                atoms = frozenset(atoms) if atoms else None
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, sre_parse.POSSESSIVE_REPEAT):
+                if arg[0] >= 1:
+                    atoms = cls._required_atoms(arg[2])
+            elif op is sre_parse.SUBPATTERN:
+                atoms = cls._required_atoms(arg[3])
+            elif op is sre_parse.ATOMIC_GROUP:
+                atoms = cls._required_atoms(arg)
+            elif op is sre_parse.BRANCH:
+                branches = [cls._required_atoms(branch) for branch in arg[1]]
+                if all(branches):
+                    atoms = frozenset().union(*branches)
+            
+            # Prefer literals (@, +) over digits, then the smallest set
+            if atoms and (best is None or (r"\d" in atoms, len(atoms)) < (r"\d" in best, len(best))):
+                best = atoms
+        
+        return best
+
+    def _build_pattern_triggers(self) -> Tuple[List[Tuple[re.Pattern, Dict[Tuple[str, str], set]]], Dict[Tuple[str, str], set]]:
+        """Group custom and Arabic patterns by required trigger characters
+        
+        A pattern none of whose triggers appears in the text cannot match: it is
+        skipped without running. Returns the trigger classes with the patterns
+        they gate (by group), and the patterns without a trigger.
+        """
+        groups = {}
+        untriggered = {}
+        
+        for kind, fused, flags in (("custom", self.fused_patterns, re.IGNORECASE | re.UNICODE),
+                                   ("arabic", self.fused_arabic_patterns, re.UNICODE)):
+            for name, (_, patterns) in fused.items():
+                for i, (pattern, _) in enumerate(patterns):
+                    try:
+                        atoms = self._required_atoms(sre_parse.parse(pattern.pattern, flags))
+                    except Exception:
+                        atoms = None
+                    members = untriggered if atoms is None else groups.setdefault(atoms, {})
+                    members.setdefault((kind, name), set()).add(i)
+        
+        triggers = [
+            (re.compile("[" + "".join(sorted(atoms)) + "]"), members)
+            for atoms, members in groups.items()
+        ]
+        return triggers, untriggered
+
+    def _trigger_candidates(self, text: str) -> Dict[Tuple[str, str], set]:
+        """Return, by group, the indices of the patterns whose trigger appears in the text"""
+        candidates = {group: set(indices) for group, indices in self.untriggered_patterns.items()}
+        for trigger, members in self.pattern_triggers:
+            if trigger.search(text):
+                for group, indices in members.items():
+                    candidates.setdefault(group, set()).update(indices)
+        return candidates
+
+    @staticmethod
+    def _is_plain_ascii(text: str) -> bool:
+        """True if \\b, \\w, \\d and \\s mean the same in ASCII as in Unicode"""
+        return text.isascii() and not _ASCII_WHITESPACE_GAP.search(text)
+
+    @staticmethod
+    def _scan_fused(fused_pattern: Optional[re.Pattern], patterns: List[Tuple[re.Pattern, Dict]],
+                    text: str, active) -> List[Tuple[int, int, int]]:
+        """Return (pattern index, start, end) hits, as per-pattern finditer would
+        
+        The alternation finds every position where some pattern matches; the
+        search resumes one character later so a long match does not hide one
+        starting inside it. The other active patterns are checked with an
+        anchored match at each position, and overlapping hits of one pattern
+        are dropped like finditer does.
+        """
+        hits = []
+        if fused_pattern is None:
+            for i in active:
+                for match in patterns[i][0].finditer(text):
+                    hits.append((i, match.start(), match.end()))
+            return hits
+        
+        last_end = [0] * len(patterns)
+        pos = 0
+        length = len(text)
+        while pos <= length:
+            match = fused_pattern.search(text, pos)
+            if match is None:
+                break
+            start = match.start()
+            winner = int(match.lastgroup[1:])
+            
+            for i in active:
+                if start < last_end[i]:
+                    continue
+                if i == winner:
+                    end = match.end()
+                else:
+                    anchored = patterns[i][0].match(text, start)
+                    if anchored is None:
+                        continue
+                    end = anchored.end()
+                hits.append((i, start, end))
+                last_end[i] = max(end, start + 1)
+            
+            pos = start + 1
+        
+        hits.sort()
+        return hits
+
+    def _get_context(self, text: str, text_len: int, start: int, end: int, size: int = 30) -> str:
+        """Extract context around detection (text_len is len(text), computed once per call)"""
+        ctx_start = start - size if start > size else 0
+        ctx_end = end + size if end + size < text_len else text_len
+        return f"{'...' if ctx_start else ''}{text[ctx_start:ctx_end]}{'...' if ctx_end < text_len else ''}"
+
+    def _check_context(self, text: str, text_lower: str, start: int, end: int, keywords: Tuple[str, ...]) -> bool:
+        """Check if context keywords (lowercased at compile time) are present"""
         if not keywords:
             return True
-        ctx = text[max(0, start-50):min(len(text), end+50)].lower()
-        return any(kw.lower() in ctx for kw in keywords)
+        if len(text_lower) == len(text):
+            ctx = text_lower[max(0, start-50):end+50]
+        else:
+            # Lowercasing changed the length: offsets only hold in the original text
+            ctx = text[max(0, start-50):end+50].lower()
+        return any(kw in ctx for kw in keywords)
 
-    def _detect_custom(self, text: str, detect_names: bool = True) -> List[Dict]:
-        """Detect using custom Moroccan patterns"""
+    def _detect_custom(self, text: str, detect_names: bool = True,
+                       candidates: Optional[Dict[Tuple[str, str], set]] = None,
+                       allowed: Optional[Dict[Tuple[str, str], frozenset]] = None,
+                       text_lower: Optional[str] = None) -> List[Dict]:
+        """Detect using custom Moroccan patterns
+        
+        candidates: Hyperscan screening result; allowed: patterns passing the domains filter;
+        text_lower: the text lowercased once per request.
+        """
         detections = []
+        text_len = len(text)
+        if text_lower is None:
+            text_lower = text.lower()
+        plain_ascii = self._is_plain_ascii(text)
+        
+        # ASCII text: linear-time RE2 scan over the bytes (same positions)
+        use_re2 = RE2_AVAILABLE and plain_ascii
+        encoded = text.encode("ascii") if use_re2 else None
+        
+        # Hyperscan screens custom patterns with ASCII classes: only valid on plain
+        # ASCII text, otherwise fall back to the required-character triggers
+        if candidates is None or not plain_ascii:
+            candidates = self._trigger_candidates(text)
         
-        for category_name, patterns in self.compiled_patterns.items():
-            for pattern, metadata in patterns:
-                if not detect_names and "Nom" in metadata.get("entity_type", ""):
+        for category_name, (_, patterns) in self.fused_patterns.items():
+            present = candidates.get(("custom", category_name))
+            if present and allowed is not None:
+                present = present.intersection(allowed.get(("custom", category_name), ()))
+            if not present:
+                continue
+            active = [i for i in range(len(patterns))
+                      if i in present and (detect_names or not patterns[i][1]["is_name"])]
+            
+            group = self._get_fused("re2", category_name) if use_re2 else None
+            if group is not None:
+                (fused_pattern, group_patterns), subject = group, encoded
+            else:
+                (fused_pattern, group_patterns), subject = self._get_fused("custom", category_name), text
+            
+            for i, start, end in self._scan_fused(fused_pattern, group_patterns, subject, active):
+                metadata = patterns[i][1]
+                ctx_required = metadata["context_required"]
+                if ctx_required and not self._check_context(text, text_lower, start, end, ctx_required):
                     continue
                 
-                for match in pattern.finditer(text):
-                    ctx_required = metadata.get("context_required", [])
-                    if ctx_required and not self._check_context(text, match.start(), match.end(), ctx_required):
-                        continue
-                    
-                    detections.append({
-                        "entity_type": metadata["entity_type"],
-                        "category": metadata["category"],
-                        "domain": metadata.get("domain_name", ""),
-                        "value": match.group(0),
-                        "start": match.start(),
-                        "end": match.end(),
-                        "sensitivity_level": metadata["sensitivity_level"],
-                        "confidence_score": 0.9,
-                        "detection_method": "regex",
-                        "source": "custom",
-                        "context": self._get_context(text, match.start(), match.end())
-                    })
+                detections.append(self._build_detection(metadata, text, text_len, start, end))
+        
+        return detections
+
+    def _build_detection(self, metadata: Dict, text: str, text_len: int, start: int, end: int) -> Dict:
+        """Copy the pattern's detection template and fill in the match"""
+        detection = metadata["detection_template"].copy()
+        detection["value"] = text[start:end]
+        detection["start"] = start
+        detection["end"] = end
+        detection["context"] = self._get_context(text, text_len, start, end)
+        return detection
+
+    @staticmethod
+    def _is_word_boundary(text: str, pos: int) -> bool:
+        """Same as \\b: word / non-word transition at the given position"""
+        before = pos > 0 and (text[pos - 1].isalnum() or text[pos - 1] == "_")
+        after = pos < len(text) and (text[pos].isalnum() or text[pos] == "_")
+        return before != after
+
+    def _find_keyword(self, text: str, keyword: str):
+        """Yield non-overlapping word-delimited occurrences of keyword"""
+        start = 0
+        while True:
+            pos = text.find(keyword, start)
+            if pos < 0:
+                return
+            if self._is_word_boundary(text, pos) and self._is_word_boundary(text, pos + len(keyword)):
+                yield pos
+                start = pos + len(keyword)
+            else:
+                start = pos + 1
+
+    def _detect_keywords(self, text: str, detect_names: bool = True,
+                         domains: Optional[Tuple[str, ...]] = None,
+                         text_lower: Optional[str] = None) -> List[Dict]:
+        """Detect taxonomy keywords (acronyms); domains: lowercased domains filter"""
+        detections = []
+        text_len = len(text)
+        if text_lower is None:
+            text_lower = text.lower()
+        
+        if self.keyword_automaton is not None:
+            # Single pass over the text for all keywords
+            hits = (
+                (end + 1 - len(keyword), keyword, metadata)
+                for end, (keyword, metadata) in self.keyword_automaton.iter(text_lower)
+                if self._is_word_boundary(text_lower, end + 1 - len(keyword))
+                and self._is_word_boundary(text_lower, end + 1)
+            )
+        else:
+            hits = (
+                (pos, keyword, metadata)
+                for keyword, metadata in self.keyword_matchers.items()
+                for pos in self._find_keyword(text_lower, keyword)
+            )
+        
+        for start, keyword, metadata in hits:
+            if not detect_names and metadata["is_name"]:
+                continue
+            if domains and not self._domain_matches(metadata["detection_template"]["domain"], domains):
+                continue
+            detections.append(self._build_detection(metadata, text, text_len, start, start + len(keyword)))
         
         return detections
 
-    def _detect_arabic(self, text: str) -> List[Dict]:
-        """Detect using Arabic patterns"""
+    def _detect_arabic(self, text: str, candidates: Optional[Dict[Tuple[str, str], set]] = None,
+                       allowed: Optional[Dict[Tuple[str, str], frozenset]] = None,
+                       data: Optional[bytes] = None, text_lower: Optional[str] = None) -> List[Dict]:
+        """Detect using Arabic patterns
+        
+        candidates: Hyperscan screening result; allowed: patterns passing the domains filter;
+        data: the text already encoded in UTF-8; text_lower: the text lowercased once per request.
+        """
         detections = []
         
-        # Check if text contains Arabic characters
-        if not any('\u0600' <= char <= '\u06FF' for char in text):
+        # Check if text contains Arabic characters (ASCII text cannot)
+        if text.isascii():
+            return detections
+        if text_lower is None:
+            text_lower = text.lower()
+        if data is None:
+            data = text.encode("utf-8", "ignore")
+        if not _ARABIC_LEAD.search(data):
             return detections
         
-        for entity_name, patterns in self.arabic_patterns.items():
-            for pattern, metadata in patterns:
-                for match in pattern.finditer(text):
-                    ctx_required = metadata.get("context_required", [])
-                    if ctx_required and not self._check_context(text, match.start(), match.end(), ctx_required):
-                        continue
-                    
-                    detections.append({
-                        "entity_type": entity_name,
-                        "entity_type_en": metadata.get("entity_type_en", entity_name),
-                        "category": metadata.get("category_en", metadata["category"]),
-                        "domain": metadata.get("category_en", "").split("_")[0] if metadata.get("category_en") else "",
-                        "value": match.group(0),
-                        "start": match.start(),
-                        "end": match.end(),
-                        "sensitivity_level": metadata["sensitivity_level"],
-                        "confidence_score": 0.85,
-                        "detection_method": "regex",
-                        "source": "arabic",
-                        "context": self._get_context(text, match.start(), match.end())
-                    })
+        # Hyperscan's Unicode \s lacks \x1c-\x1f: its screening is only valid
+        # without them, otherwise fall back to the required-character triggers
+        if candidates is None or _ASCII_WHITESPACE_GAP.search(text):
+            candidates = self._trigger_candidates(text)
+        
+        text_len = len(text)
+        for entity_name, (_, patterns) in self.fused_arabic_patterns.items():
+            present = candidates.get(("arabic", entity_name))
+            if present and allowed is not None:
+                present = present.intersection(allowed.get(("arabic", entity_name), ()))
+            if not present:
+                continue
+            active = sorted(present)
+            fused_pattern, _ = self._get_fused("arabic", entity_name)
+            
+            for i, start, end in self._scan_fused(fused_pattern, patterns, text, active):
+                metadata = patterns[i][1]
+                ctx_required = metadata["context_required"]
+                if ctx_required and not self._check_context(text, text_lower, start, end, ctx_required):
+                    continue
+                
+                detections.append(self._build_detection(metadata, text, text_len, start, end))
         
         return detections
 
+    def _presidio_analyze_cached(self, text: str, lang: str) -> Tuple[Tuple[str, int, int, float], ...]:
+        """Run Presidio through an LRU keyed by the blake2b digest of the text
+        
+        Results are stored as immutable (entity_type, start, end, score) tuples.
+        """
+        key = (hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(), lang)
+        with self._presidio_cache_lock:
+            results = self._presidio_cache.get(key)
+            if results is not None:
+                self._presidio_cache.move_to_end(key)
+                return results
+        
+        if self.presidio_batcher is not None:
+            raw_results = self.presidio_batcher.submit(text, lang)
+        else:
+            raw_results = self.presidio_analyzer.analyze(text=text, language=lang)
+        results = tuple(
+            (result.entity_type, result.start, result.end, result.score)
+            for result in raw_results
+        )
+        with self._presidio_cache_lock:
+            self._presidio_cache[key] = results
+            if len(self._presidio_cache) > PRESIDIO_CACHE_SIZE:
+                self._presidio_cache.popitem(last=False)
+        return results
+
     def _detect_presidio(self, text: str, language: str = "en") -> List[Dict]:
         """Detect using Presidio NER"""
         if not self.presidio_analyzer:
@@ -443,27 +1124,28 @@ class HybridDetectionEngine:
         detections = []
         try:
             lang = "fr" if language in ["fr", "ar"] else "en"
-            results = self.presidio_analyzer.analyze(text=text, language=lang)
+            results = self._presidio_analyze_cached(text, lang)
+            text_len = len(text)
             
-            for result in results:
-                entity_info = PRESIDIO_ENTITY_MAP.get(result.entity_type, {
+            for entity_type, start, end, score in results:
+                entity_info = PRESIDIO_ENTITY_MAP.get(entity_type, {
                     "sensitivity": "medium",
                     "category": "OTHER",
                     "domain": "OTHER"
                 })
                 
                 detections.append({
-                    "entity_type": result.entity_type,
+                    "entity_type": entity_type,
                     "category": entity_info["category"],
                     "domain": entity_info["domain"],
-                    "value": text[result.start:result.end],
-                    "start": result.start,
-                    "end": result.end,
+                    "value": text[start:end],
+                    "start": start,
+                    "end": end,
                     "sensitivity_level": entity_info["sensitivity"],
-                    "confidence_score": result.score,
+                    "confidence_score": score,
                     "detection_method": "ner",
                     "source": "presidio",
-                    "context": self._get_context(text, result.start, result.end)
+                    "context": self._get_context(text, text_len, start, end)
                 })
         except Exception as e:
             print(f"Presidio error: {e}")
@@ -477,12 +1159,29 @@ class HybridDetectionEngine:
         
         # Sort by start position and confidence
         sorted_dets = sorted(detections, key=lambda x: (x["start"], -x["confidence_score"]))
+        
+        if NUMBA_AVAILABLE and len(sorted_dets) > MERGE_NUMBA_MIN:
+            n = len(sorted_dets)
+            kept = _merge_sweep(
+                np.fromiter((d["start"] for d in sorted_dets), dtype=np.int64, count=n),
+                np.fromiter((d["end"] for d in sorted_dets), dtype=np.int64, count=n),
+                np.fromiter((d["confidence_score"] for d in sorted_dets), dtype=np.float64, count=n),
+                np.fromiter((d["source"] == "custom" for d in sorted_dets), dtype=np.bool_, count=n),
+            )
+            return sorted((sorted_dets[i] for i in kept.tolist()), key=lambda x: x["start"])
+        
         merged = []
+        # Indices (ascending) of merged detections still ending after the sweep position:
+        # starts only grow, so a detection ending before the current start is final
+        active = []
         
         for det in sorted_dets:
+            start = det["start"]
+            active = [i for i in active if merged[i]["end"] > start]
             overlap = False
-            for i, existing in enumerate(merged):
-                if det["start"] < existing["end"] and det["end"] > existing["start"]:
+            for i in active:
+                existing = merged[i]
+                if det["end"] > existing["start"]:
                     # Custom patterns take priority
                     if det["source"] == "custom" and existing["source"] != "custom":
                         merged[i] = det
@@ -492,10 +1191,43 @@ class HybridDetectionEngine:
                     break
             
             if not overlap:
+                active.append(len(merged))
                 merged.append(det)
         
+        # A replacement can move a later start into an earlier slot; the list is
+        # nearly sorted, so this stays a linear Timsort pass
         return sorted(merged, key=lambda x: x["start"])
 
+    @staticmethod
+    def _domain_matches(domain: str, domains_lower: Tuple[str, ...]) -> bool:
+        """Domains filter: one of the requested domains is a substring of the detection domain"""
+        domain = domain.lower()
+        return any(dom in domain for dom in domains_lower)
+
+    def _domain_allowed_patterns(self, domains_lower: Tuple[str, ...]) -> Dict[Tuple[str, str], frozenset]:
+        """Return, by group, the custom / Arabic patterns whose detections pass the domains filter"""
+        with self._domain_filter_cache_lock:
+            allowed = self._domain_filter_cache.get(domains_lower)
+            if allowed is not None:
+                self._domain_filter_cache.move_to_end(domains_lower)
+                return allowed
+        
+        allowed = {}
+        for kind, groups in (("custom", self.fused_patterns), ("arabic", self.fused_arabic_patterns)):
+            for name, (_, patterns) in groups.items():
+                indices = frozenset(
+                    i for i, (_, metadata) in enumerate(patterns)
+                    if self._domain_matches(metadata["detection_template"]["domain"], domains_lower)
+                )
+                if indices:
+                    allowed[(kind, name)] = indices
+        
+        with self._domain_filter_cache_lock:
+            self._domain_filter_cache[domains_lower] = allowed
+            if len(self._domain_filter_cache) > DOMAIN_FILTER_CACHE_SIZE:
+                self._domain_filter_cache.popitem(last=False)
+        return allowed
+
     def analyze(self, text: str, language: str = "fr", 
                 confidence_threshold: float = 0.5,
                 detect_names: bool = True,
@@ -508,27 +1240,47 @@ class HybridDetectionEngine:
         
         all_detections = []
         
+        # Domain filter, applied inside the detectors: excluded patterns are never scanned
+        domains_lower = tuple(dom.lower() for dom in domains) if domains else None
+        allowed = self._domain_allowed_patterns(domains_lower) if domains_lower else None
+        
+        # UTF-8 bytes, shared by the Hyperscan scan and the Arabic screening
+        try:
+            data = text.encode("utf-8")
+        except UnicodeEncodeError:
+            data = None  # lone surrogates: no screening
+        
+        # Single Hyperscan pass: which custom / Arabic patterns occur at all
+        candidates = self._hyperscan_candidates(data)
+        
+        # Lowercased once, shared by context checks and keyword matching
+        text_lower = text.lower()
+        
         # 1. Custom Moroccan patterns (always)
-        custom_dets = self._detect_custom(text, detect_names=detect_names)
+        custom_dets = self._detect_custom(text, detect_names=detect_names, candidates=candidates,
+                                          allowed=allowed, text_lower=text_lower)
         all_detections.extend(custom_dets)
         
-        # 2. Arabic patterns (if Arabic text detected)
-        arabic_dets = self._detect_arabic(text)
+        # 2. Taxonomy keywords (acronyms)
+        keyword_dets = self._detect_keywords(text, detect_names=detect_names, domains=domains_lower,
+                                             text_lower=text_lower)
+        all_detections.extend(keyword_dets)
+        
+        # 3. Arabic patterns (if Arabic text detected)
+        arabic_dets = self._detect_arabic(text, candidates=candidates, allowed=allowed, data=data,
+                                          text_lower=text_lower)
         all_detections.extend(arabic_dets)
         
-        # 3. Presidio NER (if enabled and available)
+        # 4. Presidio NER (if enabled and available)
         if use_presidio and PRESIDIO_AVAILABLE:
             presidio_dets = self._detect_presidio(text, language)
+            if domains_lower:
+                presidio_dets = [d for d in presidio_dets if self._domain_matches(d["domain"], domains_lower)]
             all_detections.extend(presidio_dets)
         
         # Filter by confidence
         all_detections = [d for d in all_detections if d["confidence_score"] >= confidence_threshold]
         
-        # Filter by domain if specified
-        if domains:
-            all_detections = [d for d in all_detections 
-                           if any(dom.lower() in d.get("domain", "").lower() for dom in domains)]
-        
         # Merge overlapping
         merged = self._merge_detections(all_detections)
         
@@ -539,14 +1291,26 @@ class HybridDetectionEngine:
         if not detections:
             return text
         
-        sorted_dets = sorted(detections, key=lambda x: x["start"], reverse=True)
-        anonymized = text
+        # Single pass in text order: each segment is copied once
+        parts = []
+        cursor = 0
+        for det in sorted(detections, key=lambda x: x["start"]):
+            if det["start"] < cursor or det["start"] == det["end"]:
+                # Overlapping or empty spans: keep the right-to-left splicing semantics
+                return self._anonymize_spliced(text, detections)
+            parts.append(text[cursor:det["start"]])
+            parts.append(entity_placeholder(det["entity_type"]))
+            cursor = det["end"]
+        parts.append(text[cursor:])
         
-        for det in sorted_dets:
-            entity = det["entity_type"].upper().replace(" ", "_").replace("-", "_")
-            placeholder = f"[{entity}]"
+        return "".join(parts)
+
+    def _anonymize_spliced(self, text: str, detections: List[Dict]) -> str:
+        """Replace detections right to left, splicing into the partially anonymized text"""
+        anonymized = text
+        for det in sorted(detections, key=lambda x: x["start"], reverse=True):
+            placeholder = entity_placeholder(det["entity_type"])
             anonymized = anonymized[:det["start"]] + placeholder + anonymized[det["end"]:]
-        
         return anonymized
 
     def get_domains(self) -> List[Dict]:
@@ -582,8 +1346,8 @@ app.add_middleware(
 )
 
 @app.post("/analyze", response_model=AnalyzeResponse)
-async def analyze_text(request: AnalyzeRequest):
-    """Analyze text with hybrid detection"""
+def analyze_text(request: AnalyzeRequest):
+    """Analyze text with hybrid detection (sync: served from the threadpool)"""
     start_time = time.time()
     
     try:
@@ -603,25 +1367,21 @@ async def analyze_text(request: AnalyzeRequest):
                 det["anonymized_value"] = f"[{det['entity_type'].upper().replace(' ', '_')}]"
         
         # Summaries
-        summary = {}
-        domains_summary = {}
-        sources_summary = {}
-        
-        for det in detections:
-            summary[det["category"]] = summary.get(det["category"], 0) + 1
-            domains_summary[det.get("domain", "OTHER")] = domains_summary.get(det.get("domain", "OTHER"), 0) + 1
-            sources_summary[det.get("source", "unknown")] = sources_summary.get(det.get("source", "unknown"), 0) + 1
+        summary = dict(Counter(det["category"] for det in detections))
+        domains_summary = dict(Counter(det.get("domain", "OTHER") for det in detections))
+        sources_summary = dict(Counter(det.get("source", "unknown") for det in detections))
         
         execution_time = (time.time() - start_time) * 1000
         
         # Determine engine mode
         engine_mode = "hybrid" if PRESIDIO_AVAILABLE and request.use_presidio else "regex"
         
-        return AnalyzeResponse(
+        # Detections are internal dicts already matching the schema: no revalidation
+        return AnalyzeResponse.model_construct(
             success=True,
             text_length=len(request.text),
             detections_count=len(detections),
-            detections=[DetectionResult(**d) for d in detections],
+            detections=[DetectionResult.model_construct(**d) for d in detections],
             summary=summary,
             domains_summary=domains_summary,
             sources_summary=sources_summary,
@@ -3,16 +3,134 @@ PII/SPI Detection Engine - Domain-Based Version
 Loads taxonomies from domain JSON files or MongoDB
 Compatible with Manal's original structure
 """
+import os
 import re
 import json
+import pickle
+import asyncio
+import hashlib
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, namedtuple
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
 import time
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
 
+# Standard library regex parser, used to extract the literal prefixes of patterns
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Aho-Corasick automaton for keyword scanning (optional)
+AHOCORASICK_AVAILABLE = False
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    pass
+
+# RE2 (optional): linear-time DFA matching, used for plain ASCII text
+RE2_AVAILABLE = False
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    pass
+
+# NumPy + Numba (optional): compiled threshold + overlap sweep for large detection sets
+NUMBA_AVAILABLE = False
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    pass
+
+# Syntax that cannot live inside a fused alternation (named groups, backrefs, inline flags)
+_UNCOMBINABLE_SYNTAX = re.compile(r"\(\?P[<=]|\\[1-9]|\(\?[aiLmsux]+\)")
+
+# Literal prefix prefilter: prefixes shorter than this are too common to help
+PREFIX_MIN_LENGTH = 3
+PREFIX_MAX_PER_PATTERN = 10
+
+# Characters IGNORECASE matches to ASCII letters although str.lower() does not
+# map them to ASCII (İ, ı, ſ, Kelvin sign): lowercased searches would miss them
+_ASCII_CASE_GAP = re.compile("[\u0130\u0131\u017f\u212a]")
+
+# Syntax a pattern cannot contain to be lowercased textually: non-ASCII characters,
+# character-code escapes (\x41 is an A) and (?...) groups other than (?: (?= (?! (?<= (?<!
+_LOWERCASE_UNSAFE = re.compile(r"[^\x00-\x7f]|\\[xuUN0-7]|\(\?(?![:=!]|<[=!])")
+
+# Whitespace matched by \s under re (Unicode) but not under RE2
+_ASCII_WHITESPACE_GAP = re.compile(r"[\v\x1c-\x1f]")
+
+# Fiscal ID matches starting like a phone number are false positives
+_FISCAL_FP = re.compile(r"06|07|05|\+?212")
+
+# Below this many detections the Python merge beats the array conversion
+MERGE_NUMBA_MIN = 64
+
+# Context keyword lists longer than this get their own Aho-Corasick automaton
+CONTEXT_AUTOMATON_MIN = 8
+
+# analyze() results kept per (text digest, options) for repeated payloads
+ANALYZE_CACHE_SIZE = 4096
+
+# Domains filters (and name switch combinations) whose resolved patterns / keywords are kept
+DOMAIN_FILTER_CACHE_SIZE = 256
+
+# Taxonomies loaded from MongoDB, pickled per collection state (_ids + updated_at)
+TAXONOMY_CACHE_DIR = Path.home() / ".cache" / "pii-engine"
+
+@lru_cache(maxsize=None)
+def entity_placeholder(entity_type: str) -> str:
+    """Anonymization placeholder of an entity type (e.g. [NUMÉRO_CNSS])"""
+    return f"[{entity_type.upper().replace(' ', '_').replace('-', '_')}]"
+
+def _merge_sweep(order, starts, ends, confs):
+    """Overlap sweep of _merge_overlapping_detections over detections visited in order
+    
+    order lists the detections passing the threshold, sorted by (start, -confidence).
+    Returns the indices of the kept detections, in merged-slot order.
+    """
+    n = len(order)
+    slots = np.empty(n, np.int64)   # detection held by each merged slot
+    active = np.empty(n, np.int64)  # slots still ending after the sweep position
+    n_slots = 0
+    n_active = 0
+    for k in range(n):
+        det = order[k]
+        start = starts[det]
+        kept = 0
+        for a in range(n_active):
+            if ends[slots[active[a]]] > start:
+                active[kept] = active[a]
+                kept += 1
+        n_active = kept
+        overlapping = False
+        for a in range(n_active):
+            existing = slots[active[a]]
+            if ends[det] > starts[existing]:
+                if confs[det] > confs[existing]:
+                    slots[active[a]] = det
+                overlapping = True
+                break
+        if not overlapping:
+            active[n_active] = n_slots
+            n_active += 1
+            slots[n_slots] = det
+            n_slots += 1
+    return slots[:n_slots]
+
+if NUMBA_AVAILABLE:
+    _merge_sweep = njit("int64[:](int64[:], int64[:], int64[:], float64[:])", cache=True, nogil=True)(_merge_sweep)
+
 # ====================================================================
 # MODÈLES DE DONNÉES
 # ====================================================================
@@ -37,6 +155,14 @@ class AnalyzeRequest(BaseModel):
     detect_names: bool = Field(default=False, description="Activer la détection de noms")
     domains: Optional[List[str]] = Field(default=None, description="Filtrer par domaines (ex: ['medical', 'financier'])")
 
+class BatchAnalyzeRequest(BaseModel):
+    texts: List[str] = Field(..., description="Textes à analyser", min_length=1)
+    language: str = Field(default="fr", description="Langue des textes (fr/en/ar)")
+    anonymize: bool = Field(default=False, description="Anonymiser les résultats")
+    confidence_threshold: float = Field(default=0.5, ge=0.0, le=1.0, description="Seuil de confiance minimum")
+    detect_names: bool = Field(default=False, description="Activer la détection de noms")
+    domains: Optional[List[str]] = Field(default=None, description="Filtrer par domaines (ex: ['medical', 'financier'])")
+
 class DetectionResult(BaseModel):
     entity_type: str
     category: str
@@ -60,6 +186,46 @@ class AnalyzeResponse(BaseModel):
     execution_time_ms: float
     anonymized_text: Optional[str] = None
 
+# Metadata of a compiled pattern, normalized once at compile time
+PatternMeta = namedtuple("PatternMeta", [
+    "entity_type", "category", "domain_id", "domain_name", "sensitivity_level", "type",
+    "context_required", "context_required_lower", "context_automaton", "is_fiscal", "placeholder"
+])
+
+class Detection:
+    """A detection inside the engine; analyze() turns the kept ones into dicts"""
+    __slots__ = ("entity_type", "category", "domain", "value", "start", "end",
+                 "sensitivity_level", "confidence_score", "detection_method", "placeholder")
+
+    def __init__(self, entity_type: str, category: str, domain: str, value: str, start: int, end: int,
+                 sensitivity_level: str, confidence_score: float, detection_method: str, placeholder: str):
+        self.entity_type = entity_type
+        self.category = category
+        self.domain = domain
+        self.value = value
+        self.start = start
+        self.end = end
+        self.sensitivity_level = sensitivity_level
+        self.confidence_score = confidence_score
+        self.detection_method = detection_method
+        self.placeholder = placeholder
+
+    def to_dict(self, context: str) -> Dict:
+        """Materialize the API dict (context is only built for kept detections)"""
+        return {
+            "entity_type": self.entity_type,
+            "category": self.category,
+            "domain": self.domain,
+            "value": self.value,
+            "start": self.start,
+            "end": self.end,
+            "sensitivity_level": self.sensitivity_level,
+            "confidence_score": self.confidence_score,
+            "detection_method": self.detection_method,
+            "context": context,
+            "placeholder": self.placeholder
+        }
+
 # ====================================================================
 # CLASSE PRINCIPALE DE DÉTECTION
 # ====================================================================
@@ -78,7 +244,23 @@ class PIIDetectionEngine:
             self._load_from_files()
         
         self.compiled_patterns = self._compile_patterns()
+        self.fused_patterns = self._fuse_patterns(self.compiled_patterns)
+        self.lowered_patterns = self._fuse_patterns(self._lower_patterns(self.compiled_patterns))
+        # Compiled alternations by (kind, category), filled by _get_fused
+        self._fused_cache: Dict[Tuple[str, str], Tuple] = {}
+        self.prefix_automaton, self.prefixed_patterns = self._build_prefix_automaton()
+        self.re2_set, self.re2_set_members, self.re2_unscreened = self._build_re2_set()
         self.keyword_matchers = self._build_keyword_matchers()
+        self.keyword_automaton = self._build_keyword_automaton()
+        
+        # LRU of analyze() results; bound to this engine, so a reloaded taxonomy starts empty
+        self._analysis_cache: "OrderedDict[Tuple, Tuple[Dict, ...]]" = OrderedDict()
+        self._analysis_cache_lock = threading.Lock()
+        
+        # Patterns and keywords resolved per domains filter (see _active_patterns)
+        self._active_patterns_cache: "OrderedDict[Tuple, Dict[str, List[int]]]" = OrderedDict()
+        self._allowed_keywords_cache: "OrderedDict[Tuple[str, ...], frozenset]" = OrderedDict()
+        self._domain_filter_cache_lock = threading.Lock()
         
         # French stopwords for filtering
         self.french_stopwords = {
@@ -140,9 +322,23 @@ class PIIDetectionEngine:
             from backend.database.mongodb import sync_db, COLLECTIONS
             
             taxonomies_col = sync_db[COLLECTIONS["taxonomies"]]
-            cursor = taxonomies_col.find({})
             
-            for doc in cursor:
+            # The collection state (two small fields per document) is cheap to read;
+            # an unchanged collection loads from the pickled copy, not the full documents
+            state = sorted(
+                (str(doc["_id"]), str(doc.get("updated_at", "")))
+                for doc in taxonomies_col.find({}, projection={"_id": 1, "updated_at": 1})
+            )
+            digest = hashlib.blake2b(repr(state).encode("utf-8"), digest_size=16).hexdigest()
+            cache_path = TAXONOMY_CACHE_DIR / f"taxonomy-{digest}.pkl"
+            docs = self._read_taxonomy_cache(cache_path)
+            if docs is None:
+                # Only the fields used below, fetched in large batches
+                cursor = taxonomies_col.find({}, projection={"metadata": 1, "categories": 1, "_id": 0}).batch_size(256)
+                docs = list(cursor)
+                self._write_taxonomy_cache(cache_path, docs)
+            
+            for doc in docs:
                 domain_id = doc.get("metadata", {}).get("domain_id", "UNKNOWN")
                 domain_name = doc.get("metadata", {}).get("domain_name", "UNKNOWN")
                 
@@ -163,6 +359,34 @@ class PIIDetectionEngine:
             print("  📁 Falling back to JSON files...")
             self._load_from_files()
 
+    @staticmethod
+    def _read_taxonomy_cache(cache_path: Path) -> Optional[List[Dict]]:
+        """Return the pickled taxonomy documents, or None if missing or unreadable"""
+        try:
+            with open(cache_path, "rb") as f:
+                docs = pickle.load(f)
+            if isinstance(docs, list):
+                print(f"  📦 Taxonomies loaded from cache {cache_path.name}")
+                return docs
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"  ⚠️ Ignoring taxonomy cache {cache_path.name}: {e}")
+        return None
+
+    @staticmethod
+    def _write_taxonomy_cache(cache_path: Path, docs: List[Dict]):
+        """Pickle the taxonomy documents (temporary file then rename: never a partial cache)"""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(docs, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"  ⚠️ Could not write taxonomy cache: {e}")
+            tmp_path.unlink(missing_ok=True)
+
     def _load_legacy_taxonomy(self):
         """Fallback: Load Manal's original taxonomy file"""
         legacy_file = Path(__file__).parent / "taxonomie.json"
@@ -184,7 +408,7 @@ class PIIDetectionEngine:
             except Exception as e:
                 print(f"  ❌ Error loading legacy taxonomy: {e}")
 
-    def _compile_patterns(self) -> Dict[str, List[Tuple[re.Pattern, Dict]]]:
+    def _compile_patterns(self) -> Dict[str, List[Tuple[re.Pattern, PatternMeta]]]:
         """Compile all regex patterns from taxonomies"""
         compiled = {}
         
@@ -200,27 +424,363 @@ class PIIDetectionEngine:
                 patterns = subclass.get("regex_patterns", [])
                 sensitivity = subclass.get("sensitivity_level", "unknown")
                 context_required = subclass.get("context_required", [])
+                context_required_lower = tuple(kw.lower() for kw in context_required)
+                context_automaton = self._build_context_automaton(context_required_lower)
+                metadata = PatternMeta(
+                    entity_type=entity_name,
+                    category=category_name,
+                    domain_id=domain_id,
+                    domain_name=category.get("domain_name", ""),
+                    sensitivity_level=sensitivity,
+                    type=category.get("type", "PII"),
+                    context_required=tuple(context_required),
+                    context_required_lower=context_required_lower,
+                    context_automaton=context_automaton,
+                    is_fiscal="fiscal" in entity_name.lower(),
+                    placeholder=entity_placeholder(entity_name)
+                )
                 
                 for pattern_str in patterns:
                     try:
                         compiled_pattern = re.compile(pattern_str, re.IGNORECASE | re.UNICODE)
-                        compiled[category_name].append((
-                            compiled_pattern,
-                            {
-                                "entity_type": entity_name,
-                                "category": category_name,
-                                "domain_id": domain_id,
-                                "domain_name": category.get("domain_name", ""),
-                                "sensitivity_level": sensitivity,
-                                "type": category.get("type", "PII"),
-                                "context_required": context_required
-                            }
-                        ))
+                        compiled[category_name].append((compiled_pattern, metadata))
                     except re.error as e:
                         print(f"  ⚠️ Regex error for {entity_name}: {e}")
         
         return compiled
 
+    @staticmethod
+    def _build_context_automaton(keywords: Tuple[str, ...]):
+        """Aho-Corasick automaton over a long context keyword list (None for short lists)"""
+        if not AHOCORASICK_AVAILABLE or len(keywords) <= CONTEXT_AUTOMATON_MIN:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return automaton
+
+    @staticmethod
+    def _lowercase_pattern(pattern_str: str) -> Optional[str]:
+        """Rewrite an IGNORECASE pattern to match lowercased text without the flag
+        
+        ASCII letters are lowercased outside escapes; class ranges must stay
+        within one case, hold no letter, or hold every letter. Returns None
+        when the pattern does not qualify.
+        """
+        if _LOWERCASE_UNSAFE.search(pattern_str):
+            return None
+        
+        out = []
+        i = 0
+        n = len(pattern_str)
+        while i < n:
+            c = pattern_str[i]
+            if c == "\\":
+                out.append(pattern_str[i:i + 2])
+                i += 2
+            elif c == "[":
+                # Character class: a leading ] (after an optional ^) is a literal
+                j = i + 1
+                if j < n and pattern_str[j] == "^":
+                    j += 1
+                if j < n and pattern_str[j] == "]":
+                    j += 1
+                out.append(pattern_str[i:j])
+                i = j
+                while i < n and pattern_str[i] != "]":
+                    c = pattern_str[i]
+                    if c == "\\":
+                        out.append(pattern_str[i:i + 2])
+                        i += 2
+                    elif i + 2 < n and pattern_str[i + 1] == "-" and pattern_str[i + 2] not in "]\\":
+                        low, high = c, pattern_str[i + 2]
+                        letters = {chr(code) for code in range(ord(low), ord(high) + 1) if chr(code).isalpha()}
+                        if low.isupper() and high.isupper():
+                            out.append(f"{low.lower()}-{high.lower()}")
+                        elif (low.islower() and high.islower()) or not letters or len(letters) == 52:
+                            out.append(f"{low}-{high}")
+                        else:
+                            return None
+                        i += 3
+                    else:
+                        out.append(c.lower())
+                        i += 1
+                if i < n:
+                    out.append("]")
+                    i += 1
+            else:
+                out.append(c.lower())
+                i += 1
+        return "".join(out)
+
+    def _lower_patterns(self, compiled: Dict[str, List[Tuple[re.Pattern, PatternMeta]]]) -> Dict[str, List[Tuple[Optional[re.Pattern], PatternMeta]]]:
+        """Compile, for each category, the lowercased form of its patterns (None if not eligible)
+        
+        Run against lowercased text, these need no per-character case folding.
+        """
+        lowered = {}
+        for category_name, patterns in compiled.items():
+            lowered[category_name] = []
+            for pattern, metadata in patterns:
+                lowered_pattern = None
+                source = self._lowercase_pattern(pattern.pattern)
+                if source is not None:
+                    try:
+                        lowered_pattern = re.compile(source, re.UNICODE)
+                    except re.error:
+                        lowered_pattern = None
+                lowered[category_name].append((lowered_pattern, metadata))
+        return lowered
+
+    @staticmethod
+    def _fuse_patterns(compiled: Dict[str, List[Tuple[Optional[re.Pattern], PatternMeta]]]) -> Dict[str, Tuple[Optional[str], List[Tuple[Optional[re.Pattern], PatternMeta]]]]:
+        """Build, for each category, the source of one alternation of all its patterns
+        
+        Alternative i is named g<i>, so the match's lastgroup gives back its
+        metadata; None entries are left out. A category whose patterns cannot
+        be fused gets a None source and is scanned pattern by pattern. Sources
+        are compiled lazily by _get_fused.
+        """
+        fused = {}
+        for category_name, patterns in compiled.items():
+            source = None
+            sources = [(i, p.pattern) for i, (p, _) in enumerate(patterns) if p is not None]
+            if sources and not any(_UNCOMBINABLE_SYNTAX.search(source) for _, source in sources):
+                source = "|".join(f"(?P<g{i}>{source})" for i, source in sources)
+            fused[category_name] = (source, patterns)
+        return fused
+
+    def _get_fused(self, kind: str, category_name: str) -> Tuple[Optional[re.Pattern], List[Tuple[Optional[re.Pattern], PatternMeta]]]:
+        """Compile a category's alternation on first use ("custom", "lower" or "re2")
+        
+        "custom" is the IGNORECASE form, "lower" the lowercased form and "re2"
+        the lowercased form recompiled for plain ASCII bytes. Requests that
+        never reach a category never compile it.
+        """
+        key = (kind, category_name)
+        fused = self._fused_cache.get(key)
+        if fused is not None:
+            return fused
+        
+        source, patterns = (self.fused_patterns if kind == "custom" else self.lowered_patterns)[category_name]
+        if kind == "re2":
+            fused = self._compile_re2_group(source, patterns)
+        else:
+            fused_pattern = None
+            if source is not None:
+                try:
+                    fused_pattern = re.compile(source, re.IGNORECASE | re.UNICODE if kind == "custom" else re.UNICODE)
+                except re.error:
+                    fused_pattern = None
+            fused = (fused_pattern, patterns)
+        # Concurrent first uses may both compile: the first stored result is kept
+        return self._fused_cache.setdefault(key, fused)
+
+    @staticmethod
+    def _compile_re2(source: bytes):
+        """Compile a lowercased pattern for plain ASCII bytes, with RE2 when it accepts it
+        
+        Returns (pattern, compiled by RE2). RE2's $ only matches at the very end
+        (re's also before a final newline), so such patterns stay on re.
+        """
+        if b"$" not in source:
+            try:
+                return re2.compile(source), True
+            except re2.error:
+                pass
+        return re.compile(source), False
+
+    def _compile_re2_group(self, source: Optional[str], patterns: List[Tuple[Optional[re.Pattern], PatternMeta]]) -> Tuple:
+        """Recompile a lowercased category for RE2 scans of plain ASCII text
+        
+        Entries without a lowercased form stay None.
+        """
+        fused_pattern = None
+        if source is not None:
+            fused_pattern, _ = self._compile_re2(source.encode("ascii"))
+        
+        group_patterns = [
+            (None if pattern is None else self._compile_re2(pattern.pattern.encode("ascii"))[0], metadata)
+            for pattern, metadata in patterns
+        ]
+        return fused_pattern, group_patterns
+
+    def _build_re2_set(self):
+        """Build one RE2 set over the RE2-compatible lowercased patterns
+        
+        Returns the set (None if unavailable), the (category, index) of each
+        member, and by category the lowercased patterns the set does not screen.
+        """
+        if not RE2_AVAILABLE:
+            return None, [], {}
+        
+        members = []
+        unscreened = {}
+        pattern_set = re2.Set.SearchSet(re2.Options())
+        for category_name, (_, patterns) in self.lowered_patterns.items():
+            for i, (pattern, _) in enumerate(patterns):
+                if pattern is None:
+                    continue
+                source = pattern.pattern.encode("ascii")
+                try:
+                    if b"$" in source:
+                        raise re2.error("$ semantics differ")
+                    pattern_set.Add(source)
+                    members.append((category_name, i))
+                except re2.error:
+                    unscreened.setdefault(category_name, set()).add(i)
+        
+        if not members:
+            return None, [], unscreened
+        pattern_set.Compile()
+        return pattern_set, members, unscreened
+
+    def _re2_screen(self, encoded: bytes) -> Dict[str, set]:
+        """Return, by category, the lowercased patterns that can match the encoded text"""
+        present = {category_name: set(indices) for category_name, indices in self.re2_unscreened.items()}
+        if self.re2_set is not None:
+            for member in self.re2_set.Match(encoded) or ():
+                category_name, i = self.re2_set_members[member]
+                present.setdefault(category_name, set()).add(i)
+        return present
+
+    @classmethod
+    def _literal_prefixes(cls, items) -> List[str]:
+        """Lowercased ASCII literals, one of which starts every match ([] if unknown)"""
+        prefix = []
+        for op, av in items:
+            if op is sre_parse.AT and not prefix:
+                continue
+            if op is sre_parse.LITERAL and av < 128:
+                prefix.append(chr(av).lower())
+                continue
+            if not prefix:
+                if op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+                    return cls._literal_prefixes(av[3])
+                if op is sre_parse.BRANCH:
+                    prefixes = [cls._literal_prefixes(branch) for branch in av[1]]
+                    if not all(prefixes):
+                        return []
+                    return [p for branch in prefixes for p in branch]
+            break
+        return ["".join(prefix)] if prefix else []
+
+    def _build_prefix_automaton(self):
+        """Index the literal prefixes of the patterns in one Aho-Corasick automaton
+        
+        Returns the automaton (prefix -> [(category, pattern index)]) and, by
+        category, the indices of the patterns it covers; (None, {}) if unavailable.
+        """
+        if not AHOCORASICK_AVAILABLE:
+            return None, {}
+        
+        owners = {}
+        prefixed = {}
+        for category_name, (_, patterns) in self.fused_patterns.items():
+            for i, (pattern, _) in enumerate(patterns):
+                try:
+                    prefixes = self._literal_prefixes(sre_parse.parse(pattern.pattern))
+                except Exception:
+                    continue
+                if not prefixes or len(prefixes) > PREFIX_MAX_PER_PATTERN:
+                    continue
+                if any(len(prefix) < PREFIX_MIN_LENGTH for prefix in prefixes):
+                    continue
+                for prefix in set(prefixes):
+                    owners.setdefault(prefix, []).append((category_name, i))
+                prefixed.setdefault(category_name, set()).add(i)
+        
+        if not owners:
+            return None, {}
+        automaton = ahocorasick.Automaton()
+        for prefix, members in owners.items():
+            automaton.add_word(prefix, (len(prefix), members))
+        automaton.make_automaton()
+        return automaton, prefixed
+
+    @staticmethod
+    def _lowercase_safe(text: str, text_lower: str) -> bool:
+        """Whether lowercased searches agree with IGNORECASE ones on this text
+        
+        Not when lowercasing changed its length (offsets would shift) or it
+        holds a character IGNORECASE folds to an ASCII letter.
+        """
+        return len(text_lower) == len(text) and not _ASCII_CASE_GAP.search(text)
+
+    def _prefix_candidates(self, text_lower: str) -> Optional[Dict[str, Dict[int, set]]]:
+        """Return, by category and pattern, the positions where a literal prefix occurs"""
+        if self.prefix_automaton is None:
+            return None
+        
+        candidates = {}
+        for end, (length, members) in self.prefix_automaton.iter(text_lower):
+            start = end + 1 - length
+            for category_name, i in members:
+                candidates.setdefault(category_name, {}).setdefault(i, set()).add(start)
+        return candidates
+
+    @staticmethod
+    def _match_at(pattern: re.Pattern, index: int, text: str, positions) -> List[Tuple[int, int, int]]:
+        """Return (pattern index, start, end) hits starting at candidate positions, as finditer would"""
+        hits = []
+        last_end = 0
+        for pos in sorted(positions):
+            if pos < last_end:
+                continue
+            match = pattern.match(text, pos)
+            if match is not None:
+                hits.append((index, pos, match.end()))
+                last_end = max(match.end(), pos + 1)
+        return hits
+
+    @staticmethod
+    def _scan_fused(fused_pattern: Optional[re.Pattern], patterns: List[Tuple[re.Pattern, PatternMeta]],
+                    text: str, active: List[int]) -> List[Tuple[int, int, int]]:
+        """Return (pattern index, start, end) hits, as per-pattern finditer would
+        
+        The alternation finds every position where some pattern matches; the
+        search resumes one character later so a long match does not hide one
+        starting inside it. The other active patterns are checked with an
+        anchored match at each position, and overlapping hits of one pattern
+        are dropped like finditer does.
+        """
+        hits = []
+        if fused_pattern is None:
+            for i in active:
+                for match in patterns[i][0].finditer(text):
+                    hits.append((i, match.start(), match.end()))
+            return hits
+        
+        last_end = [0] * len(patterns)
+        pos = 0
+        length = len(text)
+        while pos <= length:
+            match = fused_pattern.search(text, pos)
+            if match is None:
+                break
+            start = match.start()
+            winner = int(match.lastgroup[1:])
+            
+            for i in active:
+                if start < last_end[i]:
+                    continue
+                if i == winner:
+                    end = match.end()
+                else:
+                    anchored = patterns[i][0].match(text, start)
+                    if anchored is None:
+                        continue
+                    end = anchored.end()
+                hits.append((i, start, end))
+                last_end[i] = max(end, start + 1)
+            
+            pos = start + 1
+        
+        hits.sort()
+        return hits
+
     def _build_keyword_matchers(self) -> Dict[str, Dict]:
         """Build keyword matchers from acronyms"""
         matchers = {}
@@ -237,11 +797,77 @@ class PIIDetectionEngine:
                             "category": category.get("class", ""),
                             "domain_id": category.get("domain_id", ""),
                             "domain_name": category.get("domain_name", ""),
-                            "sensitivity_level": subclass.get("sensitivity_level", "unknown")
+                            "sensitivity_level": subclass.get("sensitivity_level", "unknown"),
+                            "placeholder": entity_placeholder(entity_name)
                         }
         
         return matchers
 
+    def _build_keyword_automaton(self):
+        """Build one Aho-Corasick automaton over all keywords (None if unavailable)"""
+        if not AHOCORASICK_AVAILABLE or not self.keyword_matchers:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for index, keyword in enumerate(self.keyword_matchers):
+            automaton.add_word(keyword, (index, keyword))
+        automaton.make_automaton()
+        return automaton
+
+    @staticmethod
+    def _is_word_boundary(text: str, pos: int) -> bool:
+        """Same as \\b: word / non-word transition at the given position"""
+        before = pos > 0 and (text[pos - 1].isalnum() or text[pos - 1] == "_")
+        after = pos < len(text) and (text[pos].isalnum() or text[pos] == "_")
+        return before != after
+
+    def _scan_keywords(self, text_lower: str) -> List[Tuple[str, int]]:
+        """Find word-delimited keywords in a single automaton pass
+        
+        Returns (keyword, start) in the order of the per-keyword finditer loop:
+        keyword order, then position, without overlapping hits of the same keyword.
+        """
+        hits = []
+        for end, (index, keyword) in self.keyword_automaton.iter(text_lower):
+            start = end + 1 - len(keyword)
+            if self._is_word_boundary(text_lower, start) and self._is_word_boundary(text_lower, end + 1):
+                hits.append((index, start, keyword))
+        return self._order_keyword_hits(hits)
+
+    def _scan_keywords_batch(self, texts_lower: List[str]) -> List[List[Tuple[str, int]]]:
+        """_scan_keywords for a batch: one automaton pass over the joined texts
+        
+        The record separator is not a word character, so word boundaries are
+        those of each text; hits are mapped back to their text with bisect.
+        """
+        joined = "\x1e".join(texts_lower)
+        offsets = []
+        offset = 0
+        for text_lower in texts_lower:
+            offsets.append(offset)
+            offset += len(text_lower) + 1
+        
+        hits = [[] for _ in texts_lower]
+        for end, (index, keyword) in self.keyword_automaton.iter(joined):
+            start = end + 1 - len(keyword)
+            if self._is_word_boundary(joined, start) and self._is_word_boundary(joined, end + 1):
+                doc = bisect_right(offsets, start) - 1
+                hits[doc].append((index, start - offsets[doc], keyword))
+        return [self._order_keyword_hits(doc_hits) for doc_hits in hits]
+
+    @staticmethod
+    def _order_keyword_hits(hits: List[Tuple[int, int, str]]) -> List[Tuple[str, int]]:
+        """Sort (index, start, keyword) hits like the finditer loop and drop same-keyword overlaps"""
+        hits.sort()
+        found = []
+        last_index, last_end = -1, 0
+        for index, start, keyword in hits:
+            if index == last_index and start < last_end:
+                continue
+            found.append((keyword, start))
+            last_index, last_end = index, start + len(keyword)
+        return found
+
     def _get_context(self, text: str, start: int, end: int, context_size: int = 30) -> str:
         """Extract context around a detection"""
         ctx_start = max(0, start - context_size)
@@ -255,163 +881,373 @@ class PIIDetectionEngine:
         
         return context
 
-    def _check_context_required(self, text: str, match_start: int, match_end: int, 
-                                context_keywords: List[str], window_size: int = 50) -> bool:
-        """Check if required context keywords are present"""
+    def _check_context_required(self, text: str, text_lower: str, match_start: int, match_end: int, 
+                                context_keywords: Tuple[str, ...], window_size: int = 50,
+                                automaton=None) -> bool:
+        """Check if required context keywords (already lowercased) are present
+        
+        automaton: optional Aho-Corasick automaton over the same keywords.
+        """
         if not context_keywords:
             return True
         
         ctx_start = max(0, match_start - window_size)
-        ctx_end = min(len(text), match_end + window_size)
-        context = text[ctx_start:ctx_end].lower()
+        ctx_end = match_end + window_size
+        if len(text_lower) != len(text):
+            # Lowercasing changed the length: offsets only hold in the original text
+            text_lower = text[ctx_start:ctx_end].lower()
+            ctx_start, ctx_end = 0, len(text_lower)
         
-        return any(keyword.lower() in context for keyword in context_keywords)
+        if automaton is not None:
+            for _ in automaton.iter(text_lower, ctx_start, min(ctx_end, len(text_lower))):
+                return True
+            return False
+        # Bounded find: searches the window without slicing it out
+        return any(text_lower.find(keyword, ctx_start, ctx_end) >= 0 for keyword in context_keywords)
+
+    @staticmethod
+    def _domains_key(domains_filter: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+        """Normalize a domains filter into a hashable key (None: no filtering)"""
+        if not domains_filter:
+            return None
+        return tuple(sorted({d.lower() for d in domains_filter}))
+
+    @staticmethod
+    def _domain_matches(domain_id: str, domain_name: str, domains_lower: Tuple[str, ...]) -> bool:
+        """Domains filter: a requested domain is a substring of the domain id or name"""
+        domain_id = domain_id.lower()
+        domain_name = domain_name.lower()
+        return any(d in domain_id or d in domain_name for d in domains_lower)
+
+    def _active_patterns(self, domains_lower: Optional[Tuple[str, ...]], detect_names: bool) -> Dict[str, List[int]]:
+        """Return, by category, the indices of the patterns passing the domains filter and name switch"""
+        key = (domains_lower, detect_names)
+        with self._domain_filter_cache_lock:
+            active = self._active_patterns_cache.get(key)
+            if active is not None:
+                self._active_patterns_cache.move_to_end(key)
+                return active
+        
+        active = {}
+        for category_name, (_, patterns) in self.fused_patterns.items():
+            indices = [
+                i for i, (_, metadata) in enumerate(patterns)
+                if (domains_lower is None or self._domain_matches(metadata.domain_id, metadata.domain_name, domains_lower))
+                # Skip name detection if not enabled
+                and (detect_names or "Nom" not in metadata.entity_type)
+            ]
+            if indices:
+                active[category_name] = indices
+        
+        with self._domain_filter_cache_lock:
+            self._active_patterns_cache[key] = active
+            if len(self._active_patterns_cache) > DOMAIN_FILTER_CACHE_SIZE:
+                self._active_patterns_cache.popitem(last=False)
+        return active
+
+    def _allowed_keywords(self, domains_lower: Tuple[str, ...]) -> frozenset:
+        """Return the keywords passing the domains filter"""
+        with self._domain_filter_cache_lock:
+            allowed = self._allowed_keywords_cache.get(domains_lower)
+            if allowed is not None:
+                self._allowed_keywords_cache.move_to_end(domains_lower)
+                return allowed
+        
+        allowed = frozenset(
+            keyword for keyword, metadata in self.keyword_matchers.items()
+            if self._domain_matches(metadata["domain_id"], metadata["domain_name"], domains_lower)
+        )
+        
+        with self._domain_filter_cache_lock:
+            self._allowed_keywords_cache[domains_lower] = allowed
+            if len(self._allowed_keywords_cache) > DOMAIN_FILTER_CACHE_SIZE:
+                self._allowed_keywords_cache.popitem(last=False)
+        return allowed
 
     def _detect_with_regex(self, text: str, domains_filter: Optional[List[str]] = None, 
-                           detect_names: bool = False) -> List[Dict]:
-        """Detection using regex patterns"""
+                           detect_names: bool = False, text_lower: Optional[str] = None) -> List[Detection]:
+        """Detection using regex patterns (text_lower: the text lowercased once per request)"""
         detections = []
+        if text_lower is None:
+            text_lower = text.lower()
         
-        for category_name, patterns in self.compiled_patterns.items():
-            for pattern, metadata in patterns:
-                # Apply domain filter
-                if domains_filter:
-                    domain_id = metadata.get("domain_id", "")
-                    domain_name = metadata.get("domain_name", "").lower()
-                    if not any(d.lower() in domain_id.lower() or d.lower() in domain_name 
-                              for d in domains_filter):
+        # Lowercased patterns and the prefix prefilter need a case-safe text
+        lowercase_safe = self._lowercase_safe(text, text_lower)
+        
+        # Plain ASCII text: lowercased patterns run under RE2 on the encoded text
+        # (same positions), after one RE2 set pass rules out absent patterns
+        use_re2 = RE2_AVAILABLE and text.isascii() and not _ASCII_WHITESPACE_GAP.search(text)
+        if use_re2:
+            subject_lower = text_lower.encode("ascii")
+            screened = self._re2_screen(subject_lower)
+        else:
+            subject_lower = text_lower
+        
+        # Positions of the literal prefixes, found in one pass for all patterns
+        candidates = self._prefix_candidates(text_lower) if lowercase_safe else None
+        
+        # Domain filter and name switch, evaluated once per filter combination
+        active_patterns = self._active_patterns(self._domains_key(domains_filter), detect_names)
+        
+        for category_name, active in active_patterns.items():
+            patterns = self.fused_patterns[category_name][1]
+            if use_re2:
+                lower_kind = "re2"
+                present = screened.get(category_name, ())
+                lowered = self.lowered_patterns[category_name][1]
+                active = [i for i in active if lowered[i][0] is None or i in present]
+                if not active:
+                    continue
+            else:
+                lower_kind = "lower"
+            fused_lower, patterns_lower = self._get_fused(lower_kind, category_name)
+            hits = []
+            if candidates is not None:
+                # Patterns with a literal prefix only run where it occurs
+                prefixed = self.prefixed_patterns.get(category_name, ())
+                found = candidates.get(category_name, {})
+                for i in active:
+                    if i in prefixed and i in found:
+                        if patterns_lower[i][0] is not None:
+                            hits.extend(self._match_at(patterns_lower[i][0], i, subject_lower, found[i]))
+                        else:
+                            hits.extend(self._match_at(patterns[i][0], i, text, found[i]))
+                active = [i for i in active if i not in prefixed]
+            
+            # One pass for the rest of the category: lowercased patterns on the
+            # lowercased text, the others with IGNORECASE on the text
+            if lowercase_safe:
+                lower_active = [i for i in active if patterns_lower[i][0] is not None]
+                if lower_active:
+                    hits.extend(self._scan_fused(fused_lower, patterns_lower, subject_lower, lower_active))
+                active = [i for i in active if patterns_lower[i][0] is None]
+            if active:
+                fused_pattern, _ = self._get_fused("custom", category_name)
+                hits.extend(self._scan_fused(fused_pattern, patterns, text, active))
+            hits.sort()
+            
+            for i, start, end in hits:
+                metadata = patterns[i][1]
+                matched_value = text[start:end]
+                
+                # Context validation
+                context_required = metadata.context_required_lower
+                if context_required:
+                    if not self._check_context_required(text, text_lower, start, end, context_required,
+                                                        automaton=metadata.context_automaton):
                         continue
                 
-                # Skip name detection if not enabled
-                if not detect_names and "Nom" in metadata.get("entity_type", ""):
+                # Filter false positives for fiscal IDs
+                if metadata.is_fiscal and _FISCAL_FP.match(matched_value):
                     continue
                 
-                for match in pattern.finditer(text):
-                    matched_value = match.group(0)
-                    
-                    # Context validation
-                    context_required = metadata.get("context_required", [])
-                    if context_required:
-                        if not self._check_context_required(text, match.start(), match.end(), context_required):
-                            continue
-                    
-                    # Filter false positives for fiscal IDs
-                    if "fiscal" in metadata.get("entity_type", "").lower():
-                        if matched_value.startswith(('06', '07', '05', '+212', '212')):
-                            continue
-                    
-                    detection = {
-                        "entity_type": metadata["entity_type"],
-                        "category": metadata["category"],
-                        "domain": metadata.get("domain_name", ""),
-                        "value": matched_value,
-                        "start": match.start(),
-                        "end": match.end(),
-                        "sensitivity_level": metadata["sensitivity_level"],
-                        "confidence_score": 0.9,
-                        "detection_method": "regex",
-                        "context": self._get_context(text, match.start(), match.end())
-                    }
-                    detections.append(detection)
+                detections.append(Detection(
+                    metadata.entity_type, metadata.category, metadata.domain_name,
+                    matched_value, start, end, metadata.sensitivity_level, 0.9, "regex",
+                    metadata.placeholder
+                ))
         
         return detections
 
-    def _detect_with_keywords(self, text: str, domains_filter: Optional[List[str]] = None) -> List[Dict]:
-        """Detection using keyword matching"""
+    def _detect_with_keywords(self, text: str, domains_filter: Optional[List[str]] = None,
+                              text_lower: Optional[str] = None,
+                              hits: Optional[List[Tuple[str, int]]] = None) -> List[Detection]:
+        """Detection using keyword matching
+        
+        text_lower: the text lowercased once per request; hits: automaton hits
+        already found by a batch scan.
+        """
         detections = []
-        text_lower = text.lower()
-        
-        for keyword, metadata in self.keyword_matchers.items():
-            # Apply domain filter
-            if domains_filter:
-                domain_id = metadata.get("domain_id", "")
-                domain_name = metadata.get("domain_name", "").lower()
-                if not any(d.lower() in domain_id.lower() or d.lower() in domain_name 
-                          for d in domains_filter):
-                    continue
-            
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            for match in re.finditer(pattern, text_lower):
-                pos = match.start()
-                
-                detection = {
-                    "entity_type": metadata["entity_type"],
-                    "category": metadata["category"],
-                    "domain": metadata.get("domain_name", ""),
-                    "value": text[pos:pos + len(keyword)],
-                    "start": pos,
-                    "end": pos + len(keyword),
-                    "sensitivity_level": metadata["sensitivity_level"],
-                    "confidence_score": 0.75,
-                    "detection_method": "keyword",
-                    "context": self._get_context(text, pos, pos + len(keyword))
-                }
-                detections.append(detection)
+        if text_lower is None:
+            text_lower = text.lower()
+        
+        # Apply domain filter
+        domains_lower = self._domains_key(domains_filter)
+        allowed = self._allowed_keywords(domains_lower) if domains_lower is not None else None
+        
+        if self.keyword_automaton is not None:
+            if hits is None:
+                hits = self._scan_keywords(text_lower)
+            if allowed is not None:
+                hits = [(keyword, pos) for keyword, pos in hits if keyword in allowed]
+        else:
+            hits = [
+                (keyword, match.start())
+                for keyword in self.keyword_matchers
+                if allowed is None or keyword in allowed
+                for match in re.finditer(r'\b' + re.escape(keyword) + r'\b', text_lower)
+            ]
+        
+        for keyword, pos in hits:
+            metadata = self.keyword_matchers[keyword]
+            detections.append(Detection(
+                metadata["entity_type"], metadata["category"], metadata.get("domain_name", ""),
+                text[pos:pos + len(keyword)], pos, pos + len(keyword), metadata["sensitivity_level"], 0.75, "keyword",
+                metadata["placeholder"]
+            ))
         
         return detections
 
-    def _merge_overlapping_detections(self, detections: List[Dict]) -> List[Dict]:
+    def _merge_overlapping_detections(self, detections: List[Detection]) -> List[Detection]:
         """Merge overlapping detections, keeping highest confidence"""
         if not detections:
             return []
         
-        sorted_detections = sorted(detections, key=lambda x: (x["start"], -x["confidence_score"]))
+        sorted_detections = sorted(detections, key=lambda x: (x.start, -x.confidence_score))
         merged = []
+        # Indices (ascending) of merged detections still ending after the sweep position:
+        # starts only grow, so a detection ending before the current start is final
+        active = []
         
         for detection in sorted_detections:
+            start = detection.start
+            active = [i for i in active if merged[i].end > start]
             overlapping = False
-            for i, existing in enumerate(merged):
-                if (detection["start"] < existing["end"] and detection["end"] > existing["start"]):
-                    if detection["confidence_score"] > existing["confidence_score"]:
+            for i in active:
+                existing = merged[i]
+                if detection.end > existing.start:
+                    if detection.confidence_score > existing.confidence_score:
                         merged[i] = detection
                     overlapping = True
                     break
             
             if not overlapping:
+                active.append(len(merged))
                 merged.append(detection)
         
-        return sorted(merged, key=lambda x: x["start"])
+        # A replacement can move a later start into an earlier slot; the list is
+        # nearly sorted, so this stays a linear Timsort pass
+        return sorted(merged, key=lambda x: x.start)
+
+    def _filter_and_merge_arrays(self, detections: List[Detection], confidence_threshold: float) -> List[Detection]:
+        """Threshold filter + overlap merge on NumPy arrays, for large detection sets
+        
+        Same result as the list comprehension followed by _merge_overlapping_detections.
+        """
+        n = len(detections)
+        starts = np.fromiter((d.start for d in detections), dtype=np.int64, count=n)
+        ends = np.fromiter((d.end for d in detections), dtype=np.int64, count=n)
+        confs = np.fromiter((d.confidence_score for d in detections), dtype=np.float64, count=n)
+        
+        # lexsort is stable, like sorted() on (start, -confidence)
+        passing = np.flatnonzero(confs >= confidence_threshold)
+        order = passing[np.lexsort((-confs[passing], starts[passing]))]
+        
+        kept = _merge_sweep(order, starts, ends, confs)
+        return sorted((detections[i] for i in kept.tolist()), key=lambda x: x.start)
 
     def analyze(self, text: str, language: str = "fr", 
                 confidence_threshold: float = 0.5,
                 detect_names: bool = False,
                 domains: Optional[List[str]] = None) -> List[Dict]:
-        """Analyze text and detect sensitive data"""
+        """Analyze text and detect sensitive data
+        
+        Results go through an LRU keyed by the blake2b digest of the text and
+        the options; callers get fresh dicts they are free to modify.
+        """
         
         if not text or not text.strip():
             return []
         
+        key = (hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest(),
+               language, confidence_threshold, detect_names, self._domains_key(domains))
+        with self._analysis_cache_lock:
+            results = self._analysis_cache.get(key)
+            if results is not None:
+                self._analysis_cache.move_to_end(key)
+                return [dict(d) for d in results]
+        
+        results = tuple(self._analyze_uncached(text, confidence_threshold, detect_names, domains))
+        with self._analysis_cache_lock:
+            self._analysis_cache[key] = results
+            if len(self._analysis_cache) > ANALYZE_CACHE_SIZE:
+                self._analysis_cache.popitem(last=False)
+        return [dict(d) for d in results]
+
+    def clear_analysis_cache(self):
+        """Drop the cached analyze() results"""
+        with self._analysis_cache_lock:
+            self._analysis_cache.clear()
+
+    def analyze_batch(self, texts: List[str], language: str = "fr",
+                      confidence_threshold: float = 0.5,
+                      detect_names: bool = False,
+                      domains: Optional[List[str]] = None) -> List[List[Dict]]:
+        """Analyze a batch of texts; same result as analyze() on each text
+        
+        Keywords are found in a single automaton pass over the whole batch.
+        Regexes still run per text, so that anchors, word boundaries and
+        context windows never see a neighbouring text. Bypasses the result cache.
+        """
+        texts_lower = [text.lower() for text in texts]
+        if self.keyword_automaton is not None:
+            keyword_hits = self._scan_keywords_batch(texts_lower)
+        else:
+            keyword_hits = [None] * len(texts)
+        
+        results = []
+        for text, text_lower, hits in zip(texts, texts_lower, keyword_hits):
+            if not text or not text.strip():
+                results.append([])
+                continue
+            results.append(self._analyze_uncached(text, confidence_threshold, detect_names, domains,
+                                                  text_lower=text_lower, keyword_hits=hits))
+        return results
+
+    def _analyze_uncached(self, text: str, confidence_threshold: float, detect_names: bool,
+                          domains: Optional[List[str]], text_lower: Optional[str] = None,
+                          keyword_hits: Optional[List[Tuple[str, int]]] = None) -> List[Dict]:
+        """Run the detection passes (analyze() without its result cache)"""
+        # Lowercased once, shared by the prefix prefilter, context checks and keywords
+        if text_lower is None:
+            text_lower = text.lower()
+        
         # Regex detection
-        regex_detections = self._detect_with_regex(text, domains_filter=domains, detect_names=detect_names)
+        regex_detections = self._detect_with_regex(text, domains_filter=domains, detect_names=detect_names,
+                                                   text_lower=text_lower)
         
         # Keyword detection
-        keyword_detections = self._detect_with_keywords(text, domains_filter=domains)
+        keyword_detections = self._detect_with_keywords(text, domains_filter=domains, text_lower=text_lower,
+                                                        hits=keyword_hits)
         
         # Combine and filter
         all_detections = regex_detections + keyword_detections
-        all_detections = [d for d in all_detections if d["confidence_score"] >= confidence_threshold]
-        
-        # Merge overlaps
-        merged_detections = self._merge_overlapping_detections(all_detections)
+        if NUMBA_AVAILABLE and len(all_detections) > MERGE_NUMBA_MIN:
+            merged_detections = self._filter_and_merge_arrays(all_detections, confidence_threshold)
+        else:
+            all_detections = [d for d in all_detections if d.confidence_score >= confidence_threshold]
+            
+            # Merge overlaps
+            merged_detections = self._merge_overlapping_detections(all_detections)
         
-        return merged_detections
+        # Only the kept detections become dicts (with their context and placeholder)
+        return [d.to_dict(self._get_context(text, d.start, d.end)) for d in merged_detections]
 
     def anonymize_text(self, text: str, detections: List[Dict]) -> str:
         """Anonymize text by replacing detected values"""
         if not detections:
             return text
         
-        sorted_detections = sorted(detections, key=lambda x: x["start"], reverse=True)
+        # Single pass in text order: each segment is copied once
+        parts = []
+        cursor = 0
+        for detection in sorted(detections, key=lambda x: x["start"]):
+            if detection["start"] < cursor or detection["start"] == detection["end"]:
+                # Overlapping or empty spans: keep the right-to-left splicing semantics
+                return self._anonymize_spliced(text, detections)
+            parts.append(text[cursor:detection["start"]])
+            parts.append(detection.get("placeholder") or entity_placeholder(detection["entity_type"]))
+            cursor = detection["end"]
+        parts.append(text[cursor:])
         
+        return "".join(parts)
+
+    def _anonymize_spliced(self, text: str, detections: List[Dict]) -> str:
+        """Replace detections right to left, splicing into the partially anonymized text"""
         anonymized = text
-        for detection in sorted_detections:
-            entity_type = detection["entity_type"]
-            start = detection["start"]
-            end = detection["end"]
-            
-            placeholder = f"[{entity_type.upper().replace(' ', '_').replace('-', '_')}]"
-            anonymized = anonymized[:start] + placeholder + anonymized[end:]
-        
+        for detection in sorted(detections, key=lambda x: x["start"], reverse=True):
+            placeholder = detection.get("placeholder") or entity_placeholder(detection["entity_type"])
+            anonymized = anonymized[:detection["start"]] + placeholder + anonymized[detection["end"]:]
         return anonymized
 
     def get_domains(self) -> List[Dict]:
@@ -455,13 +1291,52 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def build_analyze_response(text: str, detections: List[Dict], anonymize: bool, start_time: float) -> AnalyzeResponse:
+    """Build the analysis response (anonymization, summaries, Pydantic models)"""
+    # Anonymization
+    anonymized_text = None
+    if anonymize and detections:
+        anonymized_text = detection_engine.anonymize_text(text, detections)
+        for det in detections:
+            det["anonymized_value"] = det["placeholder"]
+    
+    # Summary by category
+    summary = {}
+    for det in detections:
+        category = det["category"]
+        summary[category] = summary.get(category, 0) + 1
+    
+    # Summary by domain
+    domains_summary = {}
+    for det in detections:
+        domain = det.get("domain", "UNKNOWN")
+        domains_summary[domain] = domains_summary.get(domain, 0) + 1
+    
+    execution_time = (time.time() - start_time) * 1000
+    
+    detection_results = [DetectionResult(**d) for d in detections]
+    
+    return AnalyzeResponse(
+        success=True,
+        text_length=len(text),
+        detections_count=len(detections),
+        detections=detection_results,
+        summary=summary,
+        domains_summary=domains_summary,
+        execution_time_ms=round(execution_time, 2),
+        anonymized_text=anonymized_text
+    )
+
 @app.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_text(request: AnalyzeRequest):
     """Analyze text and detect sensitive data"""
     start_time = time.time()
     
     try:
-        detections = detection_engine.analyze(
+        # CPU-bound scan on a worker thread: the event loop keeps serving other requests.
+        # A cancelled request raises CancelledError (not an Exception) straight through.
+        detections = await asyncio.to_thread(
+            detection_engine.analyze,
             text=request.text,
             language=request.language,
             confidence_threshold=request.confidence_threshold,
@@ -469,40 +1344,34 @@ async def analyze_text(request: AnalyzeRequest):
             domains=request.domains
         )
         
-        # Anonymization
-        anonymized_text = None
-        if request.anonymize and detections:
-            anonymized_text = detection_engine.anonymize_text(request.text, detections)
-            for det in detections:
-                det["anonymized_value"] = f"[{det['entity_type'].upper().replace(' ', '_').replace('-', '_')}]"
-        
-        # Summary by category
-        summary = {}
-        for det in detections:
-            category = det["category"]
-            summary[category] = summary.get(category, 0) + 1
+        return build_analyze_response(request.text, detections, request.anonymize, start_time)
         
-        # Summary by domain
-        domains_summary = {}
-        for det in detections:
-            domain = det.get("domain", "UNKNOWN")
-            domains_summary[domain] = domains_summary.get(domain, 0) + 1
-        
-        execution_time = (time.time() - start_time) * 1000
-        
-        detection_results = [DetectionResult(**d) for d in detections]
-        
-        return AnalyzeResponse(
-            success=True,
-            text_length=len(request.text),
-            detections_count=len(detections),
-            detections=detection_results,
-            summary=summary,
-            domains_summary=domains_summary,
-            execution_time_ms=round(execution_time, 2),
-            anonymized_text=anonymized_text
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@app.post("/analyze_batch", response_model=List[AnalyzeResponse])
+async def analyze_texts_batch(request: BatchAnalyzeRequest):
+    """Analyze a batch of texts in one request
+    
+    execution_time_ms of each response includes the analysis time of the whole batch.
+    """
+    start_time = time.time()
+    
+    try:
+        batch_detections = await asyncio.to_thread(
+            detection_engine.analyze_batch,
+            texts=request.texts,
+            language=request.language,
+            confidence_threshold=request.confidence_threshold,
+            detect_names=request.detect_names,
+            domains=request.domains
         )
         
+        return [
+            build_analyze_response(text, detections, request.anonymize, start_time)
+            for text, detections in zip(request.texts, batch_detections)
+        ]
+        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
 
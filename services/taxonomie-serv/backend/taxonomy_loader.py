@@ -3,22 +3,43 @@ Taxonomy Loader - Load JSON taxonomies into MongoDB Atlas
 """
 import json
 import os
+import asyncio
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import sys
 
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
 # Add parent path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from backend.database.mongodb import sync_db, test_sync_connection, COLLECTIONS
 
+# orjson (optional): faster JSON parsing of the taxonomy files
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
 # ============================================================
 # CONFIGURATION
 # ============================================================
 
 DOMAINS_DIR = Path(__file__).parent.parent / "taxonomie" / "domains"
 
+# Maximum operations per bulk_write call
+BULK_BATCH_SIZE = 1000
+
+# Files loaded concurrently (kept below the MongoDB connection pool size)
+MAX_CONCURRENT_FILES = 8
+
+MONGO_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+
 # ============================================================
 # HELPER FUNCTIONS
 # ============================================================
@@ -26,6 +47,8 @@ DOMAINS_DIR = Path(__file__).parent.parent / "taxonomie" / "domains"
 def load_json_file(filepath: Path) -> Optional[Dict]:
     """Load and parse a JSON file"""
     try:
+        if ORJSON_AVAILABLE:
+            return orjson.loads(filepath.read_bytes())
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
     except Exception as e:
@@ -34,45 +57,56 @@ def load_json_file(filepath: Path) -> Optional[Dict]:
 
 def flatten_entities(taxonomy: Dict) -> List[Dict]:
     """Flatten taxonomy into individual entity documents"""
-    entities = []
     metadata = taxonomy.get("metadata", {})
     domain_id = metadata.get("domain_id", "UNKNOWN")
     domain_name = metadata.get("domain_name", "UNKNOWN")
+    now = datetime.utcnow()
+    
+    def build(entity_number: int, category_fields: tuple, subclass: Dict) -> Dict:
+        category_name, category_en, category_type = category_fields
+        sc_get = subclass.get
+        return {
+            "entity_id": f"{domain_id}-ENT-{entity_number:03d}",
+            "name": sc_get("name", ""),
+            "name_en": sc_get("name_en", ""),
+            "domain_id": domain_id,
+            "domain_name": domain_name,
+            "category": category_name,
+            "category_en": category_en,
+            "type": category_type,
+            "sensitivity_level": sc_get("sensitivity_level", "unknown"),
+            "risk_level": sc_get("risk_level", ""),
+            "synonyms_fr": sc_get("synonyms_fr", []),
+            "synonyms_en": sc_get("synonyms_en", []),
+            "acronyms_fr": sc_get("acronyms_fr", []),
+            "acronyms_en": sc_get("acronyms_en", []),
+            "regex_patterns": sc_get("regex_patterns", []),
+            "format": sc_get("format", ""),
+            "regulations": sc_get("regulations", []),
+            "why_sensitive": sc_get("why_sensitive", ""),
+            "context_required": sc_get("context_required", []),
+            "created_at": now,
+            "updated_at": now
+        }
+    
+    # (class, class_en, type) read once per category
+    categories = [
+        (
+            (category.get("class", "UNKNOWN"), category.get("class_en", ""), category.get("type", "PII")),
+            category.get("subclasses", [])
+        )
+        for category in taxonomy.get("categories", [])
+    ]
+    subclasses = (
+        (category_fields, subclass)
+        for category_fields, category_subclasses in categories
+        for subclass in category_subclasses
+    )
     
-    entity_counter = 1
-    
-    for category in taxonomy.get("categories", []):
-        category_name = category.get("class", "UNKNOWN")
-        category_type = category.get("type", "PII")
-        
-        for subclass in category.get("subclasses", []):
-            entity = {
-                "entity_id": f"{domain_id}-ENT-{str(entity_counter).zfill(3)}",
-                "name": subclass.get("name", ""),
-                "name_en": subclass.get("name_en", ""),
-                "domain_id": domain_id,
-                "domain_name": domain_name,
-                "category": category_name,
-                "category_en": category.get("class_en", ""),
-                "type": category_type,
-                "sensitivity_level": subclass.get("sensitivity_level", "unknown"),
-                "risk_level": subclass.get("risk_level", ""),
-                "synonyms_fr": subclass.get("synonyms_fr", []),
-                "synonyms_en": subclass.get("synonyms_en", []),
-                "acronyms_fr": subclass.get("acronyms_fr", []),
-                "acronyms_en": subclass.get("acronyms_en", []),
-                "regex_patterns": subclass.get("regex_patterns", []),
-                "format": subclass.get("format", ""),
-                "regulations": subclass.get("regulations", []),
-                "why_sensitive": subclass.get("why_sensitive", ""),
-                "context_required": subclass.get("context_required", []),
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-            entities.append(entity)
-            entity_counter += 1
-    
-    return entities
+    return [
+        build(entity_number, category_fields, subclass)
+        for entity_number, (category_fields, subclass) in enumerate(subclasses, start=1)
+    ]
 
 def extract_domain_metadata(taxonomy: Dict) -> Dict:
     """Extract domain metadata from taxonomy"""
@@ -83,6 +117,7 @@ def extract_domain_metadata(taxonomy: Dict) -> Dict:
         len(cat.get("subclasses", []))
         for cat in taxonomy.get("categories", [])
     )
+    now = datetime.utcnow()
     
     return {
         "domain_id": metadata.get("domain_id", ""),
@@ -94,77 +129,81 @@ def extract_domain_metadata(taxonomy: Dict) -> Dict:
         "total_entities": total_entities,
         "categories_count": len(taxonomy.get("categories", [])),
         "last_updated": metadata.get("last_updated", ""),
-        "created_at": datetime.utcnow(),
-        "updated_at": datetime.utcnow()
+        "created_at": now,
+        "updated_at": now
     }
 
+def prepare_taxonomy(filepath: Path) -> Optional[Tuple[Dict, Dict, List[Dict]]]:
+    """Parse a taxonomy file and build its taxonomy, domain and entity documents
+    
+    Runs in the event loop's default executor, off the loop thread.
+    Returns None if the file cannot be loaded.
+    """
+    taxonomy = load_json_file(filepath)
+    if not taxonomy:
+        return None
+    
+    taxonomy["created_at"] = taxonomy["updated_at"] = datetime.utcnow()
+    return taxonomy, extract_domain_metadata(taxonomy), flatten_entities(taxonomy)
+
 # ============================================================
 # MAIN LOADER FUNCTIONS
 # ============================================================
 
-def load_single_taxonomy(filepath: Path, clear_existing: bool = False) -> Dict:
-    """Load a single taxonomy file into MongoDB"""
+async def load_single_taxonomy(filepath: Path, db, clear_existing: bool = False) -> Dict:
+    """Load a single taxonomy file into MongoDB (db: Motor database)"""
     print(f"\n📁 Loading: {filepath.name}")
     
-    taxonomy = load_json_file(filepath)
-    if not taxonomy:
+    prepared = await asyncio.get_running_loop().run_in_executor(None, prepare_taxonomy, filepath)
+    if not prepared:
         return {"status": "error", "file": filepath.name, "message": "Failed to load JSON"}
+    taxonomy, domain_meta, entities = prepared
     
     domain_id = taxonomy.get("metadata", {}).get("domain_id", "UNKNOWN")
     
     # Get collections
-    taxonomies_col = sync_db[COLLECTIONS["taxonomies"]]
-    entities_col = sync_db[COLLECTIONS["entities"]]
-    domains_col = sync_db[COLLECTIONS["domains"]]
+    taxonomies_col = db[COLLECTIONS["taxonomies"]]
+    entities_col = db[COLLECTIONS["entities"]]
+    domains_col = db[COLLECTIONS["domains"]]
     
     # Clear existing data for this domain if requested
     if clear_existing:
-        taxonomies_col.delete_many({"metadata.domain_id": domain_id})
-        entities_col.delete_many({"domain_id": domain_id})
-        domains_col.delete_many({"domain_id": domain_id})
-    
-    # Insert taxonomy document
-    taxonomy["created_at"] = datetime.utcnow()
-    taxonomy["updated_at"] = datetime.utcnow()
-    
-    try:
-        taxonomies_col.replace_one(
-            {"metadata.domain_id": domain_id},
-            taxonomy,
-            upsert=True
+        await asyncio.gather(
+            taxonomies_col.delete_many({"metadata.domain_id": domain_id}),
+            entities_col.delete_many({"domain_id": domain_id}),
+            domains_col.delete_many({"domain_id": domain_id})
         )
-        print(f"  ✅ Taxonomy document inserted/updated")
-    except Exception as e:
-        print(f"  ❌ Error inserting taxonomy: {e}")
     
-    # Insert domain metadata
-    domain_meta = extract_domain_metadata(taxonomy)
-    try:
-        domains_col.replace_one(
-            {"domain_id": domain_id},
-            domain_meta,
-            upsert=True
-        )
-        print(f"  ✅ Domain metadata inserted/updated")
-    except Exception as e:
-        print(f"  ❌ Error inserting domain: {e}")
-    
-    # Insert flattened entities
-    entities = flatten_entities(taxonomy)
-    entities_inserted = 0
+    # Write the three collections concurrently
+    async def write_taxonomy():
+        try:
+            await taxonomies_col.replace_one(
+                {"metadata.domain_id": domain_id},
+                taxonomy,
+                upsert=True
+            )
+            print(f"  ✅ {filepath.name}: taxonomy document inserted/updated")
+        except Exception as e:
+            print(f"  ❌ {filepath.name}: error inserting taxonomy: {e}")
     
-    for entity in entities:
+    async def write_domain():
         try:
-            entities_col.replace_one(
-                {"entity_id": entity["entity_id"]},
-                entity,
+            await domains_col.replace_one(
+                {"domain_id": domain_id},
+                domain_meta,
                 upsert=True
             )
-            entities_inserted += 1
+            print(f"  ✅ {filepath.name}: domain metadata inserted/updated")
         except Exception as e:
-            print(f"  ❌ Error inserting entity {entity.get('name', 'UNKNOWN')}: {e}")
+            print(f"  ❌ {filepath.name}: error inserting domain: {e}")
     
-    print(f"  ✅ {entities_inserted} entities inserted/updated")
+    _, _, entities_inserted = await asyncio.gather(
+        write_taxonomy(),
+        write_domain(),
+        bulk_upsert_entities(entities_col, entities)
+    )
+    
+    print(f"  ✅ {filepath.name}: {entities_inserted} entities inserted/updated")
     
     return {
         "status": "success",
@@ -173,6 +212,51 @@ def load_single_taxonomy(filepath: Path, clear_existing: bool = False) -> Dict:
         "entities_count": entities_inserted
     }
 
+async def bulk_upsert_entities(entities_col, entities: List[Dict]) -> int:
+    """Upsert entities with unordered bulk_write calls, returning the number written
+    
+    A failed entity is reported without aborting the rest of its batch.
+    """
+    entities_written = 0
+    
+    for batch_start in range(0, len(entities), BULK_BATCH_SIZE):
+        batch = entities[batch_start:batch_start + BULK_BATCH_SIZE]
+        operations = [
+            ReplaceOne({"entity_id": entity["entity_id"]}, entity, upsert=True)
+            for entity in batch
+        ]
+        try:
+            result = await entities_col.bulk_write(operations, ordered=False)
+            entities_written += result.upserted_count + result.matched_count
+        except BulkWriteError as e:
+            details = e.details
+            entities_written += details.get("nUpserted", 0) + details.get("nMatched", 0)
+            for error in details.get("writeErrors", []):
+                entity = batch[error["index"]]
+                print(f"  ❌ Error inserting entity {entity.get('name', 'UNKNOWN')}: {error.get('errmsg')}")
+        except Exception as e:
+            print(f"  ❌ Error inserting entities: {e}")
+    
+    return entities_written
+
+async def load_taxonomy_files(json_files: List[Path], clear_existing: bool) -> List[Dict]:
+    """Load taxonomy files concurrently, at most MAX_CONCURRENT_FILES at a time
+    
+    The Motor client is created here so that it belongs to the running event loop.
+    """
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[sync_db.name]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FILES)
+    
+    async def load_limited(filepath: Path) -> Dict:
+        async with semaphore:
+            return await load_single_taxonomy(filepath, db, clear_existing=clear_existing)
+    
+    try:
+        return await asyncio.gather(*(load_limited(filepath) for filepath in json_files))
+    finally:
+        client.close()
+
 def load_all_taxonomies(clear_existing: bool = True) -> Dict:
     """Load all taxonomy files from the domains directory"""
     print("\n" + "=" * 60)
@@ -195,18 +279,18 @@ def load_all_taxonomies(clear_existing: bool = True) -> Dict:
     json_files = list(DOMAINS_DIR.glob("*.json"))
     print(f"\n📂 Found {len(json_files)} taxonomy files in {DOMAINS_DIR}")
     
-    results = []
-    total_entities = 0
-    
-    for filepath in sorted(json_files):
-        result = load_single_taxonomy(filepath, clear_existing=clear_existing)
-        results.append(result)
-        if result.get("status") == "success":
-            total_entities += result.get("entities_count", 0)
+    try:
+        results = asyncio.run(load_taxonomy_files(sorted(json_files), clear_existing))
+    finally:
+        # Create indexes (also after a failed load)
+        print("\n📊 Creating indexes...")
+        create_indexes()
     
-    # Create indexes
-    print("\n📊 Creating indexes...")
-    create_indexes()
+    total_entities = sum(
+        result.get("entities_count", 0)
+        for result in results
+        if result.get("status") == "success"
+    )
     
     # Summary
     print("\n" + "=" * 60)
@@ -268,38 +352,53 @@ def create_indexes():
         print(f"  ⚠️ Domains indexes: {e}")
 
 def get_statistics() -> Dict:
-    """Get statistics from MongoDB collections"""
+    """Get statistics from MongoDB collections, in a single aggregation
+    
+    The entities are unioned with a marker-only projection of the other
+    collections, then one $facet counts the documents per collection and
+    groups the entities by sensitivity level and by domain.
+    """
     stats = {
         "database": "DataGovDB",
-        "collections": {}
+        "collections": {col_name: 0 for col_name in COLLECTIONS}
     }
     
-    for col_name, col_key in COLLECTIONS.items():
-        try:
-            count = sync_db[col_key].count_documents({})
-            stats["collections"][col_name] = count
-        except:
-            stats["collections"][col_name] = 0
-    
-    # Get entities by sensitivity level
-    try:
-        pipeline = [
+    entities_key = COLLECTIONS["entities"]
+    pipeline = [
+        {"$project": {"_id": 0, "collection": {"$literal": entities_key}, "sensitivity_level": 1, "domain_name": 1}}
+    ]
+    for col_key in COLLECTIONS.values():
+        if col_key != entities_key:
+            pipeline.append({"$unionWith": {
+                "coll": col_key,
+                "pipeline": [{"$project": {"_id": 0, "collection": {"$literal": col_key}}}]
+            }})
+    pipeline.append({"$facet": {
+        "counts": [
+            {"$group": {"_id": "$collection", "count": {"$sum": 1}}}
+        ],
+        "by_sensitivity": [
+            {"$match": {"collection": entities_key}},
             {"$group": {"_id": "$sensitivity_level", "count": {"$sum": 1}}}
+        ],
+        "by_domain": [
+            {"$match": {"collection": entities_key}},
+            {"$group": {"_id": "$domain_name", "count": {"$sum": 1}}}
         ]
-        sensitivity_stats = list(sync_db[COLLECTIONS["entities"]].aggregate(pipeline))
-        stats["entities_by_sensitivity"] = {s["_id"]: s["count"] for s in sensitivity_stats}
-    except:
-        stats["entities_by_sensitivity"] = {}
+    }})
     
-    # Get entities by domain
     try:
-        pipeline = [
-            {"$group": {"_id": "$domain_name", "count": {"$sum": 1}}}
-        ]
-        domain_stats = list(sync_db[COLLECTIONS["entities"]].aggregate(pipeline))
-        stats["entities_by_domain"] = {d["_id"]: d["count"] for d in domain_stats}
+        facets = next(sync_db[entities_key].aggregate(pipeline))
     except:
+        stats["entities_by_sensitivity"] = {}
         stats["entities_by_domain"] = {}
+        return stats
+    
+    counts = {c["_id"]: c["count"] for c in facets["counts"]}
+    for col_name, col_key in COLLECTIONS.items():
+        stats["collections"][col_name] = counts.get(col_key, 0)
+    stats["entities_by_sensitivity"] = {s["_id"]: s["count"] for s in facets["by_sensitivity"]}
+    stats["entities_by_domain"] = {d["_id"]: d["count"] for d in facets["by_domain"]}
     
     return stats
 
@@ -322,6 +421,10 @@ if __name__ == "__main__":
         print(f"Connection test: {result}")
     elif args.stats:
         stats = get_statistics()
-        print(json.dumps(stats, indent=2, default=str))
+        if ORJSON_AVAILABLE:
+            # Aggregation _ids may be None: OPT_NON_STR_KEYS writes them as "null" like json.dumps
+            print(orjson.dumps(stats, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode())
+        else:
+            print(json.dumps(stats, indent=2, default=str))
     else:
         load_all_taxonomies(clear_existing=args.clear or True)
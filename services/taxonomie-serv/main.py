@@ -11,21 +11,75 @@ According to Cahier des Charges:
 Note: Presidio integration moved to presidio-serv
 Note: ML classification moved to classification-serv
 """
+import os
 import re
 import json
+import asyncio
 import time
+import pickle
+import hashlib
+import threading
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
 from pathlib import Path
 
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
 import uvicorn
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
 # Import Sensitivity Calculator (Cahier Section 4.4)
 from backend.sensitivity_calculator import SensitivityCalculator
-from backend.pattern_loader import load_patterns_from_mongodb
+from backend.pattern_loader import load_patterns_from_mongodb, get_pattern_count
+# services/common is on sys.path once backend.pattern_loader is imported
+from mongodb_client import test_connection
+
+# Apache Atlas client (optional): only the /sync-atlas endpoint needs it
+ATLAS_AVAILABLE = False
+ATLAS_IMPORT_ERROR = ""
+try:
+    from atlas_client import AtlasClient
+    ATLAS_AVAILABLE = True
+except ImportError as e:
+    ATLAS_IMPORT_ERROR = str(e)
+
+# Aho-Corasick (optional): one pass to find the context keywords occurring in the text
+AHOCORASICK_AVAILABLE = False
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    pass
+
+# Hyperscan (optional): one SIMD pass to find which Moroccan patterns occur in the text
+HYPERSCAN_AVAILABLE = False
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    pass
+
+# orjson (optional): faster rendering of the analysis responses
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
+# NumPy (optional): vectorized Arabic test on long texts
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    pass
 
 # ====================================================================
 # DATA MODELS
@@ -45,6 +99,13 @@ class AnalyzeRequest(BaseModel):
     detect_names: bool = Field(default=True)
     domains: Optional[List[str]] = Field(default=None)
 
+class BatchAnalyzeRequest(BaseModel):
+    texts: List[str] = Field(..., description="Textes à analyser", min_length=1)
+    language: str = Field(default="fr", description="Langue des textes (fr/en/ar)")
+    confidence_threshold: float = Field(default=0.5, ge=0.0, le=1.0)
+    detect_names: bool = Field(default=True)
+    domains: Optional[List[str]] = Field(default=None)
+
 class DetectionResult(BaseModel):
     entity_type: str
     category: str
@@ -68,6 +129,77 @@ class AnalyzeResponse(BaseModel):
     domains_summary: Dict[str, int]
     execution_time_ms: float
 
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when installed (as JSONResponse otherwise)"""
+    
+    def render(self, content) -> bytes:
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+class Detection:
+    """A detection inside the engine; analyze() turns the kept ones into dicts
+    
+    sensitivity is the Cahier score dict shared by every detection of a
+    pattern (None for the custom taxonomy, which only has a level). The
+    detection keeps a reference to the analyzed text: value and context are
+    only sliced out of it when read.
+    """
+    __slots__ = ("entity_type", "category", "domain", "text", "start", "end",
+                 "sensitivity_level", "sensitivity", "confidence_score", "detection_method")
+    
+    # Characters of context on each side of the value
+    CONTEXT_SIZE = 30
+    
+    def __init__(self, entity_type: str, category: str, domain: str, text: str, start: int, end: int,
+                 sensitivity_level: str, sensitivity: Optional[Dict], confidence_score: float,
+                 detection_method: str):
+        self.entity_type = entity_type
+        self.category = category
+        self.domain = domain
+        self.text = text
+        self.start = start
+        self.end = end
+        self.sensitivity_level = sensitivity_level
+        self.sensitivity = sensitivity
+        self.confidence_score = confidence_score
+        self.detection_method = detection_method
+    
+    @property
+    def value(self) -> str:
+        return self.text[self.start:self.end]
+    
+    @property
+    def context(self) -> str:
+        """Context around the detection, with ... where the text was cut"""
+        ctx_start = max(0, self.start - self.CONTEXT_SIZE)
+        ctx_end = min(len(self.text), self.end + self.CONTEXT_SIZE)
+        context = self.text[ctx_start:ctx_end]
+        if ctx_start > 0:
+            context = "..." + context
+        if ctx_end < len(self.text):
+            context = context + "..."
+        return context
+    
+    def to_dict(self) -> Dict:
+        """Materialize the API dict (the breakdown is copied: the shared scores stay untouched)"""
+        detection = {
+            "entity_type": self.entity_type,
+            "category": self.category,
+            "domain": self.domain,
+            "value": self.value,
+            "start": self.start,
+            "end": self.end,
+            "sensitivity_level": self.sensitivity_level
+        }
+        if self.sensitivity is not None:
+            detection["sensitivity_score"] = self.sensitivity["score"]
+            detection["sensitivity_breakdown"] = dict(self.sensitivity["breakdown"])
+        detection["confidence_score"] = self.confidence_score
+        detection["detection_method"] = self.detection_method
+        detection["context"] = self.context
+        return detection
+
 # ====================================================================
 # MOROCCAN PATTERNS (CORE OF TÂCHE 2)
 # ====================================================================
@@ -417,6 +549,266 @@ ARABIC_PATTERNS = {
     }
 }
 
+def _compile_pattern_table(table: Dict[str, Dict], flags: int) -> Dict[str, List[re.Pattern]]:
+    """Compile the regex strings of a pattern table, by entity type (invalid patterns are skipped)"""
+    compiled = {}
+    for entity_type, config in table.items():
+        compiled[entity_type] = []
+        for pattern_str in config.get("patterns", []):
+            try:
+                compiled[entity_type].append(re.compile(pattern_str, flags))
+            except re.error:
+                pass
+    return compiled
+
+# Compiled once at import, shared by every engine instance and reload
+_COMPILED = _compile_pattern_table(MOROCCAN_PATTERNS, re.IGNORECASE | re.UNICODE)
+_COMPILED_AR = _compile_pattern_table(ARABIC_PATTERNS, re.UNICODE)
+
+def get_compiled_patterns() -> Tuple[Dict[str, List[re.Pattern]], Dict[str, List[re.Pattern]]]:
+    """Return the precompiled Moroccan and Arabic patterns, by entity type"""
+    return _COMPILED, _COMPILED_AR
+
+# Moroccan patterns as parallel lists, one entry per regex in MOROCCAN_PATTERNS order:
+# the scan only walks _PATTERNS, the other columns are read on a hit.
+# MOROCCAN_PATTERNS stays the source for the introspection endpoints.
+_PATTERNS: List[re.Pattern] = []
+_ENTITY_TYPES: List[str] = []
+_CATEGORIES: List[str] = []
+_DOMAINS: List[str] = []
+_CTX_REQ: List[Tuple[str, ...]] = []
+for _entity_type, _config in MOROCCAN_PATTERNS.items():
+    for _pattern in _COMPILED[_entity_type]:
+        _PATTERNS.append(_pattern)
+        _ENTITY_TYPES.append(_entity_type)
+        _CATEGORIES.append(_config["category"])
+        _DOMAINS.append(_config.get("domain", ""))
+        _CTX_REQ.append(tuple(_config.get("context_required", [])))
+
+# Arabic patterns as parallel lists, scanned like the Moroccan ones
+_AR_PATTERNS: List[re.Pattern] = []
+_AR_ENTITY_TYPES: List[str] = []
+_AR_CATEGORIES: List[str] = []
+_AR_DOMAINS: List[str] = []
+for _entity_type, _config in ARABIC_PATTERNS.items():
+    for _pattern in _COMPILED_AR[_entity_type]:
+        _AR_PATTERNS.append(_pattern)
+        _AR_ENTITY_TYPES.append(_entity_type)
+        _AR_CATEGORIES.append(_config["category"])
+        _AR_DOMAINS.append(_config.get("domain", ""))
+_AR_IDX = list(range(len(_AR_PATTERNS)))
+
+# Bare digit-run patterns (\b\d{m}\b, \b\d{m,n}\b) are not scanned one by one: a single
+# pass finds the digit runs and _NUM_BY_LEN maps a run length to the patterns it matches
+_NUMERIC_PATTERN = re.compile(r"\\b\\d\{(\d+)(?:,(\d+))?\}\\b")
+_DIGIT_RUN = re.compile(r"\b\d+\b")
+_NUM_BY_LEN: Dict[int, List[int]] = {}
+_REGEX_IDX: List[int] = []  # the other patterns, for the master regex and Hyperscan
+for _idx, _pattern in enumerate(_PATTERNS):
+    _numeric = _NUMERIC_PATTERN.fullmatch(_pattern.pattern)
+    if _numeric is None:
+        _REGEX_IDX.append(_idx)
+        continue
+    _low = int(_numeric.group(1))
+    _high = int(_numeric.group(2) or _low)
+    for _length in range(_low, _high + 1):
+        _NUM_BY_LEN.setdefault(_length, []).append(_idx)
+
+# IGNORECASE also matches İ and ı to i and ſ to s, which str.lower() does not:
+# in a keyword regex these letters are matched case-sensitively
+_KEYWORD_FOLD_EXCEPTIONS = {"i": "(?-i:[iI])", "s": "(?-i:[sS])"}
+
+def _keyword_regex(keywords) -> Optional[re.Pattern]:
+    """Compile keywords into one IGNORECASE alternation (None without keywords)
+    
+    A search matches where `keyword.lower() in window.lower()` would, a final
+    i included (İ lowercases to i + combining dot).
+    """
+    alternatives = []
+    for keyword in keywords:
+        keyword = keyword.lower()
+        parts = [_KEYWORD_FOLD_EXCEPTIONS.get(c) or re.escape(c) for c in keyword]
+        if keyword.endswith("i"):
+            parts[-1] = "(?-i:[iI\u0130])"
+        alternatives.append("".join(parts))
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+# Context keywords of each pattern, searched in the window around a hit
+_CTX_RE: List[Optional[re.Pattern]] = [_keyword_regex(ctx) for ctx in _CTX_REQ]
+
+# A pattern with context_required can only be kept if one of its keywords occurs
+# somewhere in the text: one scan of all the keywords rules out the others
+_CTX_REQ_LOWER: List[frozenset] = [frozenset(kw.lower() for kw in ctx) for ctx in _CTX_REQ]
+_CTX_KEYWORDS = sorted(set().union(*_CTX_REQ_LOWER))
+_CONTEXT_AUTOMATON = None
+if AHOCORASICK_AVAILABLE and _CTX_KEYWORDS:
+    _CONTEXT_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _CTX_KEYWORDS:
+        _CONTEXT_AUTOMATON.add_word(_keyword, _keyword)
+    _CONTEXT_AUTOMATON.make_automaton()
+
+def _required_literals(items) -> Optional[List[str]]:
+    """Lowercased ASCII literals, one of which occurs in every match (None if unknown)
+    
+    items is a parsed (sre_parse) sequence. Runs of consecutive literals and
+    required groups, branches and repeats are candidates; the one whose
+    shortest literal is longest wins.
+    """
+    best = None
+    run = []
+    
+    def consider(candidate):
+        nonlocal best
+        if candidate and (best is None or min(map(len, candidate)) > min(map(len, best))):
+            best = candidate
+    
+    for op, av in items:
+        if op is sre_parse.LITERAL and av < 128:
+            run.append(chr(av).lower())
+            continue
+        if op is sre_parse.AT:
+            # Zero-width: the literals around it stay adjacent
+            continue
+        consider(["".join(run)] if run else None)
+        run = []
+        if op is sre_parse.SUBPATTERN and not av[1] and not av[2]:
+            consider(_required_literals(av[3]))
+        elif op is sre_parse.BRANCH:
+            branches = [_required_literals(branch) for branch in av[1]]
+            if all(branches):
+                consider([literal for branch in branches for literal in branch])
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            consider(_required_literals(av[2]))
+    consider(["".join(run)] if run else None)
+    return best
+
+# A pattern holding a required literal cannot match a text that lacks all of its
+# literals: one scan of every literal rules those patterns out before any regex runs
+_LITERAL_PATTERNS: Dict[str, List[int]] = {}
+_LITERAL_GATED: set = set()
+for _idx in _REGEX_IDX:
+    _literals = _required_literals(sre_parse.parse(_PATTERNS[_idx].pattern, _PATTERNS[_idx].flags))
+    if _literals:
+        _LITERAL_GATED.add(_idx)
+        for _literal in set(_literals):
+            _LITERAL_PATTERNS.setdefault(_literal, []).append(_idx)
+_LITERAL_AUTOMATON = None
+if AHOCORASICK_AVAILABLE and _LITERAL_PATTERNS:
+    _LITERAL_AUTOMATON = ahocorasick.Automaton()
+    for _literal, _indices in _LITERAL_PATTERNS.items():
+        _LITERAL_AUTOMATON.add_word(_literal, _indices)
+    _LITERAL_AUTOMATON.make_automaton()
+
+# Serialized Hyperscan databases, shared by the workers of a host (the regex
+# objects themselves cannot be shared: unpickling a pattern recompiles it)
+HYPERSCAN_CACHE_DIR = Path.home() / ".cache" / "pii-engine"
+
+# Hyperscan databases already built in this process, by cache key
+_HYPERSCAN_DBS: Dict[str, Tuple[object, set]] = {}
+
+# Syntax that cannot live inside a fused alternation (named groups, backrefs, inline flags)
+_UNCOMBINABLE_SYNTAX = re.compile(r"\(\?P[<=]|\\[1-9]|\(\?[aiLmsux]+\)")
+
+# Whitespace matched by \s under re (Unicode) but not under Hyperscan's ASCII classes
+_ASCII_WHITESPACE_GAP = re.compile(r"[\v\x1c-\x1f]")
+
+# Arabic block: the Arabic patterns only run on texts containing one of these
+_ARABIC_CHAR = re.compile("[\u0600-\u06FF]")
+
+# From this length the UTF-8 byte test beats the regex search
+ARABIC_VECTOR_MIN_LENGTH = 2048
+
+def _contains_arabic(text: str) -> bool:
+    """Whether the text holds a character of the Arabic block
+    
+    An ASCII string answers in constant time. Long texts are tested on their
+    UTF-8 bytes: U+0600-U+06FF are exactly the characters whose lead byte is
+    0xD8-0xDB, so one vectorized pass replaces the character-class search.
+    """
+    if text.isascii():
+        return False
+    if NUMPY_AVAILABLE and len(text) >= ARABIC_VECTOR_MIN_LENGTH:
+        data = np.frombuffer(text.encode("utf-8", "surrogatepass"), dtype=np.uint8)
+        return bool(((data & 0xFC) == 0xD8).any())
+    return _ARABIC_CHAR.search(text) is not None
+
+# Characters IGNORECASE matches to ASCII letters although str.lower() does not
+# map them to ASCII (İ, ı, ſ, Kelvin sign): lowercased searches would miss them
+_ASCII_CASE_GAP = re.compile("[\u0130\u0131\u017f\u212a]")
+
+# Syntax a pattern cannot contain to be lowercased textually: non-ASCII characters,
+# character-code escapes (\x41 is an A) and (?...) groups other than (?: (?= (?! (?<= (?<!
+_LOWERCASE_UNSAFE = re.compile(r"[^\x00-\x7f]|\\[xuUN0-7]|\(\?(?![:=!]|<[=!])")
+
+def _lowercase_pattern(pattern_str: str) -> Optional[str]:
+    """Rewrite an IGNORECASE pattern to match lowercased text without the flag
+    
+    ASCII letters are lowercased outside escapes; class ranges must stay
+    within one case, hold no letter, or hold every letter. Returns None
+    when the pattern does not qualify.
+    """
+    if _LOWERCASE_UNSAFE.search(pattern_str):
+        return None
+    
+    out = []
+    i = 0
+    n = len(pattern_str)
+    while i < n:
+        c = pattern_str[i]
+        if c == "\\":
+            out.append(pattern_str[i:i + 2])
+            i += 2
+        elif c == "[":
+            # Character class: a leading ] (after an optional ^) is a literal
+            j = i + 1
+            if j < n and pattern_str[j] == "^":
+                j += 1
+            if j < n and pattern_str[j] == "]":
+                j += 1
+            out.append(pattern_str[i:j])
+            i = j
+            while i < n and pattern_str[i] != "]":
+                c = pattern_str[i]
+                if c == "\\":
+                    out.append(pattern_str[i:i + 2])
+                    i += 2
+                elif i + 2 < n and pattern_str[i + 1] == "-" and pattern_str[i + 2] not in "]\\":
+                    low, high = c, pattern_str[i + 2]
+                    letters = {chr(code) for code in range(ord(low), ord(high) + 1) if chr(code).isalpha()}
+                    if low.isupper() and high.isupper():
+                        out.append(f"{low.lower()}-{high.lower()}")
+                    elif (low.islower() and high.islower()) or not letters or len(letters) == 52:
+                        out.append(f"{low}-{high}")
+                    else:
+                        return None
+                    i += 3
+                else:
+                    out.append(c.lower())
+                    i += 1
+            if i < n:
+                out.append("]")
+                i += 1
+        else:
+            out.append(c.lower())
+            i += 1
+    return "".join(out)
+
+def _compile_lowered(pattern: re.Pattern) -> Optional[re.Pattern]:
+    """Compile the case-sensitive form of an IGNORECASE pattern, for lowercased text (None if not eligible)"""
+    source = _lowercase_pattern(pattern.pattern)
+    if source is None:
+        return None
+    try:
+        return re.compile(source, re.UNICODE)
+    except re.error:
+        return None
+
+# Lowercased form of each Moroccan pattern (None if not eligible): run against the
+# lowercased text, the scan needs no per-character case folding
+_LOWERED: List[Optional[re.Pattern]] = [_compile_lowered(pattern) for pattern in _PATTERNS]
+
 # ====================================================================
 # TAXONOMY ENGINE
 # ====================================================================
@@ -434,11 +826,29 @@ class TaxonomyEngine:
         # Initialize Sensitivity Calculator (Cahier Section 4.4)
         self.sensitivity_calc = SensitivityCalculator()
         
+        # The sensitivity only depends on the entity type: computed once per pattern
+        self.moroccan_sensitivity = [self.sensitivity_calc.calculate(entity_type) for entity_type in _ENTITY_TYPES]
+        self.arabic_sensitivity = [self.sensitivity_calc.calculate(entity_type) for entity_type in _AR_ENTITY_TYPES]
+        
+        # Detection fields of each pattern (entity type, category, domain, level, sensitivity):
+        # a hit reads them with one index instead of one lookup per field
+        self.moroccan_meta = [
+            (entity_type, category, domain, sensitivity["level"], sensitivity)
+            for entity_type, category, domain, sensitivity
+            in zip(_ENTITY_TYPES, _CATEGORIES, _DOMAINS, self.moroccan_sensitivity)
+        ]
+        self.arabic_meta = [
+            (entity_type, category, domain, sensitivity["level"], sensitivity)
+            for entity_type, category, domain, sensitivity
+            in zip(_AR_ENTITY_TYPES, _AR_CATEGORIES, _AR_DOMAINS, self.arabic_sensitivity)
+        ]
+        
         # Try loading patterns from MongoDB
         print("\n" + "="*60)
         print("🗄️  MONGODB PATTERN LOADING")
         print("="*60)
         
+        self.moroccan_patterns = MOROCCAN_PATTERNS
         mongodb_patterns = load_patterns_from_mongodb()
         
         if mongodb_patterns and len(mongodb_patterns) >= 47:
@@ -450,7 +860,10 @@ class TaxonomyEngine:
         
         # Compile patterns (after potentially loading from MongoDB)
         self.compiled_patterns = self._compile_moroccan_patterns()
+        self._build_moroccan_scanner()
         self.compiled_arabic = self._compile_arabic_patterns()
+        self.compiled_custom = self._compile_custom_patterns()
+        self._build_custom_scanner()
         
         print(f"\n{'='*60}")
         print("🇲🇦 MOROCCAN TAXONOMY ENGINE - Tâche 2")
@@ -487,63 +900,319 @@ class TaxonomyEngine:
                 print(f"  ⚠️ Error loading {filepath.name}: {e}")
     
     def _compile_moroccan_patterns(self) -> Dict[str, List[Tuple[re.Pattern, Dict]]]:
-        """Compile Moroccan patterns"""
+        """Attach metadata to the precompiled Moroccan patterns"""
         compiled = {}
         for entity_type, config in MOROCCAN_PATTERNS.items():
-            compiled[entity_type] = []
-            for pattern_str in config.get("patterns", []):
-                try:
-                    compiled[entity_type].append((
-                        re.compile(pattern_str, re.IGNORECASE | re.UNICODE),
-                        {
-                            "entity_type": entity_type,
-                            "category": config["category"],
-                            "domain": config.get("domain", ""),
-                            "sensitivity_level": config["sensitivity"],
-                            "context_required": config.get("context_required", [])
-                        }
-                    ))
-                except re.error:
-                    pass
+            metadata = {
+                "entity_type": entity_type,
+                "category": config["category"],
+                "domain": config.get("domain", ""),
+                "sensitivity_level": config["sensitivity"],
+                "context_required": config.get("context_required", [])
+            }
+            compiled[entity_type] = [(pattern, metadata) for pattern in _COMPILED[entity_type]]
         return compiled
     
+    def _build_moroccan_scanner(self):
+        """Build the fused master regexes (Moroccan, Arabic) and the Hyperscan database of the non-numeric Moroccan patterns"""
+        self.moroccan_master = self._fuse_patterns(_REGEX_IDX, _PATTERNS, re.IGNORECASE | re.UNICODE)
+        self.moroccan_master_lower = self._fuse_patterns(
+            [idx for idx in _REGEX_IDX if _LOWERED[idx] is not None], _LOWERED, re.UNICODE
+        )
+        # The patterns without a lowercased form share one cursor too, with IGNORECASE
+        self.moroccan_master_unlowered = self._fuse_patterns(
+            [idx for idx in _REGEX_IDX if _LOWERED[idx] is None], _PATTERNS, re.IGNORECASE | re.UNICODE
+        )
+        self.arabic_master = self._fuse_patterns(_AR_IDX, _AR_PATTERNS, re.UNICODE)
+        self.hyperscan_db, self.hyperscan_unscreened = self._build_hyperscan_db(_REGEX_IDX)
+        self._hyperscan_local = threading.local()
+    
+    @staticmethod
+    def _fuse_patterns(indices: List[int], patterns: List[Optional[re.Pattern]], flags: int) -> Optional[re.Pattern]:
+        """Fuse the given patterns into one alternation (alternative G<i> is patterns[i])
+        
+        Returns None when a pattern is missing or cannot be fused.
+        """
+        if not indices or any(patterns[idx] is None for idx in indices):
+            return None
+        sources = [(idx, patterns[idx].pattern) for idx in indices]
+        if any(_UNCOMBINABLE_SYNTAX.search(source) for _, source in sources):
+            return None
+        try:
+            return re.compile(
+                "|".join(f"(?P<G{idx}>{source})" for idx, source in sources),
+                flags
+            )
+        except re.error:
+            return None
+    
+    @classmethod
+    def _build_hyperscan_db(cls, indices: List[int]) -> Tuple[Optional[object], set]:
+        """Compile the Moroccan patterns into one Hyperscan database
+        
+        The database only tells which patterns occur in the text: Hyperscan
+        reports every match end, not finditer's left-to-right split, so match
+        boundaries are still computed by the regex engine. Patterns are caseless
+        with ASCII classes, valid on plain ASCII text. Hyperscan ids are _PATTERNS
+        indices. Returns the database and the indices of the patterns it does not cover.
+        """
+        if not HYPERSCAN_AVAILABLE or not indices:
+            return None, set()
+        
+        expressions = {idx: _PATTERNS[idx].pattern.encode("utf-8") for idx in indices}
+        flags = hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_SINGLEMATCH
+        
+        # Built once per process, and compiled once per host (workers and restarts load it)
+        key = hashlib.sha256(
+            repr((getattr(hyperscan, "__version__", ""), flags, sorted(expressions.items()))).encode("utf-8")
+        ).hexdigest()[:16]
+        if key in _HYPERSCAN_DBS:
+            return _HYPERSCAN_DBS[key]
+        
+        cache_path = HYPERSCAN_CACHE_DIR / f"hyperscan-{key}.pkl"
+        built = cls._read_hyperscan_cache(cache_path)
+        if built is None:
+            built = cls._compile_hyperscan_db(expressions, flags)
+            if built[0] is not None:
+                cls._write_hyperscan_cache(cache_path, *built)
+        _HYPERSCAN_DBS[key] = built
+        return built
+    
+    @staticmethod
+    def _compile_hyperscan_db(expressions: Dict[int, bytes], flags: int) -> Tuple[Optional[object], set]:
+        """Compile the expressions (by pattern index) into one database, setting aside rejected ones"""
+        # Set aside the patterns Hyperscan rejects: they always run
+        covered = []
+        unscreened = set()
+        for idx, expression in expressions.items():
+            try:
+                hyperscan.Database().compile(expressions=[expression], ids=[idx], flags=[flags])
+                covered.append(idx)
+            except hyperscan.error as e:
+                print(f"  ⚠️ Pattern not supported by Hyperscan: {e}")
+                unscreened.add(idx)
+        
+        if not covered:
+            return None, set()
+        
+        db = hyperscan.Database()
+        try:
+            db.compile(
+                expressions=[expressions[idx] for idx in covered],
+                ids=covered,
+                flags=[flags] * len(covered)
+            )
+        except hyperscan.error as e:
+            print(f"  ⚠️ Hyperscan compilation failed: {e}")
+            return None, set()
+        
+        return db, unscreened
+    
+    @staticmethod
+    def _read_hyperscan_cache(cache_path: Path) -> Optional[Tuple[object, set]]:
+        """Return the cached database and unscreened indices, or None if missing or unusable"""
+        try:
+            with open(cache_path, "rb") as f:
+                serialized, unscreened = pickle.load(f)
+            # Fails on a database built by another Hyperscan release or for another CPU
+            return hyperscan.loadb(serialized, hyperscan.HS_MODE_BLOCK), set(unscreened)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"  ⚠️ Ignoring Hyperscan cache {cache_path.name}: {e}")
+            return None
+    
+    @staticmethod
+    def _write_hyperscan_cache(cache_path: Path, db: object, unscreened: set):
+        """Serialize the database (temporary file then rename: never a partial cache)"""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump((hyperscan.dumpb(db), sorted(unscreened)), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"  ⚠️ Could not write Hyperscan cache: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    
+    def _hyperscan_candidates(self, text: str) -> Optional[set]:
+        """Return the indices of the Moroccan patterns occurring in the text (None: no screening)"""
+        # ASCII classes only mean the same as re's Unicode ones on plain ASCII text
+        if self.hyperscan_db is None or not text.isascii() or _ASCII_WHITESPACE_GAP.search(text):
+            return None
+        
+        # One scratch space per thread
+        scratch = getattr(self._hyperscan_local, "scratch", None)
+        if scratch is None:
+            scratch = hyperscan.Scratch(self.hyperscan_db)
+            self._hyperscan_local.scratch = scratch
+        
+        candidates = set(self.hyperscan_unscreened)
+        
+        def on_match(pattern_id, start, end, flags, context):
+            candidates.add(pattern_id)
+        
+        self.hyperscan_db.scan(text.encode("ascii"), match_event_handler=on_match, scratch=scratch)
+        return candidates
+    
+    def _context_blocked(self, text_lower: str) -> set:
+        """Return the indices of the patterns none of whose context keywords occurs in the (lowercased) text"""
+        if _CONTEXT_AUTOMATON is not None:
+            present = {keyword for _, keyword in _CONTEXT_AUTOMATON.iter(text_lower)}
+        else:
+            present = {keyword for keyword in _CTX_KEYWORDS if keyword in text_lower}
+        return {idx for idx, keywords in enumerate(_CTX_REQ_LOWER) if keywords and keywords.isdisjoint(present)}
+    
+    def _literal_absent(self, text_lower: str) -> set:
+        """Return the indices of the patterns none of whose required literals occurs in the (lowercased) text"""
+        present = set()
+        if _LITERAL_AUTOMATON is not None:
+            for _, indices in _LITERAL_AUTOMATON.iter(text_lower):
+                present.update(indices)
+        else:
+            for literal, indices in _LITERAL_PATTERNS.items():
+                if literal in text_lower:
+                    present.update(indices)
+        return _LITERAL_GATED - present
+    
+    def _scan_moroccan(self, text: str) -> List[Tuple[int, int, int]]:
+        """Return (pattern index, start, end) hits of the Moroccan patterns, as per-pattern finditer would
+        
+        Patterns whose context keywords are absent from the text are skipped:
+        _check_context would reject all their hits. So are the patterns none of
+        whose required literals occurs in the text. Bare digit-run patterns are
+        served by one pass over the digit runs. For the others, Hyperscan first
+        rules out the patterns absent from the text. The master regex then finds
+        every position where some pattern matches; the search resumes one
+        character later so that a long match does not hide one starting inside
+        it. The other patterns are checked there with an anchored match, and
+        overlapping hits of one pattern are dropped like finditer does. When the
+        lowercased text keeps the positions and case matches, the patterns that
+        have a lowercased form run on it without IGNORECASE.
+        """
+        hits = []
+        text_lower = text.lower()
+        blocked = self._context_blocked(text_lower)
+        
+        # \b\d{m,n}\b matches exactly the maximal digit-only word runs of length m..n
+        for match in _DIGIT_RUN.finditer(text):
+            for idx in _NUM_BY_LEN.get(match.end() - match.start(), ()):
+                if idx not in blocked:
+                    hits.append((idx, match.start(), match.end()))
+        
+        case_gap = _ASCII_CASE_GAP.search(text) is not None
+        if not case_gap:
+            blocked |= self._literal_absent(text_lower)
+        
+        candidates = self._hyperscan_candidates(text)
+        if candidates is None:
+            active = [idx for idx in _REGEX_IDX if idx not in blocked]
+        else:
+            active = sorted(candidates - blocked)
+        
+        lowercase_safe = len(text_lower) == len(text) and not case_gap
+        if lowercase_safe and self.moroccan_master_lower is not None:
+            lowered = [idx for idx in active if _LOWERED[idx] is not None]
+            hits.extend(self._scan_patterns(text_lower, lowered, self.moroccan_master_lower, _LOWERED))
+            # Patterns without a lowercased form keep IGNORECASE, on the original text
+            others = [idx for idx in active if _LOWERED[idx] is None]
+            hits.extend(self._scan_patterns(text, others, self.moroccan_master_unlowered, _PATTERNS))
+        else:
+            hits.extend(self._scan_patterns(text, active, self.moroccan_master, _PATTERNS))
+        
+        hits.sort()
+        return hits
+    
+    @staticmethod
+    def _scan_patterns(text: str, active: List[int], master: Optional[re.Pattern],
+                       patterns: List[re.Pattern]) -> List[Tuple[int, int, int]]:
+        """Hits of the active patterns, found with the master regex fusing them (None: one by one)"""
+        hits = []
+        if master is None or len(active) <= 1:
+            for idx in active:
+                for match in patterns[idx].finditer(text):
+                    hits.append((idx, match.start(), match.end()))
+            return hits
+        
+        last_end = [0] * len(patterns)
+        pos = 0
+        while pos <= len(text):
+            match = master.search(text, pos)
+            if match is None:
+                break
+            start = match.start()
+            winner = int(match.lastgroup[1:])
+            
+            for idx in active:
+                if start < last_end[idx]:
+                    continue
+                if idx == winner:
+                    end = match.end()
+                else:
+                    anchored = patterns[idx].match(text, start)
+                    if anchored is None:
+                        continue
+                    end = anchored.end()
+                hits.append((idx, start, end))
+                last_end[idx] = max(end, start + 1)
+            
+            pos = start + 1
+        
+        return hits
+    
     def _compile_arabic_patterns(self) -> Dict[str, List[Tuple[re.Pattern, Dict]]]:
-        """Compile Arabic patterns"""
+        """Attach metadata to the precompiled Arabic patterns"""
         compiled = {}
         for entity_type, config in ARABIC_PATTERNS.items():
-            compiled[entity_type] = []
-            for pattern_str in config.get("patterns", []):
-                try:
-                    compiled[entity_type].append((
-                        re.compile(pattern_str, re.UNICODE),
-                        {
-                            "entity_type": entity_type,
-                            "category": config["category"],
-                            "domain": config.get("domain", ""),
-                            "sensitivity_level": config["sensitivity"],
-                        }
-                    ))
-                except re.error:
-                    pass
+            metadata = {
+                "entity_type": entity_type,
+                "category": config["category"],
+                "domain": config.get("domain", ""),
+                "sensitivity_level": config["sensitivity"],
+            }
+            compiled[entity_type] = [(pattern, metadata) for pattern in _COMPILED_AR[entity_type]]
         return compiled
     
-    def _get_context(self, text: str, start: int, end: int, size: int = 30) -> str:
-        """Extract context around detection"""
-        ctx_start = max(0, start - size)
-        ctx_end = min(len(text), end + size)
-        context = text[ctx_start:ctx_end]
-        if ctx_start > 0:
-            context = "..." + context
-        if ctx_end < len(text):
-            context = context + "..."
-        return context
+    def _compile_custom_patterns(self) -> List[Tuple[re.Pattern, Dict, Dict]]:
+        """Compile the regex patterns of the custom taxonomy files once: (pattern, category, subclass)"""
+        compiled = []
+        for category in self.taxonomy.get("categories", []):
+            for subclass in category.get("subclasses", []):
+                for pattern_str in subclass.get("regex_patterns", []):
+                    try:
+                        compiled.append((re.compile(pattern_str, re.IGNORECASE | re.UNICODE), category, subclass))
+                    except re.error:
+                        pass
+        return compiled
+    
+    def _build_custom_scanner(self):
+        """Fuse the custom taxonomy patterns into one master regex (those with uncombinable syntax run alone)
+        
+        Also flattens each pattern's detection fields, as for the Moroccan patterns.
+        """
+        self.custom_patterns = [pattern for pattern, _, _ in self.compiled_custom]
+        self.custom_meta = [
+            (subclass.get("name", "Unknown"), category.get("class", ""), category.get("domain_name", ""),
+             subclass.get("sensitivity_level", "unknown"), None)
+            for _, category, subclass in self.compiled_custom
+        ]
+        fusable = [
+            idx for idx, pattern in enumerate(self.custom_patterns)
+            if not _UNCOMBINABLE_SYNTAX.search(pattern.pattern)
+        ]
+        self.custom_master = self._fuse_patterns(fusable, self.custom_patterns, re.IGNORECASE | re.UNICODE)
+        self.custom_fused = fusable if self.custom_master is not None else []
+        fused = set(self.custom_fused)
+        self.custom_unfused = [idx for idx in range(len(self.custom_patterns)) if idx not in fused]
     
-    def _check_context(self, text: str, start: int, end: int, keywords: List[str]) -> bool:
-        """Check if context keywords are present"""
-        if not keywords:
+    def _check_context(self, text: str, start: int, end: int, keywords_re: Optional[re.Pattern]) -> bool:
+        """Check if context keywords are present (one bounded search, no slice nor lowercasing)"""
+        if keywords_re is None:
             return True
-        ctx = text[max(0, start-50):min(len(text), end+50)].lower()
-        return any(kw.lower() in ctx for kw in keywords)
+        return keywords_re.search(text, max(0, start - 50), end + 50) is not None
     
     def analyze(self, text: str, language: str = "fr",
                 confidence_threshold: float = 0.5,
@@ -554,95 +1223,83 @@ class TaxonomyEngine:
         if not text or not text.strip():
             return []
         
+        # Threshold, domain and duplicate filters run before a detection is built:
+        # the first kept detection of a (start, end) span wins, as before
+        domains_lower = [dom.lower() for dom in domains] if domains else None
+        domain_allowed: Dict[str, bool] = {}  # filter result, once per distinct domain
+        seen = set()
         detections = []
         
-        # Moroccan patterns
-        for entity_type, patterns in self.compiled_patterns.items():
-            for pattern, metadata in patterns:
-                for match in pattern.finditer(text):
-                    ctx_required = metadata.get("context_required", [])
-                    if ctx_required and not self._check_context(text, match.start(), match.end(), ctx_required):
-                        continue
-                    
-                    # Calculate sensitivity using Cahier formula (Section 4.4)
-                    sensitivity = self.sensitivity_calc.calculate(metadata["entity_type"])
-                    
-                    detections.append({
-                        "entity_type": metadata["entity_type"],
-                        "category": metadata["category"],
-                        "domain": metadata.get("domain", ""),
-                        "value": match.group(0),
-                        "start": match.start(),
-                        "end": match.end(),
-                        "sensitivity_level": sensitivity["level"],
-                        "sensitivity_score": sensitivity["score"],
-                        "sensitivity_breakdown": sensitivity["breakdown"],
-                        "confidence_score": 0.9,
-                        "detection_method": "regex",
-                        "context": self._get_context(text, match.start(), match.end())
-                    })
+        def is_candidate(domain: str, start: int, end: int) -> bool:
+            if (start, end) in seen:
+                return False
+            if domains_lower is None:
+                return True
+            allowed = domain_allowed.get(domain)
+            if allowed is None:
+                allowed = domain_allowed[domain] = any(dom in domain.lower() for dom in domains_lower)
+            return allowed
         
-        # Arabic patterns (if Arabic text detected)
-        if any('\u0600' <= char <= '\u06FF' for char in text):
-            for entity_type, patterns in self.compiled_arabic.items():
-                for pattern, metadata in patterns:
-                    for match in pattern.finditer(text):
-                        # Calculate sensitivity using Cahier formula
-                        sensitivity = self.sensitivity_calc.calculate(metadata["entity_type"])
-                        
-                        detections.append({
-                            "entity_type": metadata["entity_type"],
-                            "category": metadata["category"],
-                            "domain": metadata.get("domain", ""),
-                            "value": match.group(0),
-                            "start": match.start(),
-                            "end": match.end(),
-                            "sensitivity_level": sensitivity["level"],
-                            "sensitivity_score": sensitivity["score"],
-                            "sensitivity_breakdown": sensitivity["breakdown"],
-                            "confidence_score": 0.85,
-                            "detection_method": "regex_arabic",
-                            "context": self._get_context(text, match.start(), match.end())
-                        })
-        
-        # Also check custom taxonomy from files
-        for category in self.taxonomy.get("categories", []):
-            for subclass in category.get("subclasses", []):
-                for pattern_str in subclass.get("regex_patterns", []):
-                    try:
-                        pattern = re.compile(pattern_str, re.IGNORECASE | re.UNICODE)
-                        for match in pattern.finditer(text):
-                            detections.append({
-                                "entity_type": subclass.get("name", "Unknown"),
-                                "category": category.get("class", ""),
-                                "domain": category.get("domain_name", ""),
-                                "value": match.group(0),
-                                "start": match.start(),
-                                "end": match.end(),
-                                "sensitivity_level": subclass.get("sensitivity_level", "unknown"),
-                                "confidence_score": 0.85,
-                                "detection_method": "regex",
-                                "context": self._get_context(text, match.start(), match.end())
-                            })
-                    except re.error:
-                        pass
+        # Moroccan patterns (one pass of the fused master regex)
+        if 0.9 >= confidence_threshold:
+            for idx, start, end in self._scan_moroccan(text):
+                # Sensitivity from the Cahier formula (Section 4.4), precomputed
+                entity_type, category, domain, level, sensitivity = self.moroccan_meta[idx]
+                if not is_candidate(domain, start, end):
+                    continue
+                ctx_re = _CTX_RE[idx]
+                if ctx_re is not None and not self._check_context(text, start, end, ctx_re):
+                    continue
+                seen.add((start, end))
+                
+                detections.append(Detection(
+                    entity_type, category, domain, text, start, end,
+                    level, sensitivity, 0.9, "regex"
+                ))
         
-        # Filter by threshold and domains
-        detections = [d for d in detections if d["confidence_score"] >= confidence_threshold]
-        if domains:
-            detections = [d for d in detections 
-                         if any(dom.lower() in d.get("domain", "").lower() for dom in domains)]
+        # Arabic patterns (if Arabic text detected)
+        if 0.85 >= confidence_threshold and _contains_arabic(text):
+            # One pass of the fused Arabic regex, hits in per-pattern finditer order
+            for idx, start, end in sorted(self._scan_patterns(text, _AR_IDX, self.arabic_master, _AR_PATTERNS)):
+                # Sensitivity from the Cahier formula, precomputed
+                entity_type, category, domain, level, sensitivity = self.arabic_meta[idx]
+                if not is_candidate(domain, start, end):
+                    continue
+                seen.add((start, end))
+                
+                detections.append(Detection(
+                    entity_type, category, domain, text, start, end,
+                    level, sensitivity, 0.85, "regex_arabic"
+                ))
         
-        # Remove duplicates based on position
-        seen = set()
-        unique = []
-        for d in detections:
-            key = (d["start"], d["end"])
-            if key not in seen:
-                seen.add(key)
-                unique.append(d)
+        # Also check custom taxonomy from files (one pass of the fused custom regex)
+        if 0.85 >= confidence_threshold:
+            custom_hits = self._scan_patterns(text, self.custom_fused, self.custom_master, self.custom_patterns)
+            custom_hits.extend(self._scan_patterns(text, self.custom_unfused, None, self.custom_patterns))
+            for idx, start, end in sorted(custom_hits):
+                entity_type, category, domain, level, sensitivity = self.custom_meta[idx]
+                if not is_candidate(domain, start, end):
+                    continue
+                seen.add((start, end))
+                
+                detections.append(Detection(
+                    entity_type, category, domain, text, start, end,
+                    level, sensitivity, 0.85, "regex"
+                ))
         
-        return sorted(unique, key=lambda x: x["start"])
+        detections.sort(key=lambda x: x.start)
+        return [d.to_dict() for d in detections]
+    
+    def analyze_batch(self, texts: List[str], language: str = "fr",
+                      confidence_threshold: float = 0.5,
+                      detect_names: bool = True,
+                      domains: Optional[List[str]] = None) -> List[List[Dict]]:
+        """Analyze several texts with the same options (one list of detections per text)"""
+        return [
+            self.analyze(text, language=language, confidence_threshold=confidence_threshold,
+                         detect_names=detect_names, domains=domains)
+            for text in texts
+        ]
     
     def get_domains(self) -> List[Dict]:
         """Get available domains"""
@@ -686,6 +1343,36 @@ def health():
         "domains": len(taxonomy_engine.taxonomy.get("domains", {}))
     }
 
+# Every DetectionResult field in model order, with its default: a detection dict
+# laid over it serializes like the response model would
+_DETECTION_FIELDS = {
+    name: None if field.is_required() else field.default
+    for name, field in DetectionResult.model_fields.items()
+}
+
+def build_analyze_response(text: str, detections: List[Dict], start_time: float) -> Dict:
+    """Build the analysis response body (summaries), shaped like AnalyzeResponse
+    
+    The endpoints send it as is: no Pydantic model is built per detection.
+    """
+    summary = {}
+    domains_summary = {}
+    for det in detections:
+        summary[det["category"]] = summary.get(det["category"], 0) + 1
+        domains_summary[det.get("domain", "OTHER")] = domains_summary.get(det.get("domain", "OTHER"), 0) + 1
+    
+    execution_time = (time.time() - start_time) * 1000
+    
+    return {
+        "success": True,
+        "text_length": len(text),
+        "detections_count": len(detections),
+        "detections": [{**_DETECTION_FIELDS, **d} for d in detections],
+        "summary": summary,
+        "domains_summary": domains_summary,
+        "execution_time_ms": round(execution_time, 2)
+    }
+
 @app.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_text(request: AnalyzeRequest):
     """Analyze text with Moroccan taxonomy"""
@@ -700,24 +1387,32 @@ async def analyze_text(request: AnalyzeRequest):
             domains=request.domains
         )
         
-        # Build summaries
-        summary = {}
-        domains_summary = {}
-        for det in detections:
-            summary[det["category"]] = summary.get(det["category"], 0) + 1
-            domains_summary[det.get("domain", "OTHER")] = domains_summary.get(det.get("domain", "OTHER"), 0) + 1
-        
-        execution_time = (time.time() - start_time) * 1000
-        
-        return AnalyzeResponse(
-            success=True,
-            text_length=len(request.text),
-            detections_count=len(detections),
-            detections=[DetectionResult(**d) for d in detections],
-            summary=summary,
-            domains_summary=domains_summary,
-            execution_time_ms=round(execution_time, 2)
+        return FastJSONResponse(build_analyze_response(request.text, detections, start_time))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze_batch", response_model=List[AnalyzeResponse])
+async def analyze_texts_batch(request: BatchAnalyzeRequest):
+    """Analyze a batch of texts in one request
+    
+    execution_time_ms of each response includes the analysis time of the whole batch.
+    """
+    start_time = time.time()
+    
+    try:
+        batch_detections = await asyncio.to_thread(
+            taxonomy_engine.analyze_batch,
+            texts=request.texts,
+            language=request.language,
+            confidence_threshold=request.confidence_threshold,
+            detect_names=request.detect_names,
+            domains=request.domains
         )
+        
+        return FastJSONResponse([
+            build_analyze_response(text, detections, start_time)
+            for text, detections in zip(request.texts, batch_detections)
+        ])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -740,12 +1435,13 @@ async def sync_taxonomy_to_atlas():
     Sync taxonomy to Apache Atlas (Cahier Section 4.6)
     Creates entity type definitions for all 47+ Moroccan PII/SPI patterns
     """
+    if not ATLAS_AVAILABLE:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Atlas client not available: {ATLAS_IMPORT_ERROR}"
+        )
+    
     try:
-        # Import Atlas client
-        import sys
-        sys.path.insert(0, '../common')
-        from atlas_client import AtlasClient
-        
         atlas = AtlasClient()
         
         if atlas.mock_mode:
@@ -844,11 +1540,6 @@ async def sync_taxonomy_to_atlas():
             "mock_mode": False
         }
         
-    except ImportError as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Atlas client not available: {str(e)}"
-        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -863,12 +1554,6 @@ async def sync_taxonomy_to_atlas():
 def get_mongodb_status():
     """Check MongoDB connection and pattern status"""
     try:
-        import sys
-        import os
-        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'common'))
-        from mongodb_client import test_connection
-        from backend.pattern_loader import get_pattern_count
-        
         if not test_connection():
             return {
                 "status": "disconnected",
@@ -900,8 +1585,6 @@ def reload_patterns_from_db():
     global taxonomy_engine
     
     try:
-        from backend.pattern_loader import load_patterns_from_mongodb
-        
         new_patterns = load_patterns_from_mongodb()
         
         if new_patterns and len(new_patterns) >= 47:
@@ -909,6 +1592,7 @@ def reload_patterns_from_db():
             taxonomy_engine.moroccan_patterns = new_patterns
             # Recompile patterns
             taxonomy_engine.compiled_patterns = taxonomy_engine._compile_moroccan_patterns()
+            taxonomy_engine._build_moroccan_scanner()
             
             return {
                 "success": True,
@@ -0,0 +1,140 @@
+"""
+Pytest Unit Tests for the Taxonomy Classifier
+Taxonomy service - classifier.py
+
+The fused alternation scan must find the same matches as running each
+pattern's own finditer, on the re path as on the RE2 path (ASCII text),
+whatever the Hyperscan / trigger candidate screening keeps.
+"""
+
+import pytest
+import random
+import sys
+import os
+
+# Add taxonomy engine directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'services', 'taxonomie-serv', 'backend', 'taxonomie'))
+
+import classifier
+
+
+# Fragments assembled into random texts: PII-like values, runs of digits that
+# overlap several patterns, case-folding and whitespace edge cases, Arabic
+FRAGMENTS = [
+    "0612345678", "+212 6 12 34 56 78", "212522334455", "05 22 33 44 55",
+    "AB123456", "cin BE98765", "IF 12345678", "1234567890123456789",
+    "MA64 0111 2222 3333 4444 5555 666", "011780000012345678901234",
+    "ahmed.bennani@example.ma", "http://www.example.ma/x", "192.168.1.10",
+    "Mohamed Alami", "AHMED BENNANI", "Adresse: 12 Avenue Hassan II",
+    "İstanbul", "ıd", "ſ", "K", "\x1c", "\x1f", "\v", "\t",
+    "محمد العلوي", "رقم 0612345678", "é", "CNSS", "RIB", "IBAN",
+    " ", " ", " ", ", ", ": ", "-", ".", "\n",
+]
+
+ASCII_FRAGMENTS = [
+    fragment for fragment in FRAGMENTS
+    if fragment.isascii() and not classifier._ASCII_WHITESPACE_GAP.search(fragment)
+]
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture(scope="module")
+def engine():
+    """Classifier engine loaded with the embedded or on-disk taxonomy"""
+    return classifier.detection_engine
+
+
+def random_texts(fragments, seed, count=300):
+    """Random concatenations of the given fragments"""
+    rnd = random.Random(seed)
+    return ["".join(rnd.choice(fragments) for _ in range(rnd.randint(1, 12))) for _ in range(count)]
+
+
+def finditer_hits(patterns, text):
+    """(order, start, end) of each pattern's own finditer, pattern by pattern"""
+    return [
+        (metadata["order"], match.start(), match.end())
+        for pattern, metadata in patterns
+        for match in pattern.finditer(text)
+    ]
+
+
+def reference_detections(engine, text, detect_names):
+    """Regex detections computed pattern by pattern, without fusion or screening"""
+    text_lower = text.lower()
+    detections = []
+    for patterns in engine.compiled_patterns.values():
+        for pattern, metadata in patterns:
+            if not detect_names and metadata["is_name"]:
+                continue
+            for match in pattern.finditer(text):
+                start, end = match.start(), match.end()
+                value = text[start:end]
+                context_required = metadata["context_required_lower"]
+                if context_required and not engine._check_context_required(
+                        text, start, end, context_required, text_lower=text_lower):
+                    continue
+                if metadata["is_name"] and not engine._is_valid_name(value):
+                    continue
+                if metadata["is_fiscal_id"] and value.startswith(('06', '07', '05', '+212', '212')):
+                    continue
+                detections.append((metadata["entity_type"], start, end))
+    return detections
+
+
+# ============================================================================
+# COMBINED SCAN TESTS
+# ============================================================================
+
+class TestCombinedScan:
+    """Test the fused alternation against per-pattern finditer"""
+
+    def test_combined_scan_matches_finditer(self, engine):
+        """Test the re alternation yields every pattern's finditer matches"""
+        combined_pattern, alternatives, _ = engine.combined_patterns
+        if combined_pattern is None:
+            pytest.skip("no combinable pattern")
+        candidates = {metadata["order"] for _, metadata in alternatives}
+        for text in random_texts(FRAGMENTS, seed=0):
+            hits = engine._scan_combined(combined_pattern, alternatives, text, candidates)
+            assert sorted((metadata["order"], start, end) for metadata, start, end in hits) == \
+                sorted(finditer_hits(alternatives, text)), repr(text)
+
+    def test_re2_combined_scan_matches_finditer(self, engine):
+        """Test the RE2 alternation on ASCII text yields the re finditer matches"""
+        if engine.re2_patterns is None:
+            pytest.skip("google-re2 not installed")
+        combined_re2, alternatives_re2, _ = engine.re2_patterns
+        _, alternatives, _ = engine.combined_patterns
+        candidates = {metadata["order"] for _, metadata in alternatives}
+        for text in random_texts(ASCII_FRAGMENTS, seed=1):
+            hits = engine._scan_combined(combined_re2, alternatives_re2, text.encode("ascii"), candidates)
+            assert sorted((metadata["order"], start, end) for metadata, start, end in hits) == \
+                sorted(finditer_hits(alternatives, text)), repr(text)
+
+
+# ============================================================================
+# REGEX DETECTION TESTS
+# ============================================================================
+
+class TestRegexDetection:
+    """Test the screened, fused detection path against a plain reference"""
+
+    @pytest.mark.parametrize("detect_names", [False, True])
+    def test_detections_match_reference(self, engine, detect_names):
+        """Test _detect_with_regex keeps the per-pattern finditer detections"""
+        for text in random_texts(FRAGMENTS, seed=2) + random_texts(ASCII_FRAGMENTS, seed=3):
+            detections = engine._detect_with_regex(text, detect_names=detect_names, text_lower=text.lower())
+            assert [(d["entity_type"], d["start"], d["end"]) for d in detections] == \
+                reference_detections(engine, text, detect_names), repr(text)
+
+    def test_overlapping_digit_runs(self, engine):
+        """Test long digit runs keep the overlapping matches of every pattern"""
+        for length in range(6, 30):
+            text = "ref " + "0612345678901234567890123456789"[:length] + " fin"
+            detections = engine._detect_with_regex(text, detect_names=False, text_lower=text.lower())
+            assert [(d["entity_type"], d["start"], d["end"]) for d in detections] == \
+                reference_detections(engine, text, False), repr(text)
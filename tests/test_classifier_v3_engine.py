@@ -0,0 +1,144 @@
+"""
+Pytest Unit Tests for the Domain Classifier (v3)
+Taxonomy service - classifier_v3.py
+
+Lowercased patterns run without IGNORECASE on the lowercased text, fused
+into one alternation per category. Both must find what the IGNORECASE
+patterns find one by one with finditer on the original text.
+"""
+
+import pytest
+import random
+import sys
+import os
+
+# Add taxonomy engine directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'services', 'taxonomie-serv', 'backend', 'taxonomie'))
+
+import classifier_v3
+
+
+# Fragments assembled into random texts: PII-like values in both cases, runs
+# of digits that overlap several patterns, case-folding and whitespace edge
+# cases (İ ı ſ and the Kelvin sign fold to ASCII letters), Arabic
+FRAGMENTS = [
+    "0612345678", "+212 6 12 34 56 78", "212522334455", "05 22 33 44 55",
+    "AB123456", "ab123456", "Cin BE98765", "CNIE", "IF 12345678", "ICE 001234567000089",
+    "1234567890123456789", "MA64 0111 2222 3333 4444 5555 666", "ma64011780000012345678901234",
+    "Ahmed.Bennani@Example.MA", "HTTP://WWW.EXAMPLE.MA/X", "192.168.1.10",
+    "Mohamed Alami", "AHMED BENNANI", "Adresse: 12 Avenue Hassan II", "CNSS", "RIB", "IBAN",
+    "İstanbul", "ıd", "ſ", "K", "\x1c", "\x1f", "\v", "\t", "é", "É",
+    "محمد العلوي", "رقم 0612345678",
+    " ", " ", " ", ", ", ": ", "-", ".", "\n",
+]
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture(scope="module")
+def engine():
+    """v3 engine loaded with the taxonomy domain files"""
+    return classifier_v3.detection_engine
+
+
+def random_texts(seed, count=300):
+    """Random concatenations of the fragments"""
+    rnd = random.Random(seed)
+    return ["".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(1, 12))) for _ in range(count)]
+
+
+def finditer_hits(patterns, indices, text):
+    """(pattern index, start, end) of each IGNORECASE pattern's own finditer"""
+    return sorted(
+        (i, match.start(), match.end())
+        for i in indices
+        for match in patterns[i][0].finditer(text)
+    )
+
+
+def reference_detections(engine, text, detect_names):
+    """Regex detections of the unfused IGNORECASE patterns, one by one on the text"""
+    text_lower = text.lower()
+    detections = []
+    for category_name, active in engine._active_patterns(None, detect_names).items():
+        patterns = engine.fused_patterns[category_name][1]
+        for i, start, end in finditer_hits(patterns, active, text):
+            metadata = patterns[i][1]
+            if metadata.context_required_lower and not engine._check_context_required(
+                    text, text_lower, start, end, metadata.context_required_lower):
+                continue
+            if metadata.is_fiscal and classifier_v3._FISCAL_FP.match(text[start:end]):
+                continue
+            detections.append((metadata.entity_type, start, end))
+    return detections
+
+
+# ============================================================================
+# LOWERCASED PATTERN TESTS
+# ============================================================================
+
+class TestLowercasedPatterns:
+    """Test the lowercased, fused scan against the IGNORECASE patterns"""
+
+    def test_lowercased_patterns_match_ignorecase(self, engine):
+        """Test each lowercased pattern finds the IGNORECASE matches on case-safe text"""
+        checked = 0
+        for text in random_texts(seed=0):
+            text_lower = text.lower()
+            if not engine._lowercase_safe(text, text_lower):
+                continue
+            for category_name, (_, patterns) in engine.fused_patterns.items():
+                lowered = engine.lowered_patterns[category_name][1]
+                for i, (pattern, _) in enumerate(patterns):
+                    if lowered[i][0] is None:
+                        continue
+                    assert finditer_hits(lowered, [i], text_lower) == finditer_hits(patterns, [i], text), \
+                        (pattern.pattern, repr(text))
+                    checked += 1
+        assert checked
+
+    @pytest.mark.parametrize("kind", ["custom", "lower"])
+    def test_fused_scan_matches_finditer(self, engine, kind):
+        """Test the fused alternation yields every pattern's finditer matches"""
+        for text in random_texts(seed=1):
+            text_lower = text.lower()
+            if kind == "lower" and not engine._lowercase_safe(text, text_lower):
+                continue
+            subject = text_lower if kind == "lower" else text
+            for category_name, (_, patterns) in engine.fused_patterns.items():
+                fused_pattern, group_patterns = engine._get_fused(kind, category_name)
+                active = [i for i, (pattern, _) in enumerate(group_patterns) if pattern is not None]
+                assert engine._scan_fused(fused_pattern, group_patterns, subject, active) == \
+                    finditer_hits(patterns, active, text), (category_name, repr(text))
+
+    def test_case_folding_characters_are_not_lowercase_safe(self, engine):
+        """Test texts holding İ, ı, ſ or the Kelvin sign keep the IGNORECASE path"""
+        for char in "İıſK":
+            text = f"cin {char} AB123456"
+            assert not engine._lowercase_safe(text, text.lower())
+
+
+# ============================================================================
+# REGEX DETECTION TESTS
+# ============================================================================
+
+class TestRegexDetection:
+    """Test the screened, fused detection path against a plain reference"""
+
+    @pytest.mark.parametrize("detect_names", [False, True])
+    def test_detections_match_reference(self, engine, detect_names):
+        """Test _detect_with_regex keeps the unfused IGNORECASE detections"""
+        for text in random_texts(seed=2):
+            detections = engine._detect_with_regex(text, detect_names=detect_names)
+            assert [(d.entity_type, d.start, d.end) for d in detections] == \
+                reference_detections(engine, text, detect_names), repr(text)
+
+    def test_overlapping_digit_runs(self, engine):
+        """Test long digit runs keep the overlapping matches of every pattern"""
+        for length in range(6, 30):
+            text = "Ref " + "0612345678901234567890123456789"[:length] + " FIN"
+            detections = engine._detect_with_regex(text, detect_names=False)
+            assert [(d.entity_type, d.start, d.end) for d in detections] == \
+                reference_detections(engine, text, False), repr(text)
@@ -0,0 +1,97 @@
+"""
+Pytest Unit Tests for the Hybrid Engine
+Taxonomy service - classifier_hybrid.py
+
+The hybrid engine must match with the standard library re module: its
+\\s covers \\x1c-\\x1f and its IGNORECASE folds İ onto i. The expected
+spans below are the engine's output before any regex engine swap.
+The Numba-compiled merge sweep must keep the Python merge's result.
+"""
+
+import pytest
+import random
+import re
+import sys
+import os
+
+# Add taxonomy engine directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'services', 'taxonomie-serv', 'backend', 'taxonomie'))
+
+import classifier_hybrid
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture(scope="module")
+def engine():
+    """Hybrid engine loaded with the taxonomy domain files"""
+    return classifier_hybrid.detection_engine
+
+
+def spans(engine, text):
+    """(entity_type, start, end) of the regex-only detections"""
+    return [(d["entity_type"], d["start"], d["end"]) for d in engine.analyze(text, use_presidio=False)]
+
+
+# ============================================================================
+# REGEX ENGINE TESTS
+# ============================================================================
+
+class TestRegexEngine:
+    """Test that matching keeps the standard library semantics"""
+
+    def test_uses_standard_library_re(self):
+        """Test patterns are compiled with the standard library re"""
+        assert classifier_hybrid.re is re
+
+    def test_separator_characters_are_whitespace(self, engine):
+        """Test \\x1c-\\x1f stay inside a name and an address, as \\s under re"""
+        assert spans(engine, "Client: AHMED\x1cBENNANI") == [
+            ("Nom complet", 0, 6), ("Nom complet", 8, 21)
+        ]
+        assert spans(engine, "Contact: Ahmed\x1cBennani, CIN AB123456") == [
+            ("Nom complet", 0, 7), ("Nom complet", 9, 22), ("Nom complet", 24, 28), ("Matricule Employé", 28, 36)
+        ]
+        assert spans(engine, "Adresse: 12 Avenue Hassan\x1fII, Casablanca") == [
+            ("Nom complet", 0, 7), ("Adresse postale", 9, 28), ("Nom complet", 30, 40)
+        ]
+
+    def test_dotted_capital_i_case_folds(self, engine):
+        """Test İ matches i under IGNORECASE, as under re"""
+        assert spans(engine, "Adresse: İstanbul") == [
+            ("Nom complet", 0, 7), ("Nom complet", 9, 17)
+        ]
+        assert spans(engine, "ville İSTANBUL cin AB123456") == [
+            ("Nom complet", 0, 14), ("CIN - Carte d'Identité Nationale", 15, 27)
+        ]
+
+
+# ============================================================================
+# MERGE SWEEP TESTS
+# ============================================================================
+
+class TestMergeSweep:
+    """Test the compiled overlap sweep against the Python merge"""
+
+    def test_compiled_merge_matches_python(self, engine, monkeypatch):
+        """Test large detection sets merge the same with and without Numba"""
+        if not classifier_hybrid.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        rnd = random.Random(0)
+        for _ in range(200):
+            detections = []
+            for _ in range(rnd.randint(classifier_hybrid.MERGE_NUMBA_MIN + 1, 300)):
+                start = rnd.randint(0, 500)
+                detections.append({
+                    "start": start,
+                    "end": start + rnd.randint(1, 20),
+                    "confidence_score": rnd.choice([0.6, 0.75, 0.85, 0.9]),
+                    "source": rnd.choice(["custom", "presidio", "arabic"]),
+                })
+            compiled = engine._merge_detections(detections)
+            monkeypatch.setattr(classifier_hybrid, "NUMBA_AVAILABLE", False)
+            expected = engine._merge_detections(detections)
+            monkeypatch.undo()
+            assert [id(d) for d in compiled] == [id(d) for d in expected]
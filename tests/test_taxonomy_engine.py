@@ -0,0 +1,191 @@
+"""
+Pytest Unit Tests for the Taxonomy Engine
+Taxonomy service - main.py (TaxonomyEngine)
+
+analyze() screens patterns (Hyperscan, required literals, context keywords),
+serves bare digit-run patterns from one pass, and scans the rest through
+fused master regexes, lowercased when the text allows it. Its detections
+must stay those of running every pattern's own finditer on the text, then
+filtering by threshold, domains and (start, end) duplicates.
+"""
+
+import pytest
+import random
+import re
+import sys
+import os
+
+# Add taxonomy service directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'services', 'taxonomie-serv'))
+
+import main
+
+
+# Fragments assembled into random texts: PII-like values in both cases with
+# their context keywords, runs of digits that overlap several patterns,
+# characters IGNORECASE folds to ASCII letters (İ ı ſ and the Kelvin sign),
+# whitespace \s covers under re only (\v, \x1c-\x1f), Arabic
+FRAGMENTS = [
+    "0612345678", "+212 6 12 34 56 78", "212522334455", "05 22 33 44 55",
+    "AB123456", "ab123456", "CIN BE98765", "cnie", "Passeport", "permis",
+    "IF 12345678", "ICE 001234567000089", "CNSS 123456789", "RIB", "IBAN", "patente",
+    "1234567890123456789", "000111222333444555666777", "12 34 56 78",
+    "MA64 0111 2222 3333 4444 5555 666", "ma64011780000012345678901234",
+    "Ahmed.Bennani@Example.MA", "192.168.1.10", "4111 1111 1111 1111",
+    "Mohamed Alami", "AHMED BENNANI", "Adresse: 12 Avenue Hassan II",
+    "diabète", "VIH", "musulman", "syndicat",
+    "İ", "ı", "ſ", "K", "İD", "cınE", "\x1c", "\x1d", "\x1e", "\x1f", "\v", "\t",
+    "é", "É", "محمد العلوي", "رقم 0612345678", "بطاقة", "الهاتف", "٠٦١٢٣٤٥٦٧٨",
+    " ", " ", " ", ", ", ": ", "-", ".", "/", "\n",
+]
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+@pytest.fixture(scope="module")
+def engine():
+    """Taxonomy engine loaded with the domain files"""
+    return main.taxonomy_engine
+
+
+def random_texts(seed, count=400):
+    """Random concatenations of the fragments"""
+    rnd = random.Random(seed)
+    return ["".join(rnd.choice(FRAGMENTS) for _ in range(rnd.randint(1, 14))) for _ in range(count)]
+
+
+def reference_analyze(engine, text, confidence_threshold=0.5, domains=None):
+    """analyze() as plain per-pattern finditer, filtered afterwards"""
+    if not text or not text.strip():
+        return []
+
+    detections = []
+
+    for patterns in engine.compiled_patterns.values():
+        for pattern, metadata in patterns:
+            for match in pattern.finditer(text):
+                keywords = metadata.get("context_required", [])
+                if keywords:
+                    ctx = text[max(0, match.start() - 50):min(len(text), match.end() + 50)].lower()
+                    if not any(kw.lower() in ctx for kw in keywords):
+                        continue
+                detections.append((metadata["entity_type"], metadata.get("domain", ""),
+                                   match.start(), match.end(), 0.9, "regex"))
+
+    if any('\u0600' <= char <= '\u06FF' for char in text):
+        for patterns in engine.compiled_arabic.values():
+            for pattern, metadata in patterns:
+                for match in pattern.finditer(text):
+                    detections.append((metadata["entity_type"], metadata.get("domain", ""),
+                                       match.start(), match.end(), 0.85, "regex_arabic"))
+
+    for category in engine.taxonomy.get("categories", []):
+        for subclass in category.get("subclasses", []):
+            for pattern_str in subclass.get("regex_patterns", []):
+                try:
+                    pattern = re.compile(pattern_str, re.IGNORECASE | re.UNICODE)
+                except re.error:
+                    continue
+                for match in pattern.finditer(text):
+                    detections.append((subclass.get("name", "Unknown"), category.get("domain_name", ""),
+                                       match.start(), match.end(), 0.85, "regex"))
+
+    detections = [d for d in detections if d[4] >= confidence_threshold]
+    if domains:
+        detections = [d for d in detections if any(dom.lower() in d[1].lower() for dom in domains)]
+
+    seen = set()
+    unique = []
+    for d in detections:
+        if (d[2], d[3]) not in seen:
+            seen.add((d[2], d[3]))
+            unique.append(d)
+    return sorted(unique, key=lambda d: d[2])
+
+
+def analyzed(engine, text, **options):
+    """analyze() detections, in the reference's tuple form"""
+    return [
+        (d["entity_type"], d["domain"], d["start"], d["end"], d["confidence_score"], d["detection_method"])
+        for d in engine.analyze(text, **options)
+    ]
+
+
+# ============================================================================
+# PATTERN LOWERING TESTS
+# ============================================================================
+
+class TestLowercasePattern:
+    """Test the lowercased Moroccan patterns against their IGNORECASE form"""
+
+    def test_lowered_patterns_match_ignorecase(self):
+        """Test each lowercased pattern finds the IGNORECASE matches on case-safe text"""
+        checked = 0
+        for text in random_texts(seed=0):
+            text_lower = text.lower()
+            if len(text_lower) != len(text) or main._ASCII_CASE_GAP.search(text):
+                continue
+            for pattern, lowered in zip(main._PATTERNS, main._LOWERED):
+                if lowered is None:
+                    continue
+                assert [m.span() for m in lowered.finditer(text_lower)] == \
+                    [m.span() for m in pattern.finditer(text)], (pattern.pattern, repr(text))
+                checked += 1
+        assert checked
+
+    def test_mixed_case_ranges_are_not_lowered(self):
+        """Test a class range spanning both cases keeps the IGNORECASE form"""
+        assert main._lowercase_pattern(r"[A-f]+") is None
+        assert main._lowercase_pattern(r"\bCIN[A-Z]\d") == r"\bcin[a-z]\d"
+        assert main._lowercase_pattern("[\u0600-\u06FF]") is None
+
+
+# ============================================================================
+# ANALYZE TESTS
+# ============================================================================
+
+class TestAnalyze:
+    """Test analyze() against per-pattern finditer"""
+
+    def test_matches_reference(self, engine):
+        """Test random texts give the reference detections"""
+        for text in random_texts(seed=1):
+            assert analyzed(engine, text) == reference_analyze(engine, text), repr(text)
+
+    def test_matches_reference_with_filters(self, engine):
+        """Test threshold and domain filters keep the reference detections"""
+        rnd = random.Random(2)
+        domain_names = [info.get("name", "") for info in engine.taxonomy.get("domains", {}).values()]
+        for text in random_texts(seed=3, count=200):
+            threshold = rnd.choice([0.0, 0.86, 0.95])
+            domains = rnd.choice([None, ["identite"], [rnd.choice(domain_names)[:6]]])
+            assert analyzed(engine, text, confidence_threshold=threshold, domains=domains) == \
+                reference_analyze(engine, text, confidence_threshold=threshold, domains=domains), repr(text)
+
+    @pytest.mark.parametrize("char", ["İ", "ı", "ſ", "K"])
+    def test_case_folding_characters(self, engine, char):
+        """Test İ, ı, ſ and the Kelvin sign fold to ASCII letters as under IGNORECASE"""
+        for text in (f"cın {char}B123456", f"{char}CE 001234567000089", f"Carte: {char}D AB123456 cni{char}"):
+            assert analyzed(engine, text) == reference_analyze(engine, text), repr(text)
+
+    @pytest.mark.parametrize("separator", ["\v", "\x1c", "\x1d", "\x1e", "\x1f"])
+    def test_re_only_whitespace(self, engine, separator):
+        """Test \\v and \\x1c-\\x1f stay whitespace for \\s, on otherwise ASCII text"""
+        for text in (f"Tel:{separator}+212{separator}6{separator}12{separator}34{separator}56{separator}78",
+                     f"Carte 4111{separator}1111{separator}1111{separator}1111",
+                     f"Mohamed{separator}Alami CIN{separator}AB123456", f"Salaire 12000{separator}DH"):
+            assert analyzed(engine, text) == reference_analyze(engine, text), repr(text)
+
+    def test_arabic_text(self, engine):
+        """Test Arabic text runs the Arabic patterns like finditer"""
+        for text in ("الاسم: محمد العلوي، الهاتف 0612345678", "رقم البطاقة AB123456", "٠٦١٢٣٤٥٦٧٨ بطاقة"):
+            assert analyzed(engine, text) == reference_analyze(engine, text), repr(text)
+
+    def test_overlapping_digit_runs(self, engine):
+        """Test long digit runs keep the overlapping matches of every pattern"""
+        digits = "0612345678901234567890123456789012"
+        for length in range(4, len(digits) + 1):
+            for text in (f"ref {digits[:length]} fin", f"CNSS {digits[:length]}", f"IBAN MA{digits[:length]}"):
+                assert analyzed(engine, text) == reference_analyze(engine, text), repr(text)